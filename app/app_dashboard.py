@@ -4,13 +4,13 @@ Tech Challenge Fase 4 - POSTECH Data Analytics
 Dashboard para equipe médica com insights e análises
 """
 
+import time
+
+RUN_START = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import joblib
 import sys
 import os
 
@@ -22,9 +22,26 @@ sys.path.insert(0, ROOT_DIR)
 from src.translations import (
     VARIABLE_NAMES, OBESITY_LABELS, OBESITY_ORDER, VALUE_TRANSLATIONS,
     PRIMARY_COLOR, SECONDARY_COLOR, ACCENT_COLOR,
-    translate_variable, translate_value, get_obesity_label, get_color_palette
+    translate_variable, translate_value, get_obesity_label, get_color_palette,
+    translate_values, translate_variables, get_obesity_labels, obesity_order_codes, obesity_order_key
+)
+from src.model_artifacts import BUNDLE_DIR, MODELS_DIR
+from src.model_bundle import load_bundle_metrics, read_manifest
+from src.oof_evaluation import evaluation_table, load_evaluation
+from src.startup import StartupTimer, report_first_render
+from src.dataset_cache import DATA_PATH, load_datasets
+from src.streaming import AggregateStore, refresh_aggregates, store_version
+from src.analytics_source import AnalyticsSource, CubeSource, SQLiteSource, database_path, ensure_database
+from src.filter_cube import FAF_BAND_LABELS
+from src.bitmap_index import BitmapIndex
+from src.figure_cache import FigureCache, filter_key
+from src.chart_data import (
+    MAX_SCATTER_POINTS, box_statistics, density_grid, rebin_histogram, scatter_render_mode, stratified_sample
 )
 
+timer = StartupTimer(RUN_START)
+timer.mark('imports')
+
 # Configuração da página
 st.set_page_config(
     page_title="Dashboard Analítico - Obesidade",
@@ -33,49 +50,165 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Carregar dados
-@st.cache_data
-def load_data():
+# Carregar dados (cache colunar em memory-map, compartilhado entre sessões).
+# Linhas e agregados vêm das mesmas fontes: data/Obesity.csv e os CSVs já
+# ingeridos em data/cache/aggregates (python -m src.streaming ingest). Todos os
+# recursos derivados usam como chave a versão do manifesto dos agregados
+# (SHA-256 do conteúdo lido de cada fonte): linhas acrescentadas entram na
+# próxima execução em todos eles ao mesmo tempo
+@st.cache_resource(max_entries=1)
+def load_data(data_version: str, sources: tuple) -> pd.DataFrame:
     """Carregar dataset"""
-    try:
-        data_path = os.path.join(ROOT_DIR, 'data', 'Obesity.csv')
-        df = pd.read_csv(data_path)
-        df['BMI'] = df['Weight'] / (df['Height'] ** 2)
-        return df
-    except Exception as e:
-        st.error(f"Erro ao carregar dados: {e}")
-        return None
+    return load_datasets(list(sources))
+
+# Agregados incrementais (indicadores, tabelas cruzadas, correlação e histogramas
+# somam células em vez de linhas); uma nova versão de uma fonte lê apenas o trecho novo
+@st.cache_resource(max_entries=1)
+def load_aggregates(data_version: str) -> AggregateStore:
+    """Cubos das fontes ingeridas em blocos (src.streaming)"""
+    return AggregateStore.load()
+
+# Colunas derivadas do dataset inteiro (tradução e ordem clínica calculadas uma vez).
+# O DataFrame não entra no hash do Streamlit (prefixo _): a chave é a versão dos
+# agregados, sem percorrer as linhas a cada execução
+@st.cache_resource(max_entries=1)
+def load_derived_columns(_data: pd.DataFrame, data_version: str) -> pd.DataFrame:
+    """Rótulos traduzidos e ordem clínica de cada paciente"""
+    return pd.DataFrame({
+        'Obesidade_PT': get_obesity_labels(_data['Obesity']),
+        'Obesity_Order': obesity_order_codes(_data['Obesity'])
+    }, index=_data.index)
+
+# Fonte das agregações: cubos em memória (padrão) ou banco SQLite, para tabelas
+# grandes demais para o processo (ANALYTICS_BACKEND=sqlite). Com o SQLite nem
+# as linhas nem os agregados são carregados: indicadores, histogramas,
+# correlação e as linhas dos gráficos por paciente saem de consultas ao banco,
+# com o SHA-256 do CSV gravado no banco como versão dos dados
+ANALYTICS_BACKEND = os.environ.get('ANALYTICS_BACKEND', 'cube')
+
+@st.cache_resource(max_entries=1)
+def load_sqlite_source(data_version: str) -> SQLiteSource:
+    """Banco SQLite de data/Obesity.csv"""
+    return SQLiteSource(database_path(DATA_PATH))
+
+def load_analytics_source() -> tuple:
+    """Tupla (fonte escolhida por ANALYTICS_BACKEND, versão dos dados, pacientes em memória ou None)"""
+    if ANALYTICS_BACKEND == 'sqlite':
+        database_meta, _ = ensure_database(DATA_PATH)
+        data_version = database_meta['sha256']
+        return load_sqlite_source(data_version), data_version, None
+    store_manifest = refresh_aggregates([DATA_PATH])
+    data_version = store_version(store_manifest)
+    aggregates = load_aggregates(data_version)
+    analytics = CubeSource(aggregates.cube, aggregates.moments, aggregates.histograms)
+    return analytics, data_version, load_data(data_version, tuple(store_manifest['sources']))
+
+def filter_options(analytics: AnalyticsSource, df: pd.DataFrame) -> tuple:
+    """Tupla (gêneros, idade mínima, idade máxima, classes de obesidade) para os filtros"""
+    if df is None:
+        age_min, age_max = analytics.bounds('Age')
+        return analytics.categories('Gender'), age_min, age_max, analytics.categories('Obesity')
+    return df['Gender'].unique(), df['Age'].min(), df['Age'].max(), df['Obesity'].unique()
+
+# Bitsets por gênero, obesidade e bucket de idade: filtros por linha viram
+# operações palavra a palavra em vez de comparações sobre as colunas
+# (chave pela versão dos agregados, como as colunas derivadas)
+@st.cache_resource(max_entries=1)
+def load_bitmap_index(_data: pd.DataFrame, data_version: str) -> BitmapIndex:
+    """Índices bitmap dos filtros da barra lateral"""
+    return BitmapIndex.from_frame(_data)
+
+# Colunas dos gráficos por paciente (boxplot e dispersões)
+ROW_COLUMNS = ['Age', 'Height', 'Weight', 'BMI', 'Obesity']
+
+# Visão filtrada: uma única cópia das linhas, lida por todos os gráficos sem novas
+# cópias (compartilhada entre sessões, somente leitura). A seleção por bitmap é
+# barata, então só o estado mais recente dos filtros fica materializado e outro
+# estado refaz o recorte na execução seguinte
+@st.cache_resource(max_entries=1)
+def load_filtered_view(_data: pd.DataFrame, _derived: pd.DataFrame, _bitmaps: BitmapIndex, _selection: np.ndarray,
+                       data_version: str, genders: tuple, age_range: tuple, obesity: tuple) -> pd.DataFrame:
+    """Pacientes do filtro atual com as colunas usadas pelos gráficos por linha"""
+    rows = _bitmaps.to_mask(_selection)
+    return pd.concat([_data.loc[rows, ROW_COLUMNS], _derived.loc[rows]], axis=1)
+
+# Com o SQLite, as mesmas colunas são consultadas ao banco para o filtro atual,
+# apenas quando um gráfico por paciente precisa ser desenhado
+@st.cache_resource(max_entries=1)
+def load_sqlite_rows(data_version: str, genders: tuple, age_range: tuple, obesity: tuple) -> pd.DataFrame:
+    """Pacientes do filtro atual lidos do banco SQLite"""
+    rows = load_sqlite_source(data_version).view(genders, age_range, obesity).rows(ROW_COLUMNS)
+    return rows.assign(Obesidade_PT=get_obesity_labels(rows['Obesity']),
+                       Obesity_Order=obesity_order_codes(rows['Obesity']))
+
+# Figuras por estado dos filtros e versão dos dados (um cache LRU por processo,
+# compartilhado entre sessões)
+@st.cache_resource
+def load_figure_cache() -> FigureCache:
+    """Cache de figuras com orçamento de memória"""
+    return FigureCache()
 
 # Carregar métricas do modelo
 @st.cache_resource
 def load_metrics():
-    """Carregar métricas do modelo"""
+    """Carregar métricas do modelo (do bundle versionado, se existir)"""
     try:
-        metrics_path = os.path.join(ROOT_DIR, 'models', 'model_metrics.pkl')
+        bundle_dir = os.path.join(MODELS_DIR, BUNDLE_DIR)
+        if os.path.exists(bundle_dir):
+            read_manifest(bundle_dir)
+            return load_bundle_metrics(bundle_dir)
+        import joblib
+        metrics_path = os.path.join(MODELS_DIR, 'model_metrics.pkl')
         metrics = joblib.load(metrics_path)
         return metrics
     except:
         return None
 
+# Avaliação out-of-fold gravada pelo treinamento (src.oof_evaluation): métricas e
+# matrizes de confusão já calculadas, sem reajustar nem importar o modelo
+@st.cache_resource
+def load_model_evaluation():
+    """Carregar a avaliação out-of-fold dos modelos, se existir"""
+    try:
+        return load_evaluation(MODELS_DIR)
+    except (OSError, ValueError, KeyError):
+        return None
+
 # Título
 st.title("Dashboard Analítico de Obesidade")
 st.markdown("### Análises e insights para equipe médica")
 st.markdown("---")
 
 # Carregar dados
-df = load_data()
+try:
+    analytics, data_version, df = load_analytics_source()
+except Exception as e:
+    st.error(f"Erro ao carregar dados: {e}")
+    analytics = None
 metrics = load_metrics()
 
-if df is None:
+if analytics is None:
     st.error("❌ Dados não encontrados!")
     st.stop()
 
+timer.mark('dados')
+
 # Sidebar - Filtros
 st.sidebar.header("Filtros")
 
+# Modo em lote: as edições ficam em um formulário e só disparam uma nova
+# execução do script ao confirmar, em vez de uma a cada valor intermediário
+batch_filters = st.sidebar.checkbox(
+    "Aplicar filtros ao confirmar",
+    value=True,
+    help="Ajuste gênero, idade e nível de obesidade e clique em Aplicar filtros para recalcular o dashboard uma única vez"
+)
+filter_panel = st.sidebar.form("filtros") if batch_filters else st.sidebar
+
+gender_options, age_min, age_max, obesity_options = filter_options(analytics, df)
+
 # Filtro de gênero (com tradução)
-gender_options = df['Gender'].unique()
-gender_filter = st.sidebar.multiselect(
+gender_filter = filter_panel.multiselect(
     translate_variable("Gender"),
     options=gender_options,
     default=gender_options,
@@ -83,396 +216,491 @@ gender_filter = st.sidebar.multiselect(
 )
 
 # Filtro de idade
-age_range = st.sidebar.slider(
+age_range = filter_panel.slider(
     translate_variable("Age"),
-    int(df['Age'].min()),
-    int(df['Age'].max()),
-    (int(df['Age'].min()), int(df['Age'].max()))
+    int(age_min),
+    int(age_max),
+    (int(age_min), int(age_max))
 )
 
 # Filtro de obesidade (com tradução)
-obesity_options = sorted(df['Obesity'].unique(), key=lambda x: OBESITY_ORDER.index(x) if x in OBESITY_ORDER else 999)
-obesity_filter = st.sidebar.multiselect(
+obesity_options = sorted(obesity_options, key=obesity_order_key)
+obesity_filter = filter_panel.multiselect(
     translate_variable("Obesity"),
     options=obesity_options,
     default=obesity_options,
     format_func=lambda x: get_obesity_label(x)
 )
 
-# Aplicar filtros
-df_filtered = df[
-    (df['Gender'].isin(gender_filter)) &
-    (df['Age'] >= age_range[0]) &
-    (df['Age'] <= age_range[1]) &
-    (df['Obesity'].isin(obesity_filter))
-]
+if batch_filters:
+    filter_panel.form_submit_button("Aplicar filtros", type="primary", use_container_width=True)
+
+# Aplicar filtros à fonte de agregações (indicadores, histogramas, correlação e tabelas)
+view = analytics.view(gender_filter, age_range, obesity_filter)
+n_patients = view.total()
+obesity_counts_all = view.value_counts('Obesity')
+
+# Linhas filtradas (apenas boxplot e dispersões)
+if df is not None:
+    bitmaps = load_bitmap_index(df, data_version)
+    selection = bitmaps.select(gender_filter, age_range, obesity_filter)
+    n_rows_selected = bitmaps.count(selection)
+    df_filtered = load_filtered_view(df, load_derived_columns(df, data_version), bitmaps, selection, data_version,
+                                     tuple(gender_filter), tuple(age_range), tuple(obesity_filter))
+else:
+    n_rows_selected = n_patients
+    df_filtered = None
+
+def filtered_rows() -> pd.DataFrame:
+    """Pacientes do filtro atual (visão em memória ou consulta ao SQLite)"""
+    if df_filtered is not None:
+        return df_filtered
+    return load_sqlite_rows(data_version, tuple(gender_filter), tuple(age_range), tuple(obesity_filter))
+
+figure_cache = load_figure_cache()
+view_key = filter_key(gender_filter, age_range, obesity_filter, data_version)
+
+def cached_figure(name: str, build):
+    """Figura do filtro atual; build() só roda na primeira vez para este estado"""
+    return figure_cache.get_or_build((view_key, name), build)
 
 st.sidebar.markdown("---")
-st.sidebar.markdown(f"**Total de Registros:** {len(df_filtered)}")
+st.sidebar.markdown(f"**Total de Registros:** {n_rows_selected}")
+
+# Dispersões em coortes grandes: amostra estratificada ou grade de densidade (src.chart_data)
+SCATTER_MODES = ["Automático", "Todos os pontos", "Amostra estratificada", "Densidade"]
+scatter_mode = st.sidebar.selectbox(
+    "Dispersões",
+    SCATTER_MODES,
+    help=f"Automático envia todos os pontos até {MAX_SCATTER_POINTS:,} pacientes e, acima disso, "
+         "uma amostra com a mesma proporção de cada nível de obesidade"
+)
 
 # KPIs principais
 st.header("Indicadores principais")
 col1, col2, col3, col4, col5 = st.columns(5)
 
-with col1:
-    st.metric("Total de pacientes", f"{len(df_filtered):,}")
+with np.errstate(invalid='ignore', divide='ignore'):
+    with col1:
+        st.metric("Total de pacientes", f"{n_patients:,}")
 
-with col2:
-    avg_age = df_filtered['Age'].mean()
-    st.metric("Idade média", f"{avg_age:.1f} anos")
+    with col2:
+        avg_age = view.mean('Age')
+        st.metric("Idade média", f"{avg_age:.1f} anos")
 
-with col3:
-    avg_bmi = df_filtered['BMI'].mean()
-    st.metric("IMC médio", f"{avg_bmi:.2f}")
+    with col3:
+        avg_bmi = view.mean('BMI')
+        st.metric("IMC médio", f"{avg_bmi:.2f}")
 
-with col4:
-    obesity_rate = (df_filtered['Obesity'].str.contains('Obesity').sum() / len(df_filtered)) * 100
-    st.metric("Taxa de obesidade", f"{obesity_rate:.1f}%")
+    with col4:
+        obese_count = obesity_counts_all[obesity_counts_all.index.str.contains('Obesity')].sum()
+        obesity_rate = (obese_count / np.float64(n_patients)) * 100
+        st.metric("Taxa de obesidade", f"{obesity_rate:.1f}%")
 
-with col5:
-    normal_weight = (df_filtered['Obesity'] == 'Normal_Weight').sum()
-    normal_pct = (normal_weight / len(df_filtered)) * 100
-    st.metric("Peso normal", f"{normal_pct:.1f}%")
+    with col5:
+        normal_weight = obesity_counts_all.get('Normal_Weight', 0)
+        normal_pct = (normal_weight / np.float64(n_patients)) * 100
+        st.metric("Peso normal", f"{normal_pct:.1f}%")
 
 st.markdown("---")
+timer.mark('indicadores')
 
-# Visualizações
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "Distribuições",
-    "Correlações",
-    "Demografia",
-    "Hábitos de vida",
-    "Modelo de ML"
-])
+# plotly só é importado depois que os indicadores já foram enviados ao navegador
+import plotly.express as px
+import plotly.graph_objects as go
 
-with tab1:
+# Visualizações: cada seção é uma função, para que apenas a aberta seja calculada
+def histogram_figure(column: str, nbins: int, title: str, xaxis_title: str):
+    """Histograma a partir das contagens agregadas (uma barra por intervalo)"""
+    counts, edges = rebin_histogram(*view.histogram(column), nbins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        marker_color=SECONDARY_COLOR,
+        hovertemplate=f"{xaxis_title}: %{{customdata[0]:.4g}} a %{{customdata[1]:.4g}}<br>Frequência: %{{y}}<extra></extra>"
+    ))
+    fig.update_layout(title=title, bargap=0, height=400, xaxis_title=xaxis_title, yaxis_title='Frequência')
+    return fig
+
+def render_distributions():
+    """Seção Distribuições: classes de obesidade, IMC, idade e peso"""
     st.header("Distribuições de variáveis")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Distribuição de obesidade (ordenada e traduzida)
-        obesity_counts = df_filtered['Obesity'].value_counts()
-        obesity_counts = obesity_counts.reindex([x for x in OBESITY_ORDER if x in obesity_counts.index])
-        obesity_counts_df = obesity_counts.reset_index()
-        obesity_counts_df.columns = ['Obesidade', 'Quantidade']
-        obesity_counts_df['Obesidade_PT'] = obesity_counts_df['Obesidade'].apply(get_obesity_label)
+        def build_distribuicao_obesidade():
+            obesity_counts = obesity_counts_all
+            obesity_counts = obesity_counts.reindex([x for x in OBESITY_ORDER if x in obesity_counts.index])
+            obesity_counts_df = obesity_counts.reset_index()
+            obesity_counts_df.columns = ['Obesidade', 'Quantidade']
+            obesity_counts_df['Obesidade_PT'] = get_obesity_labels(obesity_counts_df['Obesidade'])
         
-        # Usar gradiente de azul padronizado
-        colors_grad = get_color_palette(len(obesity_counts_df))
+            # Usar gradiente de azul padronizado
+            colors_grad = get_color_palette(len(obesity_counts_df))
         
-        fig1 = px.bar(
-            obesity_counts_df,
-            x='Obesidade_PT',
-            y='Quantidade',
-            title='Distribuição dos Níveis de Obesidade',
-            color='Quantidade',
-            color_continuous_scale='Blues',
-            text='Quantidade'
-        )
-        fig1.update_traces(textposition='outside', marker_line_color='black', marker_line_width=1.2)
-        fig1.update_layout(showlegend=False, height=400, xaxis_title=translate_variable('Obesity'), yaxis_title='Frequência')
-        st.plotly_chart(fig1, use_container_width=True)
+            fig1 = px.bar(
+                obesity_counts_df,
+                x='Obesidade_PT',
+                y='Quantidade',
+                title='Distribuição dos Níveis de Obesidade',
+                color='Quantidade',
+                color_continuous_scale='Blues',
+                text='Quantidade'
+            )
+            fig1.update_traces(textposition='outside', marker_line_color='black', marker_line_width=1.2)
+            fig1.update_layout(showlegend=False, height=400, xaxis_title=translate_variable('Obesity'), yaxis_title='Frequência')
+            return fig1
+
+        st.plotly_chart(cached_figure('distribuicao_obesidade', build_distribuicao_obesidade), use_container_width=True)
     
     with col2:
         # Distribuição de IMC com cores padronizadas
-        fig2 = px.histogram(
-            df_filtered,
-            x='BMI',
-            nbins=40,
-            title=f'Distribuição do {translate_variable("BMI")}',
-            color_discrete_sequence=[SECONDARY_COLOR]
-        )
-        fig2.add_vline(x=18.5, line_dash="dash", line_color="#95a5a6", 
-                      annotation_text="< 18.5", annotation_position="top")
-        fig2.add_vline(x=25, line_dash="dash", line_color="#7f8c8d",
-                      annotation_text="25", annotation_position="top")
-        fig2.add_vline(x=30, line_dash="dash", line_color=PRIMARY_COLOR,
-                      annotation_text="30", annotation_position="top")
-        fig2.update_layout(height=400, xaxis_title=translate_variable('BMI'), yaxis_title='Frequência')
-        fig2.update_traces(marker_line_color='black', marker_line_width=1.2, opacity=0.85)
-        st.plotly_chart(fig2, use_container_width=True)
+        def build_histograma_imc():
+            fig2 = histogram_figure('BMI', 40, f'Distribuição do {translate_variable("BMI")}', translate_variable('BMI'))
+            fig2.add_vline(x=18.5, line_dash="dash", line_color="#95a5a6", 
+                          annotation_text="< 18.5", annotation_position="top")
+            fig2.add_vline(x=25, line_dash="dash", line_color="#7f8c8d",
+                          annotation_text="25", annotation_position="top")
+            fig2.add_vline(x=30, line_dash="dash", line_color=PRIMARY_COLOR,
+                          annotation_text="30", annotation_position="top")
+            fig2.update_traces(marker_line_color='black', marker_line_width=1.2, opacity=0.85)
+            return fig2
+
+        st.plotly_chart(cached_figure('histograma_imc', build_histograma_imc), use_container_width=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Distribuição de idade
-        fig3 = px.histogram(
-            df_filtered,
-            x='Age',
-            nbins=30,
-            title='Distribuição por idade',
-            color_discrete_sequence=[SECONDARY_COLOR],
-            labels={'Age': 'Idade', 'count': 'Frequência'}
-        )
-        fig3.update_layout(height=400, xaxis_title='Idade', yaxis_title='Frequência')
-        st.plotly_chart(fig3, use_container_width=True)
+        def build_histograma_idade():
+            return histogram_figure('Age', 30, 'Distribuição por idade', 'Idade')
+
+        st.plotly_chart(cached_figure('histograma_idade', build_histograma_idade), use_container_width=True)
     
     with col2:
-        # Boxplot de peso por obesidade (ordenado)
-        df_ordered = df_filtered.copy()
-        df_ordered['Obesidade_PT'] = df_ordered['Obesity'].apply(get_obesity_label)
-        df_ordered['Obesity_Order'] = df_ordered['Obesity'].apply(lambda x: OBESITY_ORDER.index(x) if x in OBESITY_ORDER else 999)
-        df_ordered = df_ordered.sort_values('Obesity_Order')
+        # Boxplot de peso por obesidade (ordem clínica; quartis e outliers calculados no servidor)
+        def build_boxplot_peso():
+            present_labels = get_obesity_labels(pd.Index(sorted(obesity_counts_all.index, key=obesity_order_key)))
+            rows = filtered_rows()
+            box_stats = box_statistics(rows['Weight'], rows['Obesidade_PT'])
+            palette_box = get_color_palette(len(present_labels))
         
-        fig4 = px.box(
-            df_ordered,
-            x='Obesidade_PT',
-            y='Weight',
-            title='Distribuição de peso por nível de obesidade',
-            color='Obesidade_PT',
-            color_discrete_sequence=get_color_palette(df_ordered['Obesidade_PT'].nunique())
-        )
-        fig4.update_layout(showlegend=False, height=400, xaxis_title='Nível de Obesidade', yaxis_title='Peso (kg)')
-        fig4.update_xaxes(tickangle=45)
-        st.plotly_chart(fig4, use_container_width=True)
+            fig4 = go.Figure()
+            for label, color in zip(present_labels, palette_box):
+                stats = box_stats.get(label)
+                if stats is None:
+                    continue
+                fig4.add_trace(go.Box(
+                    name=label, x=[label], q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+                    lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']],
+                    marker_color=color, boxpoints=False
+                ))
+                if len(stats['outliers']):
+                    fig4.add_trace(go.Scatter(
+                        x=[label] * len(stats['outliers']), y=stats['outliers'], mode='markers',
+                        marker_color=color, name=label, hovertemplate='Peso: %{y:.1f} kg<extra></extra>'
+                    ))
+            fig4.update_layout(title='Distribuição de peso por nível de obesidade')
+            fig4.update_layout(showlegend=False, height=400, xaxis_title='Nível de Obesidade', yaxis_title='Peso (kg)')
+            fig4.update_xaxes(tickangle=45)
+            return fig4
+
+        st.plotly_chart(cached_figure('boxplot_peso', build_boxplot_peso), use_container_width=True)
+
+def scatter_figure(x: str, y: str, title: str, hover_data: list, labels: dict):
+    """Dispersão por nível de obesidade no modo escolhido na barra lateral"""
+    patients = filtered_rows()
+    if scatter_mode == "Densidade":
+        grid = density_grid(patients[x], patients[y], patients['Obesidade_PT'])
+        counts = np.where(grid['counts'] > 0, grid['counts'], np.nan)
+        dominant = np.append(grid['classes'], '-')[grid['dominant']]
+        fig = go.Figure(go.Heatmap(
+            x=grid['x'], y=grid['y'], z=counts, customdata=dominant,
+            colorscale='Blues', colorbar=dict(title='Pacientes'),
+            hovertemplate=(f"{labels[x]}: %{{x:.2f}}<br>{labels[y]}: %{{y:.2f}}<br>"
+                           "Pacientes: %{z}<br>Predomina: %{customdata}<extra></extra>")
+        ))
+        fig.update_layout(title=f"{title} (densidade)", xaxis_title=labels[x], yaxis_title=labels[y], height=400)
+        return fig
+
+    rows = patients
+    if scatter_mode == "Amostra estratificada" or (scatter_mode == "Automático" and len(rows) > MAX_SCATTER_POINTS):
+        rows = rows.iloc[stratified_sample(rows['Obesidade_PT'], MAX_SCATTER_POINTS)]
+        if len(rows) < len(patients):
+            title = f"{title} (amostra de {len(rows):,} de {len(patients):,})"
+
+    fig = px.scatter(
+        rows,
+        x=x,
+        y=y,
+        color='Obesidade_PT',
+        title=title,
+        color_discrete_sequence=get_color_palette(rows['Obesidade_PT'].nunique()),
+        hover_data=hover_data,
+        labels=labels,
+        render_mode=scatter_render_mode(len(rows))
+    )
+    fig.update_layout(height=400)
+    return fig
 
-with tab2:
+def render_correlations():
+    """Seção Correlações: matriz de correlação e dispersões"""
     st.header("Análise de correlações")
     
     # Matriz de correlação
-    numeric_cols = df_filtered.select_dtypes(include=[np.number]).columns
-    corr_matrix = df_filtered[numeric_cols].corr()
-    
-    # Rename columns and index to Portuguese
-    corr_matrix_pt = corr_matrix.rename(columns=translate_variable, index=translate_variable)
-    
-    fig5 = px.imshow(
-        corr_matrix_pt,
-        title='Matriz de Correlação - Variáveis Numéricas',
-        color_continuous_scale='RdBu_r',
-        aspect='auto',
-        text_auto='.2f'
-    )
-    fig5.update_layout(height=600)
-    st.plotly_chart(fig5, use_container_width=True)
+    def build_correlacao():
+        corr_matrix = view.corr()
+    
+        # Rename columns and index to Portuguese
+        corr_matrix_pt = corr_matrix.set_axis(translate_variables(corr_matrix.columns), axis=1)
+        corr_matrix_pt = corr_matrix_pt.set_axis(translate_variables(corr_matrix_pt.index), axis=0)
+    
+        fig5 = px.imshow(
+            corr_matrix_pt,
+            title='Matriz de Correlação - Variáveis Numéricas',
+            color_continuous_scale='RdBu_r',
+            aspect='auto',
+            text_auto='.2f'
+        )
+        fig5.update_layout(height=600)
+        return fig5
+
+    st.plotly_chart(cached_figure('correlacao', build_correlacao), use_container_width=True)
     
     # Scatter plots
     col1, col2 = st.columns(2)
     
     with col1:
-        df_scatter = df_filtered.copy()
-        df_scatter['Obesidade'] = df_scatter['Obesity'].apply(get_obesity_label)
-        
-        fig6 = px.scatter(
-            df_scatter,
-            x='Height',
-            y='Weight',
-            color='Obesidade',
-            title='Peso vs altura por nível de obesidade',
-            color_discrete_sequence=get_color_palette(df_scatter['Obesidade'].nunique()),
-            hover_data=['Age', 'BMI'],
-            labels={'Height': 'Altura (m)', 'Weight': 'Peso (kg)', 'Age': 'Idade', 'BMI': 'IMC'}
-        )
-        fig6.update_layout(height=400)
-        st.plotly_chart(fig6, use_container_width=True)
+        def build_dispersao_peso_altura():
+            return scatter_figure(
+                'Height', 'Weight', 'Peso vs altura por nível de obesidade',
+                hover_data=['Age', 'BMI'],
+                labels={'Height': 'Altura (m)', 'Weight': 'Peso (kg)', 'Age': 'Idade', 'BMI': 'IMC', 'Obesidade_PT': 'Obesidade'}
+            )
+
+        st.plotly_chart(cached_figure(f'dispersao_peso_altura:{scatter_mode}', build_dispersao_peso_altura),
+                        use_container_width=True)
     
     with col2:
-        df_scatter2 = df_filtered.copy()
-        df_scatter2['Obesidade'] = df_scatter2['Obesity'].apply(get_obesity_label)
-        
-        fig7 = px.scatter(
-            df_scatter2,
-            x='Age',
-            y='BMI',
-            color='Obesidade',
-            title='IMC vs idade por nível de obesidade',
-            color_discrete_sequence=get_color_palette(df_scatter2['Obesidade'].nunique()),
-            hover_data=['Weight', 'Height'],
-            labels={'Age': 'Idade', 'BMI': 'IMC', 'Weight': 'Peso (kg)', 'Height': 'Altura (m)'}
-        )
-        fig7.update_layout(height=400)
-        st.plotly_chart(fig7, use_container_width=True)
-
-with tab3:
+        def build_dispersao_imc_idade():
+            return scatter_figure(
+                'Age', 'BMI', 'IMC vs idade por nível de obesidade',
+                hover_data=['Weight', 'Height'],
+                labels={'Age': 'Idade', 'BMI': 'IMC', 'Weight': 'Peso (kg)', 'Height': 'Altura (m)', 'Obesidade_PT': 'Obesidade'}
+            )
+
+        st.plotly_chart(cached_figure(f'dispersao_imc_idade:{scatter_mode}', build_dispersao_imc_idade),
+                        use_container_width=True)
+
+def render_demographics():
+    """Seção Demografia: gênero, histórico familiar e faixa etária"""
     st.header("Análise demográfica")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Obesidade por gênero
-        df_gender = df_filtered.copy()
-        df_gender['Gênero'] = df_gender['Gender'].apply(translate_value)
-        df_gender['Obesidade'] = df_gender['Obesity'].apply(get_obesity_label)
-        gender_obesity = pd.crosstab(df_gender['Gênero'], df_gender['Obesidade'], normalize='index') * 100
+        def build_obesidade_genero():
+            gender_obesity = view.crosstab('Gender', 'Obesity', normalize=True) * 100
+            gender_obesity = gender_obesity.set_axis(translate_values(gender_obesity.index), axis=0)
+            gender_obesity = gender_obesity.set_axis(get_obesity_labels(gender_obesity.columns), axis=1)
+            gender_obesity = gender_obesity.sort_index(axis=0).sort_index(axis=1)
         
-        fig8 = go.Figure()
-        palette_gender = get_color_palette(len(gender_obesity.columns))
-        for i, col in enumerate(gender_obesity.columns):
-            fig8.add_trace(go.Bar(
-                name=col,
-                x=gender_obesity.index,
-                y=gender_obesity[col],
-                marker_color=palette_gender[i],
-                text=gender_obesity[col].apply(lambda x: f'{x:.1f}%'),
-                textposition='auto'
-            ))
+            fig8 = go.Figure()
+            palette_gender = get_color_palette(len(gender_obesity.columns))
+            for i, col in enumerate(gender_obesity.columns):
+                fig8.add_trace(go.Bar(
+                    name=col,
+                    x=gender_obesity.index,
+                    y=gender_obesity[col],
+                    marker_color=palette_gender[i],
+                    text=gender_obesity[col].apply(lambda x: f'{x:.1f}%'),
+                    textposition='auto'
+                ))
         
-        fig8.update_layout(
-            title='Distribuição de Obesidade por Gênero (%)',
-            barmode='group',
-            xaxis_title='Gênero',
-            yaxis_title='Percentual (%)',
-            height=400
-        )
-        st.plotly_chart(fig8, use_container_width=True)
+            fig8.update_layout(
+                title='Distribuição de Obesidade por Gênero (%)',
+                barmode='group',
+                xaxis_title='Gênero',
+                yaxis_title='Percentual (%)',
+                height=400
+            )
+            return fig8
+
+        st.plotly_chart(cached_figure('obesidade_genero', build_obesidade_genero), use_container_width=True)
     
     with col2:
         # Histórico familiar
-        df_family = df_filtered.copy()
-        df_family['Histórico Familiar'] = df_family['family_history'].apply(translate_value)
-        df_family['Obesidade'] = df_family['Obesity'].apply(get_obesity_label)
-        family_obesity = pd.crosstab(df_family['Histórico Familiar'], df_family['Obesidade'], normalize='index') * 100
+        def build_historico_familiar():
+            family_obesity = view.crosstab('family_history', 'Obesity', normalize=True) * 100
+            family_obesity = family_obesity.set_axis(translate_values(family_obesity.index), axis=0)
+            family_obesity = family_obesity.set_axis(get_obesity_labels(family_obesity.columns), axis=1)
+            family_obesity = family_obesity.sort_index(axis=0).sort_index(axis=1)
         
-        fig9 = go.Figure()
-        palette_family = get_color_palette(len(family_obesity.columns))
-        for i, col in enumerate(family_obesity.columns):
-            fig9.add_trace(go.Bar(
-                name=col,
-                x=family_obesity.index,
-                y=family_obesity[col],
-                marker_color=palette_family[i],
-                text=family_obesity[col].apply(lambda x: f'{x:.1f}%'),
-                textposition='auto'
-            ))
+            fig9 = go.Figure()
+            palette_family = get_color_palette(len(family_obesity.columns))
+            for i, col in enumerate(family_obesity.columns):
+                fig9.add_trace(go.Bar(
+                    name=col,
+                    x=family_obesity.index,
+                    y=family_obesity[col],
+                    marker_color=palette_family[i],
+                    text=family_obesity[col].apply(lambda x: f'{x:.1f}%'),
+                    textposition='auto'
+                ))
         
-        fig9.update_layout(
-            title='Obesidade por Histórico Familiar (%)',
-            barmode='group',
-            xaxis_title='Histórico Familiar',
-            yaxis_title='Percentual (%)',
-            height=400
+            fig9.update_layout(
+                title='Obesidade por Histórico Familiar (%)',
+                barmode='group',
+                xaxis_title='Histórico Familiar',
+                yaxis_title='Percentual (%)',
+                height=400
+            )
+            return fig9
+
+        st.plotly_chart(cached_figure('historico_familiar', build_historico_familiar), use_container_width=True)
+    
+    # Faixas etárias (bins de src.filter_cube.AGE_BAND_EDGES)
+    def build_faixa_etaria():
+        age_obesity = view.crosstab('AgeBand', 'Obesity', normalize=True) * 100
+        age_obesity = age_obesity.rename_axis('Faixa Etária')
+        # Translate obesity types to Portuguese
+        age_obesity.columns = get_obesity_labels(age_obesity.columns).rename(None)
+    
+        fig10 = px.bar(
+            age_obesity,
+            title='Distribuição de obesidade por faixa etária (%)',
+            barmode='stack',
+            color_discrete_sequence=get_color_palette(age_obesity.shape[1]),
+            labels={'value': 'Percentual (%)', 'variable': 'Nível de Obesidade', 'Faixa Etária': 'Faixa Etária'}
         )
-        st.plotly_chart(fig9, use_container_width=True)
-    
-    # Faixas etárias
-    df_filtered['Faixa Etária'] = pd.cut(
-        df_filtered['Age'],
-        bins=[0, 20, 30, 40, 50, 100],
-        labels=['<20', '20-30', '30-40', '40-50', '50+']
-    )
-    
-    age_obesity = pd.crosstab(df_filtered['Faixa Etária'], df_filtered['Obesity'], normalize='index') * 100
-    # Translate obesity types to Portuguese
-    age_obesity.columns = [get_obesity_label(col) for col in age_obesity.columns]
-    
-    fig10 = px.bar(
-        age_obesity,
-        title='Distribuição de obesidade por faixa etária (%)',
-        barmode='stack',
-        color_discrete_sequence=get_color_palette(age_obesity.shape[1]),
-        labels={'value': 'Percentual (%)', 'variable': 'Nível de Obesidade', 'Faixa Etária': 'Faixa Etária'}
-    )
-    fig10.update_layout(height=400)
-    st.plotly_chart(fig10, use_container_width=True)
+        fig10.update_layout(height=400)
+        return fig10
 
-with tab4:
+    st.plotly_chart(cached_figure('faixa_etaria', build_faixa_etaria), use_container_width=True)
+
+def render_habits():
+    """Seção Hábitos de vida: atividade física, água, alimentação e transporte"""
     st.header("Hábitos de vida e comportamento")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Atividade física
-        faf_obesity = df_filtered.groupby('Obesity')['FAF'].mean().reset_index()
-        faf_obesity.columns = ['Obesidade_Cod', 'Frequência Média']
-        faf_obesity['Obesidade'] = faf_obesity['Obesidade_Cod'].apply(get_obesity_label)
-        faf_obesity['Obesity_Order'] = faf_obesity['Obesidade_Cod'].apply(
-            lambda x: OBESITY_ORDER.index(x) if x in OBESITY_ORDER else 999
-        )
-        faf_obesity = faf_obesity.sort_values('Obesity_Order')
-
-        fig11 = px.bar(
-            faf_obesity,
-            x='Obesidade',
-            y='Frequência Média',
-            title='Frequência Média de Atividade Física por Nível de Obesidade',
-            color='Frequência Média',
-            color_continuous_scale='Greens',
-            text='Frequência Média'
-        )
-        fig11.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-        fig11.update_layout(showlegend=False, height=450, margin=dict(t=80, b=80))
-        fig11.update_xaxes(tickangle=45)
-        fig11.update_yaxes(range=[0, faf_obesity['Frequência Média'].max() * 1.15])
-        st.plotly_chart(fig11, use_container_width=True)
+        def build_atividade_fisica():
+            faf_obesity = view.group_means('Obesity', 'FAF').reset_index()
+            faf_obesity.columns = ['Obesidade_Cod', 'Frequência Média']
+            faf_obesity['Obesidade'] = get_obesity_labels(faf_obesity['Obesidade_Cod'])
+            faf_obesity['Obesity_Order'] = obesity_order_codes(faf_obesity['Obesidade_Cod'])
+            faf_obesity = faf_obesity.sort_values('Obesity_Order')
+
+            fig11 = px.bar(
+                faf_obesity,
+                x='Obesidade',
+                y='Frequência Média',
+                title='Frequência Média de Atividade Física por Nível de Obesidade',
+                color='Frequência Média',
+                color_continuous_scale='Greens',
+                text='Frequência Média'
+            )
+            fig11.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+            fig11.update_layout(showlegend=False, height=450, margin=dict(t=80, b=80))
+            fig11.update_xaxes(tickangle=45)
+            fig11.update_yaxes(range=[0, faf_obesity['Frequência Média'].max() * 1.15])
+            return fig11
+
+        st.plotly_chart(cached_figure('atividade_fisica', build_atividade_fisica), use_container_width=True)
     
     with col2:
         # Consumo de água
-        ch2o_obesity = df_filtered.groupby('Obesity')['CH2O'].mean().reset_index()
-        ch2o_obesity.columns = ['Obesidade_Cod', 'Consumo Médio']
-        ch2o_obesity['Obesidade'] = ch2o_obesity['Obesidade_Cod'].apply(get_obesity_label)
-        ch2o_obesity['Obesity_Order'] = ch2o_obesity['Obesidade_Cod'].apply(
-            lambda x: OBESITY_ORDER.index(x) if x in OBESITY_ORDER else 999
-        )
-        ch2o_obesity = ch2o_obesity.sort_values('Obesity_Order')
-
-        fig12 = px.bar(
-            ch2o_obesity,
-            x='Obesidade',
-            y='Consumo Médio',
-            title='Consumo Médio de Água por Nível de Obesidade',
-            color='Consumo Médio',
-            color_continuous_scale='Blues',
-            text='Consumo Médio'
-        )
-        fig12.update_traces(texttemplate='%{text:.2f}L', textposition='outside')
-        fig12.update_layout(showlegend=False, height=450, margin=dict(t=80, b=80))
-        fig12.update_xaxes(tickangle=45)
-        fig12.update_yaxes(range=[0, ch2o_obesity['Consumo Médio'].max() * 1.15])
-        st.plotly_chart(fig12, use_container_width=True)
+        def build_consumo_agua():
+            ch2o_obesity = view.group_means('Obesity', 'CH2O').reset_index()
+            ch2o_obesity.columns = ['Obesidade_Cod', 'Consumo Médio']
+            ch2o_obesity['Obesidade'] = get_obesity_labels(ch2o_obesity['Obesidade_Cod'])
+            ch2o_obesity['Obesity_Order'] = obesity_order_codes(ch2o_obesity['Obesidade_Cod'])
+            ch2o_obesity = ch2o_obesity.sort_values('Obesity_Order')
+
+            fig12 = px.bar(
+                ch2o_obesity,
+                x='Obesidade',
+                y='Consumo Médio',
+                title='Consumo Médio de Água por Nível de Obesidade',
+                color='Consumo Médio',
+                color_continuous_scale='Blues',
+                text='Consumo Médio'
+            )
+            fig12.update_traces(texttemplate='%{text:.2f}L', textposition='outside')
+            fig12.update_layout(showlegend=False, height=450, margin=dict(t=80, b=80))
+            fig12.update_xaxes(tickangle=45)
+            fig12.update_yaxes(range=[0, ch2o_obesity['Consumo Médio'].max() * 1.15])
+            return fig12
+
+        st.plotly_chart(cached_figure('consumo_agua', build_consumo_agua), use_container_width=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Alimentos calóricos
-        df_favc = df_filtered.copy()
-        df_favc['Alimentos Calóricos'] = df_favc['FAVC'].apply(translate_value)
-        df_favc['Obesidade'] = df_favc['Obesity'].apply(get_obesity_label)
-        favc_obesity = pd.crosstab(df_favc['Alimentos Calóricos'], df_favc['Obesity'], normalize='index') * 100
-
-        # Ordenar colunas de obesidade conforme OBESITY_ORDER e garantir rótulos em português
-        obesity_cols_ordered = [get_obesity_label(x) for x in OBESITY_ORDER if get_obesity_label(x) in favc_obesity.columns]
-        favc_obesity = favc_obesity[obesity_cols_ordered]
+        def build_alimentos_caloricos():
+            favc_obesity = view.crosstab('FAVC', 'Obesity', normalize=True) * 100
+            favc_obesity = favc_obesity.set_axis(translate_values(favc_obesity.index), axis=0).sort_index()
+
+            # Ordenar colunas de obesidade conforme OBESITY_ORDER e garantir rótulos em português
+            favc_obesity = favc_obesity.sort_index(axis=1, key=obesity_order_codes)
+            favc_obesity.columns = get_obesity_labels(favc_obesity.columns)
         
-        fig13 = go.Figure()
-        palette_favc = get_color_palette(len(favc_obesity.columns))
-        for i, col in enumerate(favc_obesity.columns):
-            fig13.add_trace(go.Bar(
-                name=col,
-                x=favc_obesity.index,
-                y=favc_obesity[col],
-                marker_color=palette_favc[i],
-                text=favc_obesity[col].apply(lambda x: f'{x:.1f}%'),
-                textposition='auto'
-            ))
+            fig13 = go.Figure()
+            palette_favc = get_color_palette(len(favc_obesity.columns))
+            for i, col in enumerate(favc_obesity.columns):
+                fig13.add_trace(go.Bar(
+                    name=col,
+                    x=favc_obesity.index,
+                    y=favc_obesity[col],
+                    marker_color=palette_favc[i],
+                    text=favc_obesity[col].apply(lambda x: f'{x:.1f}%'),
+                    textposition='auto'
+                ))
         
-        fig13.update_layout(
-            title='Consumo de Alimentos Calóricos vs Obesidade (%)',
-            barmode='group',
-            xaxis_title='Consome Alimentos Calóricos',
-            yaxis_title='Percentual (%)',
-            height=400
-        )
-        st.plotly_chart(fig13, use_container_width=True)
+            fig13.update_layout(
+                title='Consumo de Alimentos Calóricos vs Obesidade (%)',
+                barmode='group',
+                xaxis_title='Consome Alimentos Calóricos',
+                yaxis_title='Percentual (%)',
+                height=400
+            )
+            return fig13
+
+        st.plotly_chart(cached_figure('alimentos_caloricos', build_alimentos_caloricos), use_container_width=True)
     
     with col2:
         # Meio de transporte
-        df_mtrans = df_filtered.copy()
-        df_mtrans['Transporte'] = df_mtrans['MTRANS'].apply(translate_value)
-        df_mtrans['Obesidade'] = df_mtrans['Obesity'].apply(get_obesity_label)
-        mtrans_counts = df_mtrans.groupby(['Transporte', 'Obesidade']).size().reset_index(name='Quantidade')
+        def build_transporte():
+            mtrans_counts = view.crosstab('MTRANS', 'Obesity').stack().reset_index(name='Quantidade')
+            mtrans_counts = mtrans_counts[mtrans_counts['Quantidade'] > 0]
+            mtrans_counts = pd.DataFrame({
+                'Transporte': translate_values(mtrans_counts['MTRANS']),
+                'Obesidade': get_obesity_labels(mtrans_counts['Obesity']),
+                'Quantidade': mtrans_counts['Quantidade']
+            }).sort_values(['Transporte', 'Obesidade'], ignore_index=True)
         
-        fig14 = px.sunburst(
-            mtrans_counts,
-            path=['Transporte', 'Obesidade'],
-            values='Quantidade',
-            title='Meio de Transporte por Nível de Obesidade',
-            color_discrete_sequence=get_color_palette(mtrans_counts['Transporte'].nunique())
-        )
-        fig14.update_layout(height=400)
-        st.plotly_chart(fig14, use_container_width=True)
-
-with tab5:
+            fig14 = px.sunburst(
+                mtrans_counts,
+                path=['Transporte', 'Obesidade'],
+                values='Quantidade',
+                title='Meio de Transporte por Nível de Obesidade',
+                color_discrete_sequence=get_color_palette(mtrans_counts['Transporte'].nunique())
+            )
+            fig14.update_layout(height=400)
+            return fig14
+
+        st.plotly_chart(cached_figure('transporte', build_transporte), use_container_width=True)
+
+def render_model():
+    """Seção Modelo de ML: métricas e risco por atividade física"""
     st.header("Desempenho do modelo de ML")
 
     if metrics:
@@ -490,41 +718,92 @@ with tab5:
     else:
         st.info("Métricas do modelo não disponíveis nesta sessão.")
 
+    evaluation = load_model_evaluation()
+    if evaluation:
+        st.markdown("---")
+        st.subheader("Avaliação dos modelos (teste e out-of-fold)")
+        st.caption(
+            f"Cada um dos {evaluation['n_folds']} folds foi ajustado uma única vez; as métricas out-of-fold (OOF) "
+            f"usam as predições de cada paciente do treino ({evaluation['n_train']:,}) pelo modelo que não o viu, "
+            f"e as de teste, os {evaluation['n_test']:,} pacientes separados."
+        )
+        st.dataframe(evaluation_table(evaluation).round(2), use_container_width=True, hide_index=True)
+
+        models = evaluation['models']
+        default_model = evaluation['selected_model'] if evaluation['selected_model'] in models else models[0]
+        col1, col2 = st.columns(2)
+        with col1:
+            model_name = st.selectbox("Modelo avaliado", models, index=models.index(default_model))
+        with col2:
+            split_label = st.radio("Conjunto", ["Out-of-fold (treino)", "Teste"], horizontal=True)
+        summary = evaluation['metrics'][model_name]['oof' if split_label.startswith('Out') else 'holdout']
+
+        # Classes na ordem clínica, com rótulos em português
+        order = [evaluation['class_names'].index(cls) for cls in OBESITY_ORDER if cls in evaluation['class_names']]
+        labels = [get_obesity_label(evaluation['class_names'][i]) for i in order]
+        cm = summary['confusion_matrix'][np.ix_(order, order)]
+
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            fig_cm = px.imshow(
+                cm, x=labels, y=labels, text_auto=True, color_continuous_scale='Blues',
+                labels={'x': 'Classe prevista', 'y': 'Classe real', 'color': 'Pacientes'},
+                title=f'Matriz de confusão - {model_name}'
+            )
+            fig_cm.update_layout(height=480, margin=dict(t=80, b=80), coloraxis_showscale=False)
+            st.plotly_chart(fig_cm, use_container_width=True)
+        with col2:
+            class_accuracy = pd.DataFrame({
+                'Classe': labels,
+                'Acurácia (%)': summary['class_accuracy'][order] * 100
+            })
+            fig_class = px.bar(
+                class_accuracy, x='Acurácia (%)', y='Classe', orientation='h',
+                title='Acurácia por classe', text='Acurácia (%)',
+                color_discrete_sequence=[PRIMARY_COLOR]
+            )
+            fig_class.update_traces(texttemplate='%{text:.1f}%', textposition='inside')
+            fig_class.update_layout(height=480, margin=dict(t=80, b=80), yaxis={'autorange': 'reversed'})
+            st.plotly_chart(fig_class, use_container_width=True)
+
+        st.caption(
+            f"Acurácia {summary['accuracy']:.2%} · F1 ponderado {summary['f1_score']:.2%} · "
+            f"log loss {summary['log_loss']:.3f} · avaliação de {evaluation['created_at']}"
+        )
+
     st.markdown("---")
     st.subheader("Risco de obesidade por nível de atividade física")
 
-    # Análise adicional: taxa de obesidade por faixa de FAF
-    faf_risk_df = df_filtered.copy()
-    faf_risk_df['Faixa_FAF'] = pd.cut(
-        faf_risk_df['FAF'],
-        bins=[-0.1, 0, 1, 2, faf_risk_df['FAF'].max() + 0.1],
-        labels=['0 dias/sem', '0-1 dia/sem', '1-2 dias/sem', '≥2 dias/sem']
-    )
+    # Análise adicional: taxa de obesidade por faixa de FAF (src.filter_cube.FAF_BAND_LABELS)
+    def build_risco_atividade_fisica():
+        faf_counts = view.crosstab('FAFBand', 'Obesity')
+        is_obese = faf_counts.columns.str.contains('Obesity')
+        # Faixas sem pacientes continuam no eixo, com taxa indefinida
+        obese_share = (faf_counts.loc[:, is_obese].sum(axis=1) / faf_counts.sum(axis=1)).reindex(FAF_BAND_LABELS)
+        obesity_by_faf = pd.DataFrame({
+            'Faixa_FAF': pd.Categorical(FAF_BAND_LABELS, categories=FAF_BAND_LABELS, ordered=True),
+            'Obeso': obese_share.to_numpy()
+        })
+        obesity_by_faf['Taxa_Obesidade_%'] = obesity_by_faf['Obeso'] * 100
+
+        fig_faf = px.bar(
+            obesity_by_faf,
+            x='Faixa_FAF',
+            y='Taxa_Obesidade_%',
+            title='Taxa de obesidade por frequência de atividade física',
+            color='Taxa_Obesidade_%',
+            color_continuous_scale='Reds',
+            labels={
+                'Faixa_FAF': 'Frequência de atividade física (FAF)',
+                'Taxa_Obesidade_%': 'Taxa de obesidade (%)'
+            },
+            text='Taxa_Obesidade_%'
+        )
+        fig_faf.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+        fig_faf.update_layout(showlegend=False, height=420, margin=dict(t=80, b=80))
+        return fig_faf, obesity_by_faf
 
-    obesity_by_faf = (
-        faf_risk_df
-        .assign(Obeso=faf_risk_df['Obesity'].str.contains('Obesity'))
-        .groupby('Faixa_FAF')['Obeso']
-        .mean()
-        .reset_index()
-    )
-    obesity_by_faf['Taxa_Obesidade_%'] = obesity_by_faf['Obeso'] * 100
-
-    fig_faf = px.bar(
-        obesity_by_faf,
-        x='Faixa_FAF',
-        y='Taxa_Obesidade_%',
-        title='Taxa de obesidade por frequência de atividade física',
-        color='Taxa_Obesidade_%',
-        color_continuous_scale='Reds',
-        labels={
-            'Faixa_FAF': 'Frequência de atividade física (FAF)',
-            'Taxa_Obesidade_%': 'Taxa de obesidade (%)'
-        },
-        text='Taxa_Obesidade_%'
-    )
-    fig_faf.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-    fig_faf.update_layout(showlegend=False, height=420, margin=dict(t=80, b=80))
+    fig_faf, obesity_by_faf = cached_figure('risco_atividade_fisica', build_risco_atividade_fisica)
     st.plotly_chart(fig_faf, use_container_width=True)
 
     # Texto interpretativo simples
@@ -551,6 +830,35 @@ with tab5:
             "Ajuste os filtros à esquerda para visualizar melhor esse efeito."
         )
 
+SECTIONS = {
+    "Distribuições": render_distributions,
+    "Correlações": render_correlations,
+    "Demografia": render_demographics,
+    "Hábitos de vida": render_habits,
+    "Modelo de ML": render_model
+}
+
+# Modo preguiçoso: um seletor no lugar de st.tabs, que executaria as cinco seções
+lazy_sections = st.sidebar.checkbox(
+    "Calcular apenas a seção aberta",
+    value=True,
+    help="Desmarque para voltar às abas, que calculam todas as seções a cada interação"
+)
+section_timer = StartupTimer()
+if lazy_sections:
+    active_section = st.radio("Seção", list(SECTIONS), horizontal=True, label_visibility='collapsed')
+    SECTIONS[active_section]()
+    section_timer.mark(active_section)
+else:
+    for tab, (section, render) in zip(st.tabs(list(SECTIONS)), SECTIONS.items()):
+        with tab:
+            render()
+        section_timer.mark(section)
+
+# Último tempo medido de cada seção nesta sessão (mostra quanto o modo preguiçoso evita)
+section_times = st.session_state.setdefault('_section_times_ms', {})
+section_times.update(section_timer.report()['phases_ms'])
+
 # Insights e Recomendações
 st.markdown("---")
 st.header("💡 Insights e Recomendações")
@@ -560,11 +868,12 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("📊 Principais Descobertas")
     
+    gender_counts = view.value_counts('Gender')
     insights = [
         f"• **Taxa de Obesidade:** {obesity_rate:.1f}% dos pacientes apresentam algum tipo de obesidade",
         f"• **IMC Médio:** {avg_bmi:.2f} - {'Normal' if 18.5 <= avg_bmi < 25 else 'Acima do normal' if avg_bmi >= 25 else 'Abaixo do normal'}",
         f"• **Idade Média:** {avg_age:.1f} anos",
-        f"• **Gênero Predominante:** {translate_value(df_filtered['Gender'].mode()[0])}"
+        f"• **Gênero Predominante:** {translate_value(gender_counts.idxmax()) if len(gender_counts) else '-'}"
     ]
     
     for insight in insights:
@@ -574,13 +883,13 @@ with col1:
     st.markdown("**Fatores de Risco Identificados:**")
     risk_factors = []
     
-    if df_filtered['family_history'].value_counts().get('yes', 0) > len(df_filtered) * 0.5:
+    if view.value_counts('family_history').get('yes', 0) > n_patients * 0.5:
         risk_factors.append("• Alta prevalência de histórico familiar")
     
-    if df_filtered['FAF'].mean() < 1.5:
+    if view.mean('FAF') < 1.5:
         risk_factors.append("• Baixa frequência de atividade física")
     
-    if df_filtered['FAVC'].value_counts().get('yes', 0) > len(df_filtered) * 0.5:
+    if view.value_counts('FAVC').get('yes', 0) > n_patients * 0.5:
         risk_factors.append("• Alto consumo de alimentos calóricos")
     
     for risk in risk_factors:
@@ -610,3 +919,25 @@ st.markdown("""
     <p>Dashboard Analítico de Obesidade | Desenvolvido usando Streamlit</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Tempo até a primeira renderização desta sessão
+startup_report = report_first_render(st.session_state, timer, 'app_dashboard')
+st.sidebar.caption(f"⏱️ Primeira renderização: {startup_report['total_ms']:.0f} ms")
+
+# Tempo por seção: medido nesta execução ou na última vez em que a seção foi calculada
+skipped_ms = sum(ms for section, ms in section_times.items() if section not in section_timer.phases)
+st.sidebar.caption(
+    "⏱️ Seções: " + ", ".join(
+        f"{section} {section_times[section]:.0f} ms" + ("" if section in section_timer.phases else " (não calculada)")
+        for section in SECTIONS if section in section_times
+    ) + (f" · {skipped_ms:.0f} ms evitados nesta execução" if skipped_ms else "")
+)
+
+# Uso do cache de figuras (para dimensionar o orçamento de memória)
+cache_stats = figure_cache.stats()
+st.sidebar.caption(
+    f"🗂️ Cache de gráficos: {cache_stats['hits']} acertos, {cache_stats['misses']} falhas "
+    f"({cache_stats['hit_rate']:.0%}), {cache_stats['bytes'] / 2**20:.1f} de "
+    f"{cache_stats['max_bytes'] / 2**20:.0f} MB"
+)
+st.sidebar.caption(f"🗄️ Agregações: {'banco SQLite' if analytics.name == 'sqlite' else 'cubo em memória'}")
@@ -0,0 +1,517 @@
+"""
+Fontes de Agregação do Dashboard
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+O dashboard pede indicadores, contagens, tabelas cruzadas, médias por
+grupo, histogramas e a matriz de correlação a uma "fonte analítica"
+(AnalyticsSource), sem saber onde os dados estão. Para cada estado dos filtros da barra lateral, source.view() devolve
+uma visão (AnalyticsView) que responde a essas consultas.
+
+Há duas implementações:
+    CubeSource    Cubos de agregados em memória (src.filter_cube), somados
+                  célula a célula; padrão do dashboard.
+    SQLiteSource  Banco SQLite local com a tabela de pacientes e índices em
+                  Gender, Age e Obesity; cada consulta vira um SELECT com
+                  GROUP BY. Para implantações em que a tabela não cabe em um
+                  DataFrame do processo: SQLiteView.rows devolve apenas as
+                  linhas do filtro, para os gráficos por paciente.
+
+As duas devolvem os mesmos objetos pandas (mesmos índices, ordem e tipos),
+então a escolha é feita pela variável de ambiente ANALYTICS_BACKEND
+('cube' ou 'sqlite') sem mudar o código das seções.
+
+Uso (a partir da raiz do projeto):
+    python -m src.analytics_source build
+    python -m src.analytics_source benchmark --repeat 100
+"""
+
+import abc
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.artifact_io import SCHEMA_VERSIONS, sha256_file
+from src.dataset_cache import CACHE_DIR, DATA_PATH
+from src.filter_cube import (
+    AGE_BAND_EDGES, AGE_BAND_LABELS, CATEGORY_DIMS, FAF_BAND_EDGES, FAF_BAND_LABELS,
+    FilterCube, HistogramCube, MomentCube, comoment_corr
+)
+from src.model_artifacts import NUMERICAL_COLS
+from src.streaming import HISTOGRAM_BIN_WIDTHS
+
+SCHEMA_VERSION = SCHEMA_VERSIONS['analytics_source']
+
+TABLE = 'patients'
+
+# Linhas por INSERT na carga do banco
+LOAD_CHUNKSIZE = 50_000
+
+# Faixas derivadas: código da faixa calculado em SQL (NULL fora das faixas),
+# mesmas regras de src.filter_cube (intervalos fechados à direita)
+DERIVED_DIMS = {
+    'AgeBand': (
+        "CASE " + " ".join(f"WHEN Age > {low} AND Age <= {high} THEN {i}"
+                           for i, (low, high) in enumerate(zip(AGE_BAND_EDGES[:-1], AGE_BAND_EDGES[1:]))) + " END",
+        AGE_BAND_LABELS
+    ),
+    'FAFBand': (
+        "CASE " + " ".join(f"WHEN FAF <= {edge} THEN {i}" for i, edge in enumerate(FAF_BAND_EDGES)) +
+        f" ELSE {len(FAF_BAND_EDGES)} END",
+        FAF_BAND_LABELS
+    )
+}
+
+
+class AnalyticsView(abc.ABC):
+    """Consultas do dashboard sobre os pacientes de um estado dos filtros"""
+
+    @abc.abstractmethod
+    def total(self) -> int:
+        """Número de pacientes"""
+
+    @abc.abstractmethod
+    def mean(self, measure: str) -> float:
+        """Média de uma variável numérica (NaN se não houver pacientes)"""
+
+    @abc.abstractmethod
+    def value_counts(self, dim: str) -> pd.Series:
+        """Equivalente a value_counts().sort_index() da coluna (apenas categorias presentes)"""
+
+    @abc.abstractmethod
+    def group_means(self, dim: str, measure: str) -> pd.Series:
+        """Equivalente a groupby(dim)[measure].mean() (apenas categorias presentes)"""
+
+    @abc.abstractmethod
+    def crosstab(self, row: str, col: str, normalize: bool = False) -> pd.DataFrame:
+        """Equivalente a pd.crosstab(df[row], df[col], normalize='index' se normalize)"""
+
+    @abc.abstractmethod
+    def histogram(self, measure: str) -> tuple:
+        """
+        Tupla (contagens, bordas) nos intervalos de HISTOGRAM_BIN_WIDTHS, como
+        HistogramCube.histogram (faixa de intervalos de todos os pacientes)
+        """
+
+    @abc.abstractmethod
+    def corr(self) -> pd.DataFrame:
+        """Equivalente a df[NUMERICAL_COLS].corr() (Pearson)"""
+
+
+class AnalyticsSource(abc.ABC):
+    """Origem dos agregados do dashboard"""
+
+    name = None
+
+    @abc.abstractmethod
+    def view(self, genders, age_range: tuple, obesity) -> AnalyticsView:
+        """
+        Visão dos pacientes que atendem aos filtros da barra lateral.
+
+        Args:
+            genders: Gêneros selecionados
+            age_range: Tupla (mínimo, máximo) de idades, inclusiva
+            obesity: Classes de obesidade selecionadas
+        """
+
+
+# ============================================================================
+# CUBO EM MEMÓRIA
+# ============================================================================
+
+class CubeView(AnalyticsView):
+    """Células dos cubos selecionadas pelos filtros"""
+
+    def __init__(self, source: 'CubeSource', filters: tuple):
+        self.source = source
+        self.filters = filters
+        self.cube = source.cube
+        self.mask = source.cube.mask(*filters)
+
+    def total(self) -> int:
+        return self.cube.total(self.mask)
+
+    def mean(self, measure: str) -> float:
+        return self.cube.mean(measure, self.mask)
+
+    def value_counts(self, dim: str) -> pd.Series:
+        return self.cube.value_counts(dim, self.mask)
+
+    def group_means(self, dim: str, measure: str) -> pd.Series:
+        return self.cube.group_means(dim, measure, self.mask)
+
+    def crosstab(self, row: str, col: str, normalize: bool = False) -> pd.DataFrame:
+        return self.cube.crosstab(row, col, self.mask, normalize)
+
+    def histogram(self, measure: str) -> tuple:
+        histogram = self.source.histograms[measure]
+        return histogram.histogram(histogram.mask(*self.filters))
+
+    def corr(self) -> pd.DataFrame:
+        moments = self.source.moments
+        return moments.corr(moments.mask(*self.filters))
+
+
+class CubeSource(AnalyticsSource):
+    """
+    Agregados em memória.
+
+    Attributes:
+        cube: FilterCube (contagens, médias e tabelas cruzadas)
+        moments: MomentCube (matriz de correlação)
+        histograms: HistogramCube por variável
+    """
+
+    name = 'cube'
+
+    def __init__(self, cube: FilterCube, moments: MomentCube = None, histograms: dict = None):
+        self.cube = cube
+        self.moments = moments
+        self.histograms = histograms or {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'CubeSource':
+        """Cubos calculados de uma vez sobre as linhas"""
+        histograms = {measure: HistogramCube.from_frame(df, measure, width)
+                      for measure, width in HISTOGRAM_BIN_WIDTHS.items()}
+        return cls(FilterCube.from_frame(df), MomentCube.from_frame(df), histograms)
+
+    def view(self, genders, age_range: tuple, obesity) -> CubeView:
+        return CubeView(self, (genders, age_range, obesity))
+
+
+# ============================================================================
+# SQLITE
+# ============================================================================
+
+def database_path(source: str = DATA_PATH, cache_dir: str = None) -> str:
+    """Banco SQLite de um CSV (data/cache/<nome sem extensão>.sqlite)"""
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_dir or CACHE_DIR, f'{name}.sqlite')
+
+
+def _read_meta(path: str) -> dict:
+    """Metadados do banco, ou None se ausente ou de outra versão do esquema"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with sqlite3.connect(f'file:{path}?mode=ro', uri=True) as conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    except sqlite3.DatabaseError:
+        return None
+    return meta if meta.get('schema_version') == str(SCHEMA_VERSION) else None
+
+
+def build_database(source: str = DATA_PATH, path: str = None, frame: pd.DataFrame = None) -> dict:
+    """
+    Carrega o CSV em um banco SQLite com índices em Gender, Age e Obesity.
+
+    O banco é gravado em um arquivo temporário ao lado do destino e só então
+    substitui o anterior, para que leitores nunca vejam uma carga pela metade.
+
+    Args:
+        source: CSV de pacientes (colunas de Obesity.csv)
+        path: Arquivo do banco (padrão: data/cache/<nome do CSV>.sqlite)
+        frame: Pacientes já carregados (ex.: benchmark); dispensa a leitura do CSV
+
+    Returns:
+        Metadados gravados na tabela meta
+    """
+    path = path or database_path(source)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    staging = f"{path}.tmp-{os.getpid()}"
+    if os.path.exists(staging):
+        os.remove(staging)
+
+    chunks = [frame] if frame is not None else pd.read_csv(source, chunksize=LOAD_CHUNKSIZE)
+    n_rows = 0
+    with sqlite3.connect(staging) as conn:
+        for chunk in chunks:
+            if 'BMI' not in chunk:
+                chunk = chunk.assign(BMI=chunk['Weight'] / (chunk['Height'] ** 2))
+            chunk.to_sql(TABLE, conn, if_exists='append', index=False, chunksize=LOAD_CHUNKSIZE)
+            n_rows += len(chunk)
+        for col in ['Gender', 'Age', 'Obesity']:
+            conn.execute(f"CREATE INDEX idx_{TABLE}_{col.lower()} ON {TABLE} ({col})")
+        conn.execute("ANALYZE")
+
+        meta = {'schema_version': str(SCHEMA_VERSION), 'n_rows': str(n_rows),
+                'created_at': datetime.datetime.now().isoformat(timespec='seconds')}
+        if frame is None:
+            stat = os.stat(source)
+            meta.update(source=os.path.basename(source), sha256=sha256_file(source),
+                        size=str(stat.st_size), mtime_ns=str(stat.st_mtime_ns))
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+    conn.close()
+
+    os.replace(staging, path)
+    return meta
+
+
+def ensure_database(source: str = DATA_PATH, path: str = None, force: bool = False) -> tuple:
+    """
+    Garante um banco atualizado para o CSV (refeito apenas se o SHA-256 mudou).
+
+    Returns:
+        Tupla (metadados, refeito)
+    """
+    path = path or database_path(source)
+    meta = None if force else _read_meta(path)
+    if meta is not None and meta.get('sha256'):
+        stat = os.stat(source)
+        if (meta['size'], meta['mtime_ns']) == (str(stat.st_size), str(stat.st_mtime_ns)):
+            return meta, False
+        if sha256_file(source) == meta['sha256']:
+            return meta, False
+    return build_database(source, path), True
+
+
+def _labels(dim: str, values: list) -> pd.Index:
+    """Rótulos no mesmo formato de FilterCube.labels (faixas como categóricas ordenadas)"""
+    if dim in DERIVED_DIMS:
+        categories = list(DERIVED_DIMS[dim][1])
+        return pd.CategoricalIndex([categories[code] for code in values], categories=categories,
+                                   ordered=True, name=dim)
+    return pd.Index(values, name=dim)
+
+
+class SQLiteView(AnalyticsView):
+    """Consultas SQL com o WHERE dos filtros"""
+
+    def __init__(self, source: 'SQLiteSource', where: str, params: list):
+        self.source = source
+        self.where = where
+        self.params = params
+
+    def _query(self, select: str, group_by: str = None, dims: list = ()) -> list:
+        # Categoria ausente (NULL) fica fora das contagens por grupo, como no cubo
+        where = self.where + "".join(f" AND {expression} IS NOT NULL" for expression in dims)
+        sql = f"SELECT {select} FROM {TABLE} WHERE {where}"
+        if group_by:
+            sql += f" GROUP BY {group_by} ORDER BY {group_by}"
+        return self.source.execute(sql, self.params)
+
+    def total(self) -> int:
+        return int(self._query("COUNT(*)")[0][0])
+
+    def mean(self, measure: str) -> float:
+        value = self._query(f"AVG({self.source.column(measure)})")[0][0]
+        return float('nan') if value is None else float(value)
+
+    def value_counts(self, dim: str) -> pd.Series:
+        expression = self.source.column(dim)
+        rows = self._query(f"{expression}, COUNT(*)", "1", [expression])
+        return pd.Series([count for _, count in rows], index=_labels(dim, [value for value, _ in rows]),
+                         name='count', dtype=np.int64)
+
+    def group_means(self, dim: str, measure: str) -> pd.Series:
+        expression = self.source.column(dim)
+        rows = self._query(f"{expression}, AVG({self.source.column(measure)})", "1", [expression])
+        return pd.Series([mean for _, mean in rows], index=_labels(dim, [value for value, _ in rows]),
+                         name=measure, dtype=float)
+
+    def crosstab(self, row: str, col: str, normalize: bool = False) -> pd.DataFrame:
+        row_expression, col_expression = self.source.column(row), self.source.column(col)
+        rows = self._query(f"{row_expression}, {col_expression}, COUNT(*)", "1, 2",
+                           [row_expression, col_expression])
+        row_values = sorted({r for r, _, _ in rows})
+        col_values = sorted({c for _, c, _ in rows})
+        table = np.zeros((len(row_values), len(col_values)), dtype=np.int64)
+        row_index = {value: i for i, value in enumerate(row_values)}
+        col_index = {value: j for j, value in enumerate(col_values)}
+        for r, c, count in rows:
+            table[row_index[r], col_index[c]] = count
+        if normalize:
+            table = table / table.sum(axis=1, keepdims=True)
+        return pd.DataFrame(table, index=_labels(row, row_values), columns=_labels(col, col_values))
+
+    def histogram(self, measure: str) -> tuple:
+        # Uma passada por todos os pacientes com valor: os intervalos cobrem a
+        # faixa do dataset inteiro (como no cubo) e só os do filtro são contados
+        expression, width = self.source.column(measure), repr(float(self.source.bin_widths[measure]))
+        ratio = f"{expression} / {width}"
+        bin_expression = f"CAST({ratio} AS INTEGER) - ({ratio} < CAST({ratio} AS INTEGER))"
+        rows = self.source.execute(
+            f"SELECT {bin_expression}, COUNT(CASE WHEN {self.where} THEN 1 END) FROM {TABLE} "
+            f"WHERE {expression} IS NOT NULL GROUP BY 1 ORDER BY 1", self.params
+        )
+        first_bin = rows[0][0] if rows else 0
+        counts = np.zeros(rows[-1][0] - first_bin + 1 if rows else 0, dtype=np.int64)
+        for bin_index, count in rows:
+            counts[bin_index - first_bin] = count
+        edges = (first_bin + np.arange(len(counts) + 1)) * float(width)
+        return counts, edges
+
+    def corr(self) -> pd.DataFrame:
+        # Duas passadas, como MomentCube: médias e, depois, somas dos produtos dos desvios
+        columns = list(NUMERICAL_COLS)
+        n, *means = self._query("COUNT(*), " + ", ".join(f"AVG({col})" for col in columns))[0]
+        if n == 0:
+            return comoment_corr(np.zeros((len(columns), len(columns))), columns)
+        deviations = [f"({col} - {0.0 if mean is None else float(mean)!r})" for col, mean in zip(columns, means)]
+        pairs = [(i, j) for i in range(len(columns)) for j in range(i, len(columns))]
+        sums = self._query(", ".join(f"SUM({deviations[i]} * {deviations[j]})" for i, j in pairs))[0]
+        comoment = np.empty((len(columns), len(columns)))
+        for (i, j), value in zip(pairs, sums):
+            comoment[i, j] = comoment[j, i] = np.nan if value is None else value
+        return comoment_corr(comoment, columns)
+
+    def rows(self, columns: list) -> pd.DataFrame:
+        """Colunas dos pacientes do filtro, na ordem do CSV (para os gráficos por paciente)"""
+        expressions = ", ".join(self.source.column(col) for col in columns)
+        rows = self.source.execute(f"SELECT {expressions} FROM {TABLE} WHERE {self.where} ORDER BY rowid", self.params)
+        return pd.DataFrame(rows, columns=columns)
+
+
+class SQLiteSource(AnalyticsSource):
+    """
+    Agregados calculados pelo SQLite.
+
+    Cada consulta abre uma conexão somente leitura: as threads das sessões do
+    Streamlit não compartilham conexões.
+    """
+
+    name = 'sqlite'
+
+    COLUMNS = set(CATEGORY_DIMS) | set(NUMERICAL_COLS)
+
+    def __init__(self, path: str, bin_widths: dict = None):
+        self.path = path
+        self.bin_widths = bin_widths or HISTOGRAM_BIN_WIDTHS
+
+    def execute(self, sql: str, params: list = ()) -> list:
+        with sqlite3.connect(f'file:{self.path}?mode=ro', uri=True) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        conn.close()
+        return rows
+
+    def column(self, name: str) -> str:
+        """Expressão SQL de uma coluna ou faixa derivada (apenas nomes conhecidos)"""
+        if name in DERIVED_DIMS:
+            return DERIVED_DIMS[name][0]
+        if name not in self.COLUMNS:
+            raise ValueError(f"Coluna desconhecida: {name}")
+        return name
+
+    def categories(self, dim: str) -> list:
+        """Valores distintos de uma coluna categórica, em ordem (opções dos filtros)"""
+        expression = self.column(dim)
+        return [value for value, in self.execute(
+            f"SELECT DISTINCT {expression} FROM {TABLE} WHERE {expression} IS NOT NULL ORDER BY 1")]
+
+    def bounds(self, measure: str) -> tuple:
+        """Tupla (mínimo, máximo) de uma variável numérica"""
+        expression = self.column(measure)
+        return tuple(self.execute(f"SELECT MIN({expression}), MAX({expression}) FROM {TABLE}")[0])
+
+    def view(self, genders, age_range: tuple, obesity) -> SQLiteView:
+        genders, obesity = [str(value) for value in genders], [str(value) for value in obesity]
+        conditions = [
+            f"Gender IN ({', '.join('?' * len(genders))})" if genders else "0",
+            "Age >= ? AND Age <= ?",
+            f"Obesity IN ({', '.join('?' * len(obesity))})" if obesity else "0"
+        ]
+        params = genders + [float(age_range[0]), float(age_range[1])] + obesity
+        return SQLiteView(self, " AND ".join(conditions), params)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def dashboard_queries(view: AnalyticsView) -> dict:
+    """Consultas que o dashboard faz a cada estado dos filtros"""
+    results = {
+        'total': view.total(),
+        'mean_Age': view.mean('Age'),
+        'mean_BMI': view.mean('BMI'),
+        'mean_FAF': view.mean('FAF'),
+        'group_means_FAF': view.group_means('Obesity', 'FAF'),
+        'group_means_CH2O': view.group_means('Obesity', 'CH2O'),
+        'corr': view.corr()
+    }
+    for measure in HISTOGRAM_BIN_WIDTHS:
+        results[f'histogram_{measure}'] = view.histogram(measure)
+    for dim in ['Obesity', 'Gender', 'family_history', 'FAVC']:
+        results[f'value_counts_{dim}'] = view.value_counts(dim)
+    for dim in ['Gender', 'family_history', 'AgeBand', 'FAVC', 'MTRANS', 'FAFBand']:
+        results[f'crosstab_{dim}'] = view.crosstab(dim, 'Obesity', normalize=dim != 'MTRANS')
+    return results
+
+
+def benchmark(sources: list, filters: list, n_runs: int = 5) -> dict:
+    """
+    Tempo médio (ms) de dashboard_queries por estado dos filtros em cada fonte.
+
+    Returns:
+        Dicionário nome da fonte -> ms por estado dos filtros
+    """
+    timings = {}
+    for source in sources:
+        start = time.perf_counter()
+        for _ in range(n_runs):
+            for genders, age_range, obesity in filters:
+                dashboard_queries(source.view(genders, age_range, obesity))
+        timings[source.name] = (time.perf_counter() - start) * 1000 / (n_runs * len(filters))
+    return timings
+
+
+def main(argv: list = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Fontes de agregação do dashboard")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Gera o banco SQLite se o CSV mudou")
+    build_parser.add_argument('source', nargs='?', default=DATA_PATH, help="CSV de pacientes")
+    build_parser.add_argument('--force', action='store_true', help="Refaz o banco mesmo sem mudanças")
+
+    bench = subparsers.add_parser('benchmark', help="Comparar cubo e SQLite nas consultas do dashboard")
+    bench.add_argument('--repeat', type=int, default=10, help="Replicações do dataset")
+    bench.add_argument('--runs', type=int, default=5, help="Repetições de cada estado dos filtros")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        meta, rebuilt = ensure_database(args.source, force=args.force)
+        status = "gerado" if rebuilt else "já atualizado"
+        print(f"✅ Banco {status} em {database_path(args.source)} ({int(meta['n_rows']):,} linhas)")
+        return 0
+
+    df = pd.read_csv(DATA_PATH)
+    df['BMI'] = df['Weight'] / (df['Height'] ** 2)
+    df = pd.concat([df] * args.repeat, ignore_index=True)
+    genders, obesity = sorted(df['Gender'].unique()), sorted(df['Obesity'].unique())
+    filters = [
+        (genders, (14, 61), obesity),
+        (['Male'], (20, 30), obesity),
+        (genders, (14, 19), ['Obesity_Type_I', 'Normal_Weight']),
+        (['Female'], (40, 61), obesity)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = time.perf_counter()
+        cube_source = CubeSource.from_frame(df)
+        cube_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sqlite_path = os.path.join(tmp_dir, 'benchmark.sqlite')
+        build_database(path=sqlite_path, frame=df)
+        sqlite_seconds = time.perf_counter() - start
+
+        timings = benchmark([cube_source, SQLiteSource(sqlite_path)], filters, args.runs)
+
+    print(f"✅ {len(df):,} pacientes | {len(filters)} estados dos filtros")
+    print(f"   Cubo:   construção {cube_seconds:.2f}s | {timings['cube']:.1f} ms por estado")
+    print(f"   SQLite: carga {sqlite_seconds:.2f}s | {timings['sqlite']:.1f} ms por estado")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
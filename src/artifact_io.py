@@ -0,0 +1,122 @@
+"""
+Leitura e Escrita de Artefatos Versionados
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Funções compartilhadas pelos módulos que gravam artefatos em disco (cache
+colunar, bundle do modelo, avaliação out-of-fold, agregados, banco SQLite,
+aluno destilado e estado do pipeline):
+
+    - SCHEMA_VERSIONS: versão do layout de cada artefato, em um só lugar;
+    - sha256_file: checksum de arquivos lidos em blocos;
+    - write_json / read_json: manifestos em JSON;
+    - staged_directory: gravação atômica de um diretório.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+# Versão do layout gravado por cada módulo. Incrementar a do módulo a cada
+# mudança incompatível: artefatos de outra versão são refeitos ou rejeitados
+SCHEMA_VERSIONS = {
+    'analytics_source': 1,
+    'dataset_cache': 2,
+    'distillation': 2,
+    'model_bundle': 1,
+    'oof_evaluation': 1,
+    'streaming': 1,
+    'training_pipeline': 1,
+}
+
+
+def sha256_file(path: str, size: int = None) -> str:
+    """
+    SHA-256 do arquivo lido em blocos.
+
+    Args:
+        path: Arquivo
+        size: Considera apenas os primeiros size bytes (todos, se None)
+    """
+    digest = hashlib.sha256()
+    remaining = os.path.getsize(path) if size is None else size
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def write_json(path: str, payload: dict) -> None:
+    """Grava JSON indentado; arrays e escalares NumPy viram listas e tipos nativos"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False, default=_to_json)
+
+
+def read_json(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@contextlib.contextmanager
+def staged_directory(directory: str, per_process: bool = False):
+    """
+    Grava um diretório de forma atômica.
+
+    O bloco escreve no diretório temporário devolvido, ao lado do destino.
+    Ao sair sem erro, o diretório anterior é renomeado para <destino>.old, o
+    temporário assume o nome do destino e só então o anterior é apagado.
+    O destino fica ausente apenas entre os dois renames; se o processo cair
+    nesse intervalo, o conteúdo anterior continua inteiro em <destino>.old.
+    Em caso de erro no bloco, o temporário é apagado e o destino fica intacto.
+
+    Args:
+        directory: Diretório de destino
+        per_process: Usa temporários por processo (<destino>.tmp-<pid>), para
+            gravações concorrentes do mesmo destino com o mesmo conteúdo: se
+            outro processo instalar o destino primeiro, a cópia deste é descartada
+
+    Yields:
+        Caminho do diretório temporário (já criado)
+    """
+    directory = os.path.abspath(directory)
+    suffix = f"-{os.getpid()}" if per_process else ""
+    staging, previous = f"{directory}.tmp{suffix}", f"{directory}.old{suffix}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        yield staging
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    shutil.rmtree(previous, ignore_errors=True)
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    try:
+        os.replace(directory, previous)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(staging, directory)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        # Em gravações concorrentes, outro processo pode ter instalado o destino entre os renames
+        if not (per_process and os.path.isdir(directory)):
+            if not os.path.exists(directory) and os.path.exists(previous):
+                os.replace(previous, directory)
+            raise
+    shutil.rmtree(previous, ignore_errors=True)
@@ -0,0 +1,149 @@
+"""
+Predição em Lote de Níveis de Obesidade
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Pontua arquivos CSV com o esquema de Obesity.csv em blocos (chunks),
+aplicando encoding, normalização e predição de forma vetorizada sobre o
+bloco inteiro, em vez de uma linha por vez como no formulário do app.
+
+Uso (a partir da raiz do projeto):
+    python -m src.batch_scoring entrada.csv saida.csv --chunksize 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.inference import predict_proba
+from src.model_artifacts import load_model_artifacts
+from src.preprocessing import FusedPreprocessor
+from src.translations import OBESITY_LABELS
+
+DEFAULT_CHUNKSIZE = 50_000
+
+# Faixas de IMC (mesmos limiares da interpretação exibida no app de predição)
+BMI_BAND_EDGES = [18.5, 25.0, 30.0]
+BMI_BAND_LABELS = ['Abaixo do normal', 'Normal', 'Sobrepeso', 'Obesidade']
+
+
+def get_bmi_band(bmi: np.ndarray) -> np.ndarray:
+    """
+    Classifica valores de IMC nas faixas da OMS de forma vetorizada.
+
+    Args:
+        bmi: Array com valores de IMC
+
+    Returns:
+        Array com o rótulo da faixa de IMC para cada valor
+    """
+    band_index = np.digitize(np.asarray(bmi, dtype=float), BMI_BAND_EDGES)
+    return np.asarray(BMI_BAND_LABELS, dtype=object)[band_index]
+
+
+def score_dataframe(df: pd.DataFrame, model, label_encoders, target_encoder,
+                    scaler, feature_names, preprocessor: FusedPreprocessor = None) -> pd.DataFrame:
+    """
+    Pontua um bloco de pacientes com chamadas vetorizadas.
+
+    Args:
+        df: DataFrame com as colunas de Obesity.csv (BMI é calculado se ausente)
+        model, label_encoders, target_encoder, scaler, feature_names:
+            Artefatos retornados por load_model_artifacts()
+        preprocessor: Pré-processador já montado (evita recriá-lo a cada bloco)
+
+    Returns:
+        DataFrame com as colunas originais, BMI, classe prevista, rótulo em
+        português, faixa de IMC e uma coluna de probabilidade por classe
+    """
+    result = df.copy()
+    if 'BMI' not in result.columns:
+        result['BMI'] = result['Weight'] / (result['Height'] ** 2)
+
+    # Encoding e normalização do bloco inteiro em uma passada
+    if preprocessor is None:
+        preprocessor = FusedPreprocessor(label_encoders, scaler, feature_names)
+    features = preprocessor.transform(result)
+
+    # Uma única passada pelo modelo: a classe é o argmax das probabilidades
+    proba = predict_proba(model, features)
+    classes = target_encoder.inverse_transform(model.classes_)
+    predicted = classes[proba.argmax(axis=1)]
+
+    result['Predicao'] = predicted
+    result['Predicao_PT'] = pd.Series(predicted, index=result.index).map(OBESITY_LABELS)
+    result['Faixa_IMC'] = get_bmi_band(result['BMI'].to_numpy())
+    for i, cls in enumerate(classes):
+        result[f'Prob_{cls}'] = proba[:, i]
+
+    return result
+
+
+def score_csv(input_path: str, output_path: str, chunksize: int = DEFAULT_CHUNKSIZE,
+              models_dir: str = None, artifacts: tuple = None) -> dict:
+    """
+    Pontua um CSV em blocos e grava o resultado incrementalmente.
+
+    Args:
+        input_path: CSV de entrada no esquema de Obesity.csv
+        output_path: CSV de saída com predições e probabilidades
+        chunksize: Número de linhas por bloco
+        models_dir: Diretório dos artefatos (ignorado se artifacts for informado)
+        artifacts: Tupla de load_model_artifacts() já carregada
+
+    Returns:
+        Dicionário com linhas processadas, blocos, tempo total e linhas/s
+    """
+    if artifacts is None:
+        artifacts = load_model_artifacts(models_dir)
+    model, label_encoders, target_encoder, scaler, feature_names, _ = artifacts
+    preprocessor = FusedPreprocessor(label_encoders, scaler, feature_names)
+
+    n_rows = 0
+    n_chunks = 0
+    start = time.perf_counter()
+
+    for chunk in pd.read_csv(input_path, chunksize=chunksize):
+        scored = score_dataframe(chunk, model, label_encoders, target_encoder, scaler, feature_names,
+                                 preprocessor=preprocessor)
+        scored.to_csv(output_path, mode='w' if n_chunks == 0 else 'a',
+                      header=n_chunks == 0, index=False)
+        n_rows += len(scored)
+        n_chunks += 1
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': n_rows,
+        'chunks': n_chunks,
+        'seconds': elapsed,
+        'rows_per_second': n_rows / elapsed if elapsed > 0 else float('inf')
+    }
+
+
+def main(argv: list = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Predição em lote de níveis de obesidade")
+    parser.add_argument('input', help="CSV de entrada (esquema de Obesity.csv)")
+    parser.add_argument('output', help="CSV de saída com as predições")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"Linhas por bloco (padrão: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument('--models-dir', default=None, help="Diretório dos artefatos do modelo")
+    args = parser.parse_args(argv)
+
+    stats = score_csv(args.input, args.output, chunksize=args.chunksize, models_dir=args.models_dir)
+
+    print(f"✅ {stats['rows']:,} linhas pontuadas em {stats['chunks']} bloco(s)")
+    print(f"   Tempo total: {stats['seconds']:.2f}s")
+    print(f"   Throughput: {stats['rows_per_second']:,.0f} linhas/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Índices Bitmap para os Filtros do Dashboard
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Pré-calcula, uma vez por dataset, bitsets compactados (1 bit por paciente,
+em palavras de 64 bits) para cada gênero, cada classe de obesidade e cada
+bucket de idade de src.filter_cube. Qualquer combinação dos filtros da
+barra lateral vira algumas operações OR/AND palavra a palavra, e o número
+de pacientes selecionados sai da contagem de bits (popcount), sem comparar
+as colunas linha a linha a cada interação.
+
+Os bitmaps de idade usam codificação por intervalo: o bitmap do bucket b
+marca os pacientes com bucket <= b, então a faixa lo..hi da barra lateral
+custa um AND NOT entre dois bitmaps, qualquer que seja a largura da faixa.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.filter_cube import age_buckets
+
+# Número de bits 1 de cada byte (popcount por tabela)
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def pack_bits(mask: np.ndarray) -> np.ndarray:
+    """Máscara booleana -> palavras uint64 (bit i da linha i, zeros no preenchimento final)"""
+    packed = np.packbits(np.asarray(mask, dtype=bool), bitorder='little')
+    padded = np.zeros(-(-len(packed) // 8) * 8, dtype=np.uint8)
+    padded[:len(packed)] = packed
+    return padded.view(np.uint64)
+
+
+def popcount(words: np.ndarray) -> int:
+    """Número de bits 1 nas palavras"""
+    return int(POPCOUNT_TABLE[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+class BitmapIndex:
+    """Bitsets por gênero, classe de obesidade e bucket de idade de um DataFrame"""
+
+    def __init__(self, n_rows: int, genders: dict, obesity: dict, age_le: np.ndarray, bucket_min: int):
+        self.n_rows = n_rows
+        self.genders = genders
+        self.obesity = obesity
+        self.age_le = age_le
+        self.bucket_min = bucket_min
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'BitmapIndex':
+        """
+        Args:
+            df: DataFrame com as colunas Gender, Age e Obesity
+        """
+        def by_value(column):
+            values = pd.Categorical(df[column])
+            codes = values.codes
+            return {value: pack_bits(codes == i) for i, value in enumerate(values.categories)}
+
+        age = df['Age'].to_numpy(dtype=float)
+        valid = ~np.isnan(age)
+        buckets = age_buckets(np.where(valid, age, 0))
+        bucket_min = int(buckets[valid].min()) if valid.any() else 0
+        bucket_max = int(buckets[valid].max()) if valid.any() else -1
+
+        # Linha b: pacientes com bucket <= bucket_min + b
+        order = np.argsort(np.where(valid, buckets, bucket_max + 1), kind='stable')
+        sorted_buckets = np.where(valid, buckets, bucket_max + 1)[order]
+        age_le = np.empty((bucket_max - bucket_min + 1, -(-len(df) // 64)), dtype=np.uint64)
+        below = np.zeros(len(df), dtype=bool)
+        start = 0
+        for b, bucket in enumerate(range(bucket_min, bucket_max + 1)):
+            end = np.searchsorted(sorted_buckets, bucket, side='right')
+            below[order[start:end]] = True
+            age_le[b] = pack_bits(below)
+            start = end
+        return cls(len(df), by_value('Gender'), by_value('Obesity'), age_le, bucket_min)
+
+    def _any_of(self, bitmaps: dict, values) -> np.ndarray:
+        words = np.zeros(self.age_le.shape[1], dtype=np.uint64)
+        for value in values:
+            if value in bitmaps:
+                words |= bitmaps[value]
+        return words
+
+    def _age_le(self, bucket: int) -> np.ndarray:
+        """Bitmap dos pacientes com bucket <= bucket"""
+        position = min(bucket - self.bucket_min, len(self.age_le) - 1)
+        if position < 0 or not len(self.age_le):
+            return np.zeros(self.age_le.shape[1], dtype=np.uint64)
+        return self.age_le[position]
+
+    def select(self, genders=None, age_range: tuple = None, obesity=None) -> np.ndarray:
+        """
+        Bitset dos pacientes que atendem aos filtros (mesma semântica de
+        src.filter_cube.FilterCube.mask, mas por linha).
+
+        Args:
+            genders: Gêneros selecionados (None = todos)
+            age_range: Tupla (mínimo, máximo) de idades inteiras, inclusiva
+            obesity: Classes de obesidade selecionadas (None = todas)
+
+        Returns:
+            Palavras uint64, combináveis com & e | e contadas por popcount()
+        """
+        # Todos os pacientes: bitmap do maior bucket (idade ausente fica de fora)
+        words = self._age_le(2 ** 62) if age_range is None else (
+            self._age_le(2 * age_range[1]) & ~self._age_le(2 * age_range[0] - 1))
+        if genders is not None:
+            words = words & self._any_of(self.genders, genders)
+        if obesity is not None:
+            words = words & self._any_of(self.obesity, obesity)
+        return words
+
+    def count(self, words: np.ndarray) -> int:
+        """Número de pacientes no bitset"""
+        return popcount(words)
+
+    def to_mask(self, words: np.ndarray) -> np.ndarray:
+        """Bitset -> máscara booleana por linha (para indexar as colunas)"""
+        return np.unpackbits(words.view(np.uint8), count=self.n_rows, bitorder='little').astype(bool)
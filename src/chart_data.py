@@ -0,0 +1,217 @@
+"""
+Dados dos Gráficos Calculados no Servidor
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Reduz o que o dashboard envia ao navegador em coortes grandes. Em vez de
+uma linha por paciente, as dispersões recebem uma amostra estratificada
+(mesma proporção de cada classe de obesidade) ou uma grade de densidade,
+os histogramas recebem as contagens por intervalo e os boxplots recebem
+quartis, limites dos bigodes e uma amostra limitada de outliers, tudo
+calculado com NumPy. O tamanho de cada figura fica limitado pelo número de
+pontos da amostra, de intervalos ou de classes, e não pelo número de
+pacientes.
+"""
+
+import numpy as np
+
+# Acima deste número de pontos as dispersões usam WebGL (scattergl), mesmo
+# limite do render_mode='auto' do plotly express
+WEBGL_THRESHOLD = 1000
+
+# Máximo de pontos enviados por dispersão no modo automático e na amostra
+MAX_SCATTER_POINTS = 5000
+
+# Células por eixo da grade de densidade
+DENSITY_BINS = 60
+
+# Máximo de outliers desenhados por caixa do boxplot
+MAX_BOX_OUTLIERS = 50
+
+
+def scatter_render_mode(n_points: int) -> str:
+    """render_mode do plotly express para o número de pontos"""
+    return 'webgl' if n_points > WEBGL_THRESHOLD else 'svg'
+
+
+def stratified_sample(labels, max_points: int = MAX_SCATTER_POINTS, seed: int = 0) -> np.ndarray:
+    """
+    Amostra que preserva a proporção de cada classe.
+
+    As vagas são distribuídas pelo método dos maiores restos, com ao menos
+    um ponto por classe presente; dentro de cada classe os pontos são
+    sorteados com semente fixa, para que a mesma visão gere sempre a mesma
+    figura.
+
+    Args:
+        labels: Classe de cada linha
+        max_points: Tamanho da amostra (se houver mais linhas)
+        seed: Semente do sorteio
+
+    Returns:
+        Índices posicionais da amostra, em ordem crescente (mantém a ordem das linhas)
+    """
+    labels = np.asarray(labels)
+    n_rows = len(labels)
+    if n_rows <= max_points:
+        return np.arange(n_rows)
+
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    quota = counts * (max_points / n_rows)
+    allocation = np.floor(quota).astype(np.int64)
+    remainder_order = np.argsort(allocation - quota, kind='stable')
+    allocation[remainder_order[:max_points - allocation.sum()]] += 1
+    allocation = np.maximum(allocation, 1)
+
+    # Posição de cada linha dentro da sua classe após embaralhar com a semente
+    priority = np.random.default_rng(seed).random(n_rows)
+    order = np.lexsort((priority, inverse))
+    class_start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.empty(n_rows, dtype=np.int64)
+    rank[order] = np.arange(n_rows) - np.repeat(class_start, counts)
+    return np.flatnonzero(rank < allocation[inverse])
+
+
+def density_grid(x, y, labels=None, bins: int = DENSITY_BINS) -> dict:
+    """
+    Contagem de pontos em uma grade bins × bins.
+
+    Args:
+        x, y: Coordenadas de cada linha
+        labels: Classe de cada linha (opcional) para indicar a classe
+            predominante de cada célula
+        bins: Células por eixo
+
+    Returns:
+        Dicionário com 'counts' (linhas = y, colunas = x), centros 'x' e 'y'
+        das células e, com labels, 'classes' e 'dominant' (índice da classe
+        mais frequente em cada célula, -1 se vazia)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    x_edges = np.histogram_bin_edges(x, bins=bins)
+    y_edges = np.histogram_bin_edges(y, bins=bins)
+    # Último intervalo fechado à direita, como em np.histogram
+    x_bin = np.clip(np.searchsorted(x_edges, x, side='right') - 1, 0, bins - 1)
+    y_bin = np.clip(np.searchsorted(y_edges, y, side='right') - 1, 0, bins - 1)
+    cell = y_bin * bins + x_bin
+
+    grid = {
+        'counts': np.bincount(cell, minlength=bins * bins).reshape(bins, bins),
+        'x': (x_edges[:-1] + x_edges[1:]) / 2,
+        'y': (y_edges[:-1] + y_edges[1:]) / 2
+    }
+    if labels is not None:
+        classes, inverse = np.unique(np.asarray(labels), return_inverse=True)
+        per_class = np.bincount(inverse * bins * bins + cell, minlength=len(classes) * bins * bins)
+        per_class = per_class.reshape(len(classes), bins, bins)
+        grid['classes'] = classes
+        dominant = per_class.argmax(axis=0) if len(classes) else np.zeros((bins, bins), dtype=np.int64)
+        grid['dominant'] = np.where(grid['counts'] > 0, dominant, -1)
+    return grid
+
+
+def nice_bin_width(low: float, high: float, nbins: int) -> float:
+    """Largura "redonda" (1, 2, 2.5 ou 5 × 10^k) para no máximo nbins intervalos entre low e high"""
+    # Valores todos iguais: intervalos de largura 1, como no plotly
+    raw = (high - low) / nbins if high > low else 1.0
+    magnitude = 10.0 ** np.floor(np.log10(raw))
+    return next(step * magnitude for step in (1, 2, 2.5, 5, 10) if step * magnitude >= raw)
+
+
+def nice_bin_edges(values, nbins: int) -> np.ndarray:
+    """
+    Intervalos de largura "redonda" (1, 2, 2.5 ou 5 × 10^k), como o autobin
+    do plotly.js, com no máximo nbins intervalos cobrindo os valores.
+    """
+    values = np.asarray(values, dtype=float)
+    low, high = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+    size = nice_bin_width(low, high, nbins)
+    start = np.floor(low / size) * size
+    n_edges = int(np.floor((high - start) / size)) + 2
+    return start + size * np.arange(n_edges)
+
+
+def histogram_counts(values, nbins: int) -> tuple:
+    """
+    Histograma com intervalos fechados à esquerda ([a, b)).
+
+    Returns:
+        Tupla (contagens, bordas dos intervalos)
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    edges = nice_bin_edges(values, nbins)
+    index = np.searchsorted(edges, values, side='right') - 1
+    return np.bincount(index, minlength=len(edges) - 1)[:len(edges) - 1], edges
+
+
+def rebin_histogram(counts, edges, nbins: int) -> tuple:
+    """
+    Reagrupa um histograma de intervalos finos e fixos (ver
+    src.filter_cube.HistogramCube) em intervalos de largura "redonda", como
+    histogram_counts, somando intervalos vizinhos.
+
+    A faixa ocupada é medida pelas bordas inferiores do primeiro e do último
+    intervalo com pacientes; a largura redonda é arredondada para cima até um
+    múltiplo da largura fina, de modo que nenhum intervalo fino seja dividido.
+
+    Args:
+        counts: Contagens dos intervalos finos
+        edges: Bordas dos intervalos finos (múltiplos da largura)
+        nbins: Número aproximado de intervalos
+
+    Returns:
+        Tupla (contagens, bordas dos intervalos)
+    """
+    counts = np.asarray(counts)
+    edges = np.asarray(edges, dtype=float)
+    width = edges[1] - edges[0]
+    occupied = np.flatnonzero(counts)
+    if not len(occupied):
+        return np.zeros(1, dtype=np.int64), edges[:2]
+
+    # Posição global de cada intervalo fino (borda = posição × largura)
+    first = int(np.round(edges[0] / width))
+    low, high = first + occupied[0], first + occupied[-1]
+    factor = max(1, int(np.ceil(nice_bin_width(low * width, high * width, nbins) / width - 1e-9)))
+    start = (low // factor) * factor
+    coarse = (first + occupied - start) // factor
+    merged = np.bincount(coarse, weights=counts[occupied], minlength=(high - start) // factor + 1)
+    return merged.astype(np.int64), (start + factor * np.arange(len(merged) + 1)) * width
+
+
+def box_statistics(values, labels, max_outliers: int = MAX_BOX_OUTLIERS) -> dict:
+    """
+    Estatísticas do boxplot por classe, com as mesmas regras do plotly
+    (quartis por interpolação linear e bigodes em 1,5 × IQR).
+
+    Args:
+        values: Valor de cada linha
+        labels: Classe de cada linha
+        max_outliers: Outliers guardados por classe (distribuídos por posto,
+            incluindo o menor e o maior)
+
+    Returns:
+        Dicionário classe -> {'n', 'q1', 'median', 'q3', 'lowerfence',
+        'upperfence', 'outliers'}, com as classes em ordem alfabética
+    """
+    values = np.asarray(values, dtype=float)
+    classes, inverse = np.unique(np.asarray(labels), return_inverse=True)
+    order = np.lexsort((values, inverse))
+    sorted_values = values[order]
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(classes)))])
+
+    stats = {}
+    for i, label in enumerate(classes):
+        group = sorted_values[bounds[i]:bounds[i + 1]]
+        q1, median, q3 = np.quantile(group, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = group[(group >= q1 - 1.5 * iqr) & (group <= q3 + 1.5 * iqr)]
+        outliers = group[(group < q1 - 1.5 * iqr) | (group > q3 + 1.5 * iqr)]
+        if len(outliers) > max_outliers:
+            outliers = outliers[np.unique(np.linspace(0, len(outliers) - 1, max_outliers).round().astype(int))]
+        stats[label] = {
+            'n': len(group), 'q1': q1, 'median': median, 'q3': q3,
+            'lowerfence': inside.min(), 'upperfence': inside.max(), 'outliers': outliers
+        }
+    return stats
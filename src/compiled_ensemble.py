@@ -0,0 +1,458 @@
+"""
+Ensemble de Árvores Compilado em Arrays NumPy
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Exporta o best_model.pkl (Random Forest, Gradient Boosting ou XGBoost) para
+arrays contíguos (feature, limiar, filhos e valores das folhas) e avalia
+todas as árvores para um lote inteiro de forma vetorizada. A avaliação usa
+apenas NumPy: o serviço de predição não precisa importar sklearn nem xgboost.
+
+Os exportadores leem apenas atributos dos modelos (sem importar as
+bibliotecas), então este módulo também é leve para importar.
+
+Uso (a partir da raiz do projeto):
+    python -m src.compiled_ensemble export models/best_model.pkl models/compiled_model
+    python -m src.compiled_ensemble benchmark models/best_model.pkl models/compiled_model
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Arrays gravados em disco (um .npy por array, para permitir memory-map)
+ARRAY_NAMES = ['feature', 'threshold', 'children', 'default_left', 'value',
+               'roots', 'tree_output', 'base_score', 'classes']
+
+# Lotes maiores são avaliados em blocos deste tamanho (melhor uso de cache)
+DEFAULT_ROW_CHUNK = 256
+
+
+class CompiledEnsemble:
+    """
+    Ensemble de árvores achatado em arrays.
+
+    Todas as árvores compartilham os mesmos arrays de nós; roots indica o nó
+    raiz de cada árvore. Folhas apontam para si mesmas, de modo que todas as
+    amostras avançam max_depth passos sem ramificação especial.
+
+    Os limiares são gravados em float32 e já ajustados para que a comparação
+    em float32 reproduza exatamente a decisão do modelo original.
+
+    Atributos principais:
+        feature, threshold, default_left: Estrutura dos nós
+        children: Filhos esquerdo e direito de cada nó (n_nodes, 2)
+        value: Valores das folhas (n_nodes, n_outputs)
+        roots: Nó raiz de cada árvore
+        tree_output: Classe à qual cada árvore contribui (-1 = vetor completo)
+        base_score: Margem inicial por classe (boosting)
+        classes_: Rótulos das classes (mesmos de model.classes_)
+    """
+
+    def __init__(self, arrays: dict, meta: dict):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.children = arrays['children']
+        self.default_left = arrays['default_left']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.tree_output = arrays['tree_output']
+        self.base_score = arrays['base_score']
+        self.classes_ = arrays['classes']
+
+        self.kind = meta['kind']
+        self.aggregation = meta['aggregation']
+        self.strict_less = meta['strict_less']
+        self.learning_rate = meta['learning_rate']
+        self.max_depth = meta['max_depth']
+        self.n_features_in_ = meta['n_features']
+        self.meta = meta
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Retorna o índice da folha atingida em cada árvore.
+
+        Args:
+            X: Matriz (n_amostras, n_features)
+
+        Returns:
+            Array (n_amostras, n_árvores) com índices de nós folha
+        """
+        # sklearn e xgboost comparam as features em float32
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        has_missing = np.isnan(flat_X).any()
+
+        row_offset = (np.arange(n_rows, dtype=np.int64) * n_features)[:, None]
+        flat_children = self.children.reshape(-1)
+        node = np.tile(self.roots.astype(np.int64), (n_rows, 1))
+
+        for _ in range(self.max_depth):
+            x = flat_X.take(row_offset + self.feature.take(node))
+            threshold = self.threshold.take(node)
+            # sklearn: esquerda se x <= limiar; xgboost: esquerda se x < limiar
+            go_right = x >= threshold if self.strict_less else x > threshold
+            if has_missing:
+                go_right = np.where(np.isnan(x), ~self.default_left.take(node), go_right)
+            node = flat_children.take(node * 2 + go_right)
+
+        return node
+
+    def predict_proba(self, X: np.ndarray, row_chunk: int = DEFAULT_ROW_CHUNK) -> np.ndarray:
+        """
+        Probabilidades por classe, na ordem de classes_.
+
+        Args:
+            X: Matriz (n_amostras, n_features) já codificada e normalizada
+            row_chunk: Linhas avaliadas por vez (limita a memória de apply)
+
+        Returns:
+            Array (n_amostras, n_classes)
+        """
+        X = np.asarray(X)
+        if X.shape[0] > row_chunk:
+            return np.vstack([self.predict_proba(X[i:i + row_chunk], row_chunk)
+                              for i in range(0, X.shape[0], row_chunk)])
+
+        leaves = self.apply(X)
+
+        if self.aggregation == 'mean_proba':
+            # Mesma ordem de acumulação do RandomForestClassifier
+            proba = np.zeros((X.shape[0], len(self.classes_)))
+            for t in range(self.n_trees):
+                proba += self.value.take(leaves[:, t], axis=0)
+            return proba / self.n_trees
+
+        if self.kind == 'xgboost':
+            # XGBoost acumula margens em float32
+            margin = np.tile(self.base_score.astype(np.float32), (X.shape[0], 1))
+            for t in range(self.n_trees):
+                margin[:, self.tree_output[t]] += self.value[leaves[:, t], 0].astype(np.float32)
+        else:
+            margin = np.tile(self.base_score, (X.shape[0], 1))
+            for t in range(self.n_trees):
+                margin[:, self.tree_output[t]] += self.learning_rate * self.value[leaves[:, t], 0]
+
+        if self.aggregation == 'sigmoid':
+            p = 1.0 / (1.0 + np.exp(-margin[:, 0]))
+            return np.column_stack([1.0 - p, p])
+
+        margin = margin - margin.max(axis=1, keepdims=True)
+        if self.kind == 'xgboost':
+            # Mesma sequência de arredondamentos do softmax do XGBoost (float32)
+            exp = np.exp(margin.astype(np.float64)).astype(np.float32)
+            total = np.zeros(X.shape[0])
+            for k in range(exp.shape[1]):
+                total += exp[:, k]
+            return exp / total.astype(np.float32)[:, None]
+
+        exp = np.exp(margin)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Classe com maior probabilidade"""
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, directory: str) -> None:
+        """Grava um .npy por array e os metadados em ensemble.json"""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            attr = 'classes_' if name == 'classes' else name
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(getattr(self, attr)))
+        with open(os.path.join(directory, 'ensemble.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=2)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: str = 'r') -> 'CompiledEnsemble':
+        """
+        Carrega um ensemble gravado por save().
+
+        Args:
+            directory: Diretório com os .npy e ensemble.json
+            mmap_mode: Modo de memory-map do np.load ('r' = somente leitura, None = em memória)
+        """
+        with open(os.path.join(directory, 'ensemble.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in ARRAY_NAMES}
+        return cls(arrays, meta)
+
+
+# ============================================================================
+# EXPORTADORES
+# ============================================================================
+
+def _tree_depth(left: np.ndarray, right: np.ndarray, root: int = 0) -> int:
+    """Profundidade máxima de uma árvore (folhas com filhos -1)"""
+    depth = 0
+    stack = [(root, 0)]
+    while stack:
+        node, level = stack.pop()
+        if left[node] < 0:
+            depth = max(depth, level)
+        else:
+            stack.append((left[node], level + 1))
+            stack.append((right[node], level + 1))
+    return depth
+
+
+class _EnsembleBuilder:
+    """Concatena árvores individuais nos arrays globais"""
+
+    def __init__(self, n_outputs: int):
+        self.n_outputs = n_outputs
+        self.parts = {name: [] for name in ['feature', 'threshold', 'children', 'default_left', 'value']}
+        self.roots = []
+        self.tree_output = []
+        self.n_nodes = 0
+        self.max_depth = 0
+
+    def add_tree(self, feature, threshold, left, right, default_left, value,
+                 output: int = -1, threshold_is_float32: bool = False):
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        n = len(left)
+        nodes = np.arange(n)
+        is_leaf = left < 0
+
+        threshold = np.where(is_leaf, 0.0, threshold)
+        threshold32 = threshold.astype(np.float32)
+        if not threshold_is_float32:
+            # Maior float32 <= limiar: para x float32, x > limiar32 <=> x > limiar
+            rounded_up = threshold32.astype(np.float64) > threshold
+            threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+
+        self.max_depth = max(self.max_depth, _tree_depth(left, right))
+        self.parts['feature'].append(np.where(is_leaf, 0, feature))
+        self.parts['threshold'].append(threshold32)
+        self.parts['children'].append(np.column_stack([
+            np.where(is_leaf, nodes, left),
+            np.where(is_leaf, nodes, right)
+        ]) + self.n_nodes)
+        self.parts['default_left'].append(np.asarray(default_left, dtype=bool))
+        self.parts['value'].append(np.asarray(value, dtype=np.float64).reshape(n, self.n_outputs))
+        self.roots.append(self.n_nodes)
+        self.tree_output.append(output)
+        self.n_nodes += n
+
+    def build(self, base_score, classes, meta: dict) -> CompiledEnsemble:
+        arrays = {
+            'feature': np.concatenate(self.parts['feature']).astype(np.int32),
+            'threshold': np.concatenate(self.parts['threshold']),
+            'children': np.concatenate(self.parts['children']).astype(np.int32),
+            'default_left': np.concatenate(self.parts['default_left']),
+            'value': np.concatenate(self.parts['value']),
+            'roots': np.asarray(self.roots, dtype=np.int32),
+            'tree_output': np.asarray(self.tree_output, dtype=np.int32),
+            'base_score': np.asarray(base_score, dtype=np.float64),
+            'classes': np.asarray(classes)
+        }
+        meta = dict(meta, max_depth=int(self.max_depth), n_trees=len(self.roots), n_nodes=int(self.n_nodes))
+        return CompiledEnsemble(arrays, meta)
+
+
+def _sklearn_tree_arrays(tree):
+    """Arrays de um sklearn.tree._tree.Tree"""
+    missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8))
+    return tree.feature, tree.threshold, tree.children_left, tree.children_right, missing_left
+
+
+def export_random_forest(model) -> CompiledEnsemble:
+    """Exporta RandomForestClassifier (folhas com a distribuição de classes)"""
+    n_classes = len(model.classes_)
+    builder = _EnsembleBuilder(n_outputs=n_classes)
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :n_classes]
+        normalizer = value.sum(axis=1, keepdims=True)
+        # sklearn >= 1.4 já grava frações; versões anteriores gravam contagens
+        # e normalizam em predict_proba
+        if not np.allclose(normalizer, 1.0):
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+        builder.add_tree(*_sklearn_tree_arrays(tree), value)
+
+    meta = {'kind': 'random_forest', 'aggregation': 'mean_proba', 'strict_less': False,
+            'learning_rate': 1.0, 'n_features': int(model.n_features_in_)}
+    return builder.build(np.zeros(n_classes), model.classes_, meta)
+
+
+def export_probability_tree(model, classes) -> CompiledEnsemble:
+    """
+    Exporta um DecisionTreeRegressor multi-saída ajustado a probabilidades
+    (aluno destilado de src.distillation): cada folha guarda um vetor de
+    probabilidades por classe, avaliado como uma floresta de uma árvore.
+    """
+    tree = model.tree_
+    value = np.clip(tree.value[:, :, 0], 0.0, None)
+    normalizer = value.sum(axis=1, keepdims=True)
+    normalizer[normalizer == 0.0] = 1.0
+
+    builder = _EnsembleBuilder(n_outputs=len(classes))
+    builder.add_tree(*_sklearn_tree_arrays(tree), value / normalizer)
+    meta = {'kind': 'probability_tree', 'aggregation': 'mean_proba', 'strict_less': False,
+            'learning_rate': 1.0, 'n_features': int(model.n_features_in_)}
+    return builder.build(np.zeros(len(classes)), classes, meta)
+
+
+def export_gradient_boosting(model) -> CompiledEnsemble:
+    """Exporta GradientBoostingClassifier (margem = init + learning_rate * soma das folhas)"""
+    n_outputs = model.estimators_.shape[1]
+    builder = _EnsembleBuilder(n_outputs=1)
+
+    for stage in model.estimators_:
+        for k, estimator in enumerate(stage):
+            tree = estimator.tree_
+            builder.add_tree(*_sklearn_tree_arrays(tree), tree.value[:, 0, 0], output=k)
+
+    base_score = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0]
+    meta = {'kind': 'gradient_boosting', 'aggregation': 'softmax' if n_outputs > 1 else 'sigmoid',
+            'strict_less': False, 'learning_rate': float(model.learning_rate),
+            'n_features': int(model.n_features_in_)}
+    return builder.build(base_score, model.classes_, meta)
+
+
+def export_xgboost(model) -> CompiledEnsemble:
+    """Exporta XGBClassifier (modelo gbtree, splits numéricos, truncado em best_iteration)"""
+    booster = model.get_booster()
+    config = json.loads(booster.save_config())
+    learner = json.loads(booster.save_raw('json'))['learner']
+    gbtree = learner['gradient_booster']['model']
+
+    n_classes = len(model.classes_)
+    n_outputs = n_classes if n_classes > 2 else 1
+    base_score = float(config['learner']['learner_model_param']['base_score'])
+    if n_outputs == 1:
+        # Para binary:logistic o base_score é uma probabilidade; a margem é o logit
+        base_score = np.log(base_score / (1.0 - base_score))
+
+    # Com parada antecipada, predict_proba usa só as rodadas até best_iteration
+    n_trees = len(gbtree['trees'])
+    best_iteration = getattr(model, 'best_iteration', None)
+    if best_iteration is not None:
+        n_trees = int(gbtree['iteration_indptr'][best_iteration + 1])
+
+    builder = _EnsembleBuilder(n_outputs=1)
+    for tree, output in zip(gbtree['trees'][:n_trees], gbtree['tree_info'][:n_trees]):
+        if any(tree['split_type']):
+            raise ValueError("Splits categoriais do XGBoost não são suportados")
+        left = np.asarray(tree['left_children'])
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+        builder.add_tree(
+            np.asarray(tree['split_indices']),
+            conditions.astype(np.float64),
+            left,
+            np.asarray(tree['right_children']),
+            np.asarray(tree['default_left']),
+            np.where(left < 0, conditions, 0.0),
+            output=int(output),
+            threshold_is_float32=True
+        )
+
+    meta = {'kind': 'xgboost', 'aggregation': 'softmax' if n_outputs > 1 else 'sigmoid',
+            'strict_less': True, 'learning_rate': 1.0,
+            'n_features': int(config['learner']['learner_model_param']['num_feature'])}
+    return builder.build(np.full(n_outputs, base_score), model.classes_, meta)
+
+
+def export_model(model) -> CompiledEnsemble:
+    """
+    Exporta um modelo do notebook de treinamento para arrays.
+
+    Args:
+        model: RandomForestClassifier, GradientBoostingClassifier ou XGBClassifier treinado
+
+    Returns:
+        CompiledEnsemble equivalente
+    """
+    name = type(model).__name__
+    if name == 'RandomForestClassifier':
+        return export_random_forest(model)
+    if name == 'GradientBoostingClassifier':
+        return export_gradient_boosting(model)
+    if name == 'XGBClassifier':
+        return export_xgboost(model)
+    raise ValueError(f"Modelo não suportado para compilação: {name}")
+
+
+def benchmark(model, compiled: CompiledEnsemble, X: np.ndarray, n_runs: int = 5) -> dict:
+    """
+    Compara o modelo original e o compilado no mesmo lote.
+
+    Returns:
+        Dicionário com maior diferença absoluta, concordância das classes e
+        tempos médios (s) de predict_proba de cada implementação
+    """
+    original_proba = model.predict_proba(X)
+    compiled_proba = compiled.predict_proba(X)
+
+    def timed(fn):
+        start = time.perf_counter()
+        for _ in range(n_runs):
+            fn(X)
+        return (time.perf_counter() - start) / n_runs
+
+    return {
+        'rows': len(X),
+        'max_abs_diff': float(np.abs(original_proba - compiled_proba).max()),
+        'class_agreement': float((original_proba.argmax(axis=1) == compiled_proba.argmax(axis=1)).mean()),
+        'original_seconds': timed(model.predict_proba),
+        'compiled_seconds': timed(compiled.predict_proba)
+    }
+
+
+def main(argv: list = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Compilação do ensemble de árvores para arrays NumPy")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export = subparsers.add_parser('export', help="Exportar best_model.pkl para arrays")
+    export.add_argument('model_path')
+    export.add_argument('output_dir')
+
+    bench = subparsers.add_parser('benchmark', help="Comparar modelo original e compilado em Obesity.csv")
+    bench.add_argument('model_path')
+    bench.add_argument('compiled_dir')
+    bench.add_argument('--repeat', type=int, default=50, help="Replicações do dataset no lote")
+
+    args = parser.parse_args(argv)
+
+    import joblib
+    model = joblib.load(args.model_path)
+
+    if args.command == 'export':
+        compiled = export_model(model)
+        compiled.save(args.output_dir)
+        print(f"✅ {compiled.n_trees} árvores ({compiled.meta['n_nodes']:,} nós, "
+              f"profundidade {compiled.max_depth}) exportadas para {args.output_dir}")
+        return 0
+
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root_dir not in sys.path:
+        sys.path.insert(0, root_dir)
+    from src.model_artifacts import load_model_artifacts
+    from src.preprocessing import FusedPreprocessor
+    import pandas as pd
+
+    preprocessor = FusedPreprocessor.from_artifacts(load_model_artifacts(os.path.dirname(args.model_path)))
+    df = pd.read_csv(os.path.join(root_dir, 'data', 'Obesity.csv'))
+    X = np.tile(preprocessor.transform(df), (args.repeat, 1))
+
+    stats = benchmark(model, CompiledEnsemble.load(args.compiled_dir), X)
+    print(f"✅ {stats['rows']:,} linhas | diferença máx.: {stats['max_abs_diff']:.2e} | "
+          f"concordância: {stats['class_agreement']:.2%}")
+    print(f"   Original: {stats['original_seconds']:.3f}s | Compilado: {stats['compiled_seconds']:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Cache Colunar do Dataset de Pacientes
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Converte data/Obesity.csv uma única vez em um diretório com um .npy por
+coluna, aberto com np.load(mmap_mode='r'): colunas de texto viram códigos
+inteiros de um pd.Categorical (int8), numéricas ficam em float64 e o IMC já
+vem calculado. Dashboard e notebook de treinamento deixam de rodar
+pd.read_csv e de recalcular o IMC a cada carga, e cada coluna categórica
+ocupa 1 byte por paciente em vez de uma string Python.
+
+O cache é refeito apenas quando o SHA-256 do CSV muda; tamanho e data de
+modificação iguais aos do manifesto dispensam recalcular o hash.
+
+Layout de data/cache/<nome do CSV>/:
+    manifest.json   Versão do esquema, fonte (SHA-256, tamanho, mtime),
+                    ordem das colunas, dtypes e categorias
+    <coluna>.npy    Códigos (categóricas) ou valores float64 (numéricas)
+
+Uso (a partir da raiz do projeto):
+    python -m src.dataset_cache build
+    python -m src.dataset_cache build data/Obesity.csv --force
+"""
+
+import argparse
+import datetime
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.artifact_io import SCHEMA_VERSIONS, read_json, sha256_file, staged_directory, write_json
+from src.model_artifacts import ROOT_DIR
+
+SCHEMA_VERSION = SCHEMA_VERSIONS['dataset_cache']
+
+DATA_PATH = os.path.join(ROOT_DIR, 'data', 'Obesity.csv')
+CACHE_DIR = os.path.join(ROOT_DIR, 'data', 'cache')
+MANIFEST_FILE = 'manifest.json'
+
+# Mesma precisão do CSV lido pelo pandas e dos registros enviados ao preditor:
+# scaler e modelos treinados a partir do cache veem exatamente os mesmos valores
+NUMERIC_DTYPE = np.float64
+
+
+def cache_path(source: str = DATA_PATH, cache_dir: str = None) -> str:
+    """Diretório do cache de um CSV (data/cache/<nome sem extensão>)"""
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_dir or CACHE_DIR, name)
+
+
+def read_manifest(directory: str) -> dict:
+    """Manifesto do cache, ou None se ausente ou de outra versão do esquema"""
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    manifest = read_json(path)
+    return manifest if manifest.get('schema_version') == SCHEMA_VERSION else None
+
+
+def _code_dtype(n_categories: int) -> np.dtype:
+    """Menor inteiro com sinal que comporta os códigos (-1 = ausente)"""
+    if n_categories <= np.iinfo(np.int8).max:
+        return np.int8
+    return np.int16 if n_categories <= np.iinfo(np.int16).max else np.int32
+
+
+def build_cache(source: str = DATA_PATH, cache_dir: str = None) -> dict:
+    """
+    Lê o CSV e grava o cache colunar (substituição atômica do diretório).
+
+    Args:
+        source: CSV de pacientes (colunas de Obesity.csv)
+        cache_dir: Diretório raiz dos caches (padrão: data/cache)
+
+    Returns:
+        Manifesto gravado
+    """
+    directory = cache_path(source, cache_dir)
+    stat = os.stat(source)
+    digest = sha256_file(source)
+
+    df = pd.read_csv(source)
+    if 'BMI' not in df and {'Weight', 'Height'} <= set(df.columns):
+        df['BMI'] = df['Weight'] / (df['Height'] ** 2)
+
+    with staged_directory(directory, per_process=True) as staging:
+        columns = {}
+        for col in df.columns:
+            if pd.api.types.is_numeric_dtype(df[col]):
+                np.save(os.path.join(staging, f'{col}.npy'), df[col].to_numpy(dtype=NUMERIC_DTYPE))
+                columns[col] = {'dtype': np.dtype(NUMERIC_DTYPE).name}
+            else:
+                values = pd.Categorical(df[col])
+                codes = values.codes.astype(_code_dtype(len(values.categories)))
+                np.save(os.path.join(staging, f'{col}.npy'), codes)
+                columns[col] = {'dtype': 'category', 'codes': codes.dtype.name,
+                                'categories': [str(v) for v in values.categories]}
+
+        manifest = {
+            'schema_version': SCHEMA_VERSION,
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'source': {'file': os.path.basename(source), 'sha256': digest,
+                       'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns},
+            'n_rows': len(df),
+            'columns': columns
+        }
+        write_json(os.path.join(staging, MANIFEST_FILE), manifest)
+    return manifest
+
+
+def ensure_cache(source: str = DATA_PATH, cache_dir: str = None, force: bool = False) -> tuple:
+    """
+    Garante um cache atualizado para o CSV.
+
+    Returns:
+        Tupla (manifesto, refeito), onde refeito indica se o CSV foi relido
+    """
+    directory = cache_path(source, cache_dir)
+    manifest = None if force else read_manifest(directory)
+    if manifest is not None:
+        stat = os.stat(source)
+        recorded = manifest['source']
+        if (recorded['size'], recorded['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            return manifest, False
+        if sha256_file(source) == recorded['sha256']:
+            # Arquivo tocado sem mudar o conteúdo: atualiza só a data de modificação
+            recorded.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            write_json(os.path.join(directory, MANIFEST_FILE), manifest)
+            return manifest, False
+    return build_cache(source, cache_dir), True
+
+
+def dataset_version(source: str = DATA_PATH, cache_dir: str = None) -> str:
+    """
+    SHA-256 do CSV registrado no manifesto do cache (refeito se o CSV mudou).
+
+    Barato quando o arquivo não mudou (stat + leitura do manifesto): serve
+    de chave para caches derivados do dataset, como os do dashboard.
+    """
+    manifest, _ = ensure_cache(source, cache_dir)
+    return manifest['source']['sha256']
+
+
+def load_dataset(source: str = DATA_PATH, cache_dir: str = None, mmap_mode: str = 'r') -> pd.DataFrame:
+    """
+    Carrega o dataset de pacientes pelo cache colunar (refeito se o CSV mudou).
+
+    Args:
+        source: CSV de pacientes (padrão: data/Obesity.csv)
+        cache_dir: Diretório raiz dos caches (padrão: data/cache)
+        mmap_mode: Modo de memory-map das colunas (None = em memória)
+
+    Returns:
+        DataFrame com as colunas do CSV e BMI: categóricas como category e
+        numéricas como float64
+    """
+    manifest, _ = ensure_cache(source, cache_dir)
+    directory = cache_path(source, cache_dir)
+
+    data = {}
+    for col, spec in manifest['columns'].items():
+        values = np.load(os.path.join(directory, f'{col}.npy'), mmap_mode=mmap_mode)
+        if spec['dtype'] == 'category':
+            values = pd.Categorical.from_codes(values, categories=spec['categories'])
+        data[col] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def load_datasets(sources: list, cache_dir: str = None) -> pd.DataFrame:
+    """
+    Pacientes de vários CSVs, na ordem dada, pelo cache colunar de cada um.
+
+    Com um único CSV é o próprio load_dataset (colunas em memory-map). Com
+    vários, as colunas presentes em todos são concatenadas em memória e as
+    categorias de cada coluna categórica são unidas.
+    """
+    frames = [load_dataset(source, cache_dir) for source in sources]
+    if len(frames) == 1:
+        return frames[0]
+
+    data = {}
+    for col in frames[0].columns:
+        if not all(col in frame for frame in frames[1:]):
+            continue
+        parts = [frame[col] for frame in frames]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            data[col] = union_categoricals(parts, sort_categories=True)
+        else:
+            data[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(data)
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Cache colunar do dataset de pacientes")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Gera o cache se o CSV mudou")
+    build_parser.add_argument('source', nargs='?', default=DATA_PATH, help="CSV de pacientes")
+    build_parser.add_argument('--cache-dir', help="Diretório raiz dos caches (padrão: data/cache)")
+    build_parser.add_argument('--force', action='store_true', help="Refaz o cache mesmo sem mudanças")
+
+    args = parser.parse_args(argv)
+
+    manifest, rebuilt = ensure_cache(args.source, args.cache_dir, force=args.force)
+    status = "gerado" if rebuilt else "já atualizado"
+    print(f"✅ Cache {status} em {cache_path(args.source, args.cache_dir)} "
+          f"({manifest['n_rows']:,} linhas, {len(manifest['columns'])} colunas)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
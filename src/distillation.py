@@ -0,0 +1,430 @@
+"""
+Modelo Aluno Destilado com Cascata para o Preditor
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+O melhor modelo do notebook é um ensemble de 100 a 300 árvores, mas a
+maioria dos pacientes do formulário de app_prediction.py é fácil de
+classificar (o IMC domina). Aqui uma única árvore rasa (o aluno) é ajustada
+às probabilidades do ensemble (o professor) nas mesmas 17 features, e é
+compilada em arrays por src.compiled_ensemble.
+
+Na predição, o aluno responde quando sua confiança (maior probabilidade)
+passa de um limiar; abaixo dele o paciente segue para o ensemble completo.
+O limiar é calibrado em uma parte do treino que o aluno não viu: é o menor
+valor com o qual os pacientes atendidos pelo aluno concordam com o
+professor em pelo menos target_agreement dos casos. No teste, a cascata só
+é gravada se a acurácia não cair mais que max_accuracy_drop em relação ao
+professor; se ela falhar, um aluno gravado antes é apagado.
+
+A política guarda o checksum do professor gravado em models/ (bundle ou
+best_model.pkl). Um aluno cujo professor foi substituído por um novo
+treinamento é recusado pelo preditor.
+
+Layout de models/student_model/:
+    *.npy, ensemble.json   Árvore do aluno (formato de CompiledEnsemble)
+    policy.json            Limiar, parâmetros, checksum do professor e
+                           relatório (cobertura, concordância, acurácias e
+                           latências no teste)
+
+Uso (a partir da raiz do projeto):
+    python -m src.distillation build
+    python -m src.distillation build --max-depth 6 --target-agreement 0.995
+    python -m src.distillation report
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from src.artifact_io import SCHEMA_VERSIONS, read_json, sha256_file, staged_directory, write_json
+from src.compiled_ensemble import CompiledEnsemble
+from src.inference import SAMPLE_PATIENT, ObesityPredictor, predict_proba, without_feature_names
+from src.model_artifacts import BUNDLE_DIR, MODELS_DIR, ROOT_DIR
+from src.model_bundle import METRICS_FILE, BundleError, read_manifest
+
+SCHEMA_VERSION = SCHEMA_VERSIONS['distillation']
+
+STUDENT_DIR = 'student_model'
+POLICY_FILE = 'policy.json'
+
+DEFAULT_MAX_DEPTH = 8
+DEFAULT_MIN_SAMPLES_LEAF = 5
+DEFAULT_TARGET_AGREEMENT = 0.99
+DEFAULT_MAX_ACCURACY_DROP = 0.01
+CALIBRATION_SIZE = 0.25
+RANDOM_STATE = 42
+
+
+def student_path(models_dir: str = None) -> str:
+    """Diretório do aluno (models/student_model)"""
+    return os.path.join(models_dir or MODELS_DIR, STUDENT_DIR)
+
+
+def teacher_checksum(models_dir: str = None) -> str:
+    """
+    Identifica o professor gravado em models_dir.
+
+    Com bundle, é o SHA-256 dos checksums do manifesto (modelo e
+    pré-processamento, sem as métricas); sem bundle, o de best_model.pkl.
+
+    Returns:
+        Checksum em hexadecimal, ou None se não houver modelo gravado
+    """
+    models_dir = models_dir or MODELS_DIR
+    bundle_dir = os.path.join(models_dir, BUNDLE_DIR)
+    if os.path.exists(bundle_dir):
+        try:
+            files = read_manifest(bundle_dir)['files']
+        except BundleError:
+            return None
+        files = {relpath: digest for relpath, digest in files.items() if relpath != METRICS_FILE}
+        return hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+    path = os.path.join(models_dir, 'best_model.pkl')
+    return sha256_file(path) if os.path.exists(path) else None
+
+
+def train_student(teacher, X: np.ndarray, max_depth: int = DEFAULT_MAX_DEPTH,
+                  min_samples_leaf: int = DEFAULT_MIN_SAMPLES_LEAF) -> CompiledEnsemble:
+    """
+    Ajusta o aluno às probabilidades do professor.
+
+    Args:
+        teacher: Modelo com predict_proba (sklearn, XGBoost ou CompiledEnsemble)
+        X: Features codificadas e normalizadas (ordem de feature_names)
+        max_depth, min_samples_leaf: Tamanho da árvore
+
+    Returns:
+        Aluno compilado, com as classes do professor
+    """
+    from sklearn.tree import DecisionTreeRegressor
+
+    from src.compiled_ensemble import export_probability_tree
+
+    soft_targets = predict_proba(teacher, X)
+    tree = DecisionTreeRegressor(max_depth=max_depth, min_samples_leaf=min_samples_leaf,
+                                 random_state=RANDOM_STATE).fit(X, soft_targets)
+    return export_probability_tree(tree, teacher.classes_)
+
+
+def calibrate_threshold(student_proba: np.ndarray, teacher_labels: np.ndarray,
+                        target_agreement: float = DEFAULT_TARGET_AGREEMENT) -> float:
+    """
+    Menor limiar de confiança com concordância aluno-professor >= target_agreement.
+
+    Os pacientes são ordenados pela confiança do aluno; o limiar fica na
+    maior cobertura cuja concordância acumulada ainda atinge a meta, sem
+    separar pacientes com a mesma confiança.
+
+    Returns:
+        Limiar em [0, 1], ou inf se nenhuma cobertura atingir a meta (o
+        aluno nunca responde)
+    """
+    confidence = student_proba.max(axis=1)
+    agrees = student_proba.argmax(axis=1) == np.asarray(teacher_labels)
+    order = np.argsort(-confidence, kind='stable')
+    confidence, agrees = confidence[order], agrees[order]
+
+    cumulative = np.cumsum(agrees) / np.arange(1, len(agrees) + 1)
+    # Só vale cortar onde a confiança muda (empates entram ou saem juntos)
+    boundary = np.append(confidence[:-1] > confidence[1:], True)
+    valid = np.flatnonzero((cumulative >= target_agreement) & boundary)
+    return float(confidence[valid[-1]]) if len(valid) else float('inf')
+
+
+def _latency_us(predict, X: np.ndarray) -> np.ndarray:
+    """Latência de cada predição de um paciente (microssegundos)"""
+    predict(X[:1])
+    times = np.empty(len(X))
+    for i in range(len(X)):
+        start = time.perf_counter()
+        predict(X[i:i + 1])
+        times[i] = time.perf_counter() - start
+    return times * 1e6
+
+
+def evaluate_cascade(teacher, student: CompiledEnsemble, threshold: float,
+                     X: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Cobertura, concordância com o professor, acurácias e latências em um conjunto.
+
+    Returns:
+        Dicionário com coverage (fração atendida pelo aluno), agreement
+        (cascata × professor), student_agreement, student_agreement_covered,
+        accuracies de professor/aluno/cascata e latências p50/p99 por paciente
+    """
+    # Uma cópia sem nomes de features para todas as medições de latência
+    teacher = without_feature_names(teacher)
+    teacher_proba = predict_proba(teacher, X)
+    student_proba = student.predict_proba(X)
+    use_student = student_proba.max(axis=1) >= threshold
+    cascade_proba = np.where(use_student[:, None], student_proba, teacher_proba)
+
+    teacher_labels = teacher_proba.argmax(axis=1)
+    student_labels = student_proba.argmax(axis=1)
+    cascade_labels = cascade_proba.argmax(axis=1)
+    y = np.searchsorted(teacher.classes_, np.asarray(y))
+
+    def cascade_predict(row):
+        proba = student.predict_proba(row)
+        return proba if proba.max() >= threshold else predict_proba(teacher, row)
+
+    latency = {name: _latency_us(predict, X) for name, predict in [
+        ('teacher', lambda row: predict_proba(teacher, row)), ('student', student.predict_proba), ('cascade', cascade_predict)]}
+    report = {
+        'n_rows': int(len(X)),
+        'coverage': float(use_student.mean()),
+        'agreement': float((cascade_labels == teacher_labels).mean()),
+        'student_agreement': float((student_labels == teacher_labels).mean()),
+        'student_agreement_covered': float((student_labels == teacher_labels)[use_student].mean())
+        if use_student.any() else None,
+        'teacher_accuracy': float((teacher_labels == y).mean()),
+        'student_accuracy': float((student_labels == y).mean()),
+        'cascade_accuracy': float((cascade_labels == y).mean())
+    }
+    for name, times in latency.items():
+        report[f'{name}_p50_us'] = float(np.percentile(times, 50))
+        report[f'{name}_p99_us'] = float(np.percentile(times, 99))
+        report[f'{name}_mean_us'] = float(times.mean())
+    report['speedup'] = report['teacher_mean_us'] / report['cascade_mean_us']
+    return report
+
+
+def distill(teacher, X_train: np.ndarray, X_test: np.ndarray, y_test: np.ndarray,
+            max_depth: int = DEFAULT_MAX_DEPTH, target_agreement: float = DEFAULT_TARGET_AGREEMENT,
+            max_accuracy_drop: float = DEFAULT_MAX_ACCURACY_DROP) -> tuple:
+    """
+    Treina o aluno, calibra o limiar e avalia a cascata no teste.
+
+    Args:
+        teacher: Modelo completo (professor)
+        X_train: Treino; CALIBRATION_SIZE dele fica de fora do aluno para calibrar o limiar
+        X_test, y_test: Teste do notebook (y codificado)
+        max_depth: Profundidade da árvore do aluno
+        target_agreement: Concordância mínima com o professor entre os pacientes atendidos pelo aluno
+        max_accuracy_drop: Queda de acurácia tolerada no teste (trava de segurança)
+
+    Returns:
+        Tupla (aluno, política): a política tem threshold, os parâmetros,
+        a calibração, o relatório do teste e guardrail_ok
+    """
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_test = np.asarray(X_train, dtype=float), np.asarray(X_test, dtype=float)
+    teacher_labels = predict_proba(teacher, X_train).argmax(axis=1)
+    X_fit, X_calibration, _, labels_calibration = train_test_split(
+        X_train, teacher_labels, test_size=CALIBRATION_SIZE, random_state=RANDOM_STATE, stratify=teacher_labels
+    )
+
+    start = time.perf_counter()
+    student = train_student(teacher, X_fit, max_depth)
+    student_proba = student.predict_proba(X_calibration)
+    threshold = calibrate_threshold(student_proba, labels_calibration, target_agreement)
+    fit_seconds = time.perf_counter() - start
+
+    report = evaluate_cascade(teacher, student, threshold, X_test, y_test)
+    calibration_covered = student_proba.max(axis=1) >= threshold
+    policy = {
+        'schema_version': SCHEMA_VERSION,
+        'threshold': threshold,
+        'max_depth': max_depth,
+        'target_agreement': target_agreement,
+        'max_accuracy_drop': max_accuracy_drop,
+        'teacher': type(teacher).__name__,
+        'student_nodes': int(student.meta['n_nodes']),
+        'fit_seconds': fit_seconds,
+        'calibration': {
+            'n_rows': int(len(X_calibration)),
+            'coverage': float(calibration_covered.mean())
+        },
+        'holdout': report,
+        'guardrail_ok': report['cascade_accuracy'] >= report['teacher_accuracy'] - max_accuracy_drop
+    }
+    return student, policy
+
+
+def save_student(student: CompiledEnsemble, policy: dict, models_dir: str = None) -> str:
+    """
+    Grava aluno e política em models/student_model (substituição atômica do diretório).
+
+    O professor deve ser o modelo já gravado em models_dir; seu checksum vai
+    para a política (teacher_sha256).
+
+    Raises:
+        ValueError: Trava de acurácia reprovada ou nenhum modelo em models_dir
+    """
+    if not policy.get('guardrail_ok'):
+        raise ValueError("Trava de acurácia reprovada; use remove_student para apagar o aluno anterior")
+    checksum = teacher_checksum(models_dir)
+    if checksum is None:
+        raise ValueError(f"Nenhum modelo gravado em {models_dir or MODELS_DIR} para servir de professor")
+
+    directory = os.path.abspath(student_path(models_dir))
+    with staged_directory(directory) as staging:
+        student.save(staging)
+        policy = dict(policy, teacher_sha256=checksum,
+                      created_at=datetime.datetime.now().isoformat(timespec='seconds'))
+        write_json(os.path.join(staging, POLICY_FILE), policy)
+    return directory
+
+
+def remove_student(models_dir: str = None) -> bool:
+    """Apaga models/student_model; retorna True se havia um aluno gravado"""
+    directory = student_path(models_dir)
+    if not os.path.exists(directory):
+        return False
+    shutil.rmtree(directory)
+    return True
+
+
+def load_student(models_dir: str = None) -> tuple:
+    """
+    Aluno e política gravados.
+
+    Returns:
+        Tupla (aluno, política), ou (None, None) se não houver aluno, se for
+        de outra versão do esquema, se a trava de acurácia falhou ou se o
+        professor gravado em models_dir não é o da destilação
+    """
+    directory = student_path(models_dir)
+    path = os.path.join(directory, POLICY_FILE)
+    if not os.path.exists(path):
+        return None, None
+    policy = read_json(path)
+    if policy.get('schema_version') != SCHEMA_VERSION or not policy.get('guardrail_ok'):
+        return None, None
+    if policy.get('teacher_sha256') != teacher_checksum(models_dir):
+        return None, None
+    return CompiledEnsemble.load(directory), policy
+
+
+class CascadePredictor(ObesityPredictor):
+    """
+    Preditor em cascata: aluno destilado primeiro, ensemble completo quando
+    a confiança do aluno fica abaixo do limiar calibrado.
+
+    Mesma interface de ObesityPredictor; predict_with_source também informa
+    quem respondeu. O preditor não guarda estado por predição e pode ser
+    compartilhado entre sessões (st.cache_resource).
+    """
+
+    def __init__(self, model, student: CompiledEnsemble, threshold: float, label_encoders: dict,
+                 target_encoder, scaler, feature_names: list):
+        super().__init__(model, label_encoders, target_encoder, scaler, feature_names)
+        if not np.array_equal(np.asarray(student.classes_), np.asarray(model.classes_)):
+            raise ValueError("Classes do aluno diferentes das do modelo completo")
+        self.student = student
+        self.threshold = threshold
+
+    @classmethod
+    def from_artifacts(cls, artifacts: tuple, models_dir: str = None) -> ObesityPredictor:
+        """Cascata se houver aluno aprovado em models_dir; senão, o preditor comum"""
+        model, label_encoders, target_encoder, scaler, feature_names, _ = artifacts
+        student, policy = load_student(models_dir)
+        if student is None:
+            return ObesityPredictor(model, label_encoders, target_encoder, scaler, feature_names)
+        return cls(model, student, policy['threshold'], label_encoders, target_encoder, scaler, feature_names)
+
+    def warmup(self, record: dict = None) -> float:
+        """Aquece aluno e modelo completo (o exemplo pode não passar pelo professor)"""
+        start = time.perf_counter()
+        predict_proba(self.model, self.preprocessor.transform_record(record or SAMPLE_PATIENT))
+        self.predict(record or SAMPLE_PATIENT)
+        return time.perf_counter() - start
+
+    def predict_with_source(self, record: dict) -> tuple:
+        """
+        Prediz o nível de obesidade de um paciente e informa quem respondeu.
+
+        Returns:
+            Tupla (classe prevista, probabilidades na ordem de self.classes,
+            origem): origem é 'student' se o aluno estava confiante, senão
+            'teacher' (modelo completo)
+        """
+        row = self.preprocessor.transform_record(record)
+        proba = self.student.predict_proba(row)[0]
+        source = 'student'
+        if proba.max() < self.threshold:
+            proba = predict_proba(self.model, row)[0]
+            source = 'teacher'
+        return self.classes[proba.argmax()], proba, source
+
+    def predict(self, record: dict) -> tuple:
+        """
+        Prediz o nível de obesidade de um paciente.
+
+        Returns:
+            Tupla (classe prevista, probabilidades na ordem de self.classes)
+            do aluno, se confiante, ou do modelo completo
+        """
+        predicted_class, proba, _ = self.predict_with_source(record)
+        return predicted_class, proba
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def _print_policy(policy: dict) -> None:
+    report = policy['holdout']
+    print(f"   Limiar de confiança: {policy['threshold']:.3f} (concordância alvo {policy['target_agreement']:.1%}, "
+          f"aluno com {policy['student_nodes']} nós, profundidade {policy['max_depth']})")
+    print(f"   Teste ({report['n_rows']} pacientes): aluno atende {report['coverage']:.1%}, "
+          f"concordância com o professor {report['agreement']:.2%}")
+    print(f"   Acurácia: professor {report['teacher_accuracy']:.2%} | aluno {report['student_accuracy']:.2%} | "
+          f"cascata {report['cascade_accuracy']:.2%}")
+    print(f"   Latência p50/p99 (µs): professor {report['teacher_p50_us']:.0f}/{report['teacher_p99_us']:.0f} | "
+          f"aluno {report['student_p50_us']:.0f}/{report['student_p99_us']:.0f} | "
+          f"cascata {report['cascade_p50_us']:.0f}/{report['cascade_p99_us']:.0f} ({report['speedup']:.1f}x)")
+
+
+def main(argv: list = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Destilação do modelo em uma árvore rasa com cascata")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Treina o aluno, calibra o limiar e grava se a trava passar")
+    build.add_argument('--models-dir', default=MODELS_DIR, help="Diretório dos artefatos (padrão: models/)")
+    build.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH)
+    build.add_argument('--target-agreement', type=float, default=DEFAULT_TARGET_AGREEMENT)
+    build.add_argument('--max-accuracy-drop', type=float, default=DEFAULT_MAX_ACCURACY_DROP)
+
+    report = subparsers.add_parser('report', help="Mostra a política gravada")
+    report.add_argument('--models-dir', default=MODELS_DIR)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'report':
+        path = os.path.join(student_path(args.models_dir), POLICY_FILE)
+        if not os.path.exists(path):
+            print(f"❌ Aluno não encontrado em {student_path(args.models_dir)}")
+            return 1
+        _print_policy(read_json(path))
+        return 0
+
+    from src.dataset_cache import load_dataset
+    from src.model_artifacts import load_model_artifacts
+    from src.training_runner import prepare_training_data
+
+    teacher, _, _, _, feature_names, _ = load_model_artifacts(args.models_dir)
+    data = prepare_training_data(load_dataset(os.path.join(ROOT_DIR, 'data', 'Obesity.csv')))
+    student, policy = distill(teacher, data['X_train'][feature_names], data['X_test'][feature_names],
+                              data['y_test'], args.max_depth, args.target_agreement, args.max_accuracy_drop)
+    _print_policy(policy)
+    if not policy['guardrail_ok']:
+        print(f"❌ Cascata perde mais de {args.max_accuracy_drop:.1%} de acurácia no teste; aluno não gravado")
+        if remove_student(args.models_dir):
+            print(f"   Aluno anterior apagado de {student_path(args.models_dir)}")
+        return 1
+    print(f"✅ Aluno: {save_student(student, policy, args.models_dir)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Cache de Figuras do Dashboard
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Guarda as figuras Plotly (e os agregados que as acompanham) por estado dos
+filtros da barra lateral. Reexecuções que não mudam os filtros, como trocar
+de aba, e sessões diferentes olhando a mesma visão padrão reaproveitam as
+figuras em vez de reconstruí-las.
+
+A chave é um hash canônico de (gêneros, faixa de idade, classes de
+obesidade, versão dos dados): a ordem das seleções na barra lateral não
+importa, e figuras desenhadas com uma versão anterior do dataset nunca são
+devolvidas (saem do LRU com o uso). O cache é
+um LRU limitado por um orçamento de memória, com o tamanho de cada item
+estimado pelo pickle na inserção, e conta acertos, falhas e remoções.
+"""
+
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+
+# Orçamento padrão de memória do cache (bytes)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def filter_key(genders, age_range: tuple, obesity, data_version: str = '') -> str:
+    """
+    Hash canônico do estado dos filtros.
+
+    Args:
+        genders: Gêneros selecionados
+        age_range: Tupla (mínimo, máximo) de idades
+        obesity: Classes de obesidade selecionadas
+        data_version: Versão do dataset (ex.: src.dataset_cache.dataset_version())
+
+    Returns:
+        Hexadecimal curto, igual para seleções com os mesmos valores em
+        qualquer ordem
+    """
+    payload = json.dumps({
+        'genders': sorted(map(str, genders)),
+        'age_range': [float(value) for value in age_range],
+        'obesity': sorted(map(str, obesity)),
+        'data_version': str(data_version)
+    }, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def pickled_size(value) -> int:
+    """Tamanho estimado de um item: bytes do pickle"""
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class FigureCache:
+    """
+    LRU com orçamento de memória, seguro para as threads do Streamlit.
+
+    Itens são tratados como somente leitura: todas as sessões recebem o
+    mesmo objeto.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, sizeof=pickled_size):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def get_or_build(self, key, build):
+        """
+        Item da chave, construído por build() apenas na primeira vez.
+
+        A construção roda fora do lock: duas sessões que erram a mesma chave
+        ao mesmo tempo constroem em paralelo e a segunda inserção prevalece.
+        Itens maiores que o orçamento inteiro são devolvidos sem guardar.
+        """
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key][0]
+            self.misses += 1
+
+        value = build()
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if key in self._items:
+                self.bytes -= self._items.pop(key)[1]
+            self._items[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """Remove todos os itens (contadores são mantidos)"""
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        """Contadores para dimensionar o orçamento"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._items),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes
+            }
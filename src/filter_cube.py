@@ -0,0 +1,547 @@
+"""
+Cubo de Agregados para os Filtros do Dashboard
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Pré-agrega Obesity.csv por Gênero × faixa inteira de idade × Obesidade ×
+hábitos categóricos, guardando contagem e somas das variáveis numéricas em
+cada célula observada. Indicadores e gráficos do dashboard passam a somar
+células do cubo para o filtro atual, em vez de refiltrar e reagrupar todas
+as linhas a cada interação: o custo depende do número de células, que é
+limitado pelas combinações de categorias e não pelo número de pacientes.
+
+Para a matriz de correlação, MomentCube guarda por Gênero × idade ×
+Obesidade as estatísticas suficientes (contagem, médias e co-momentos
+centrados) e as combina com a fórmula de Chan et al., que soma desvios em
+relação à média em vez de somas brutas de produtos (estável numericamente).
+HistogramCube guarda, nas mesmas células, contagens por intervalo fixo de
+uma variável contínua (IMC, idade).
+
+Os três cubos se combinam com merge(): cubos de blocos diferentes do CSV
+(ver src.streaming) somam-se célula a célula sem voltar às linhas.
+
+Idades são fracionárias e o filtro da barra lateral usa limites inteiros,
+então cada idade vira um "bucket" 2*floor(idade) + (idade não inteira).
+Assim, lo <= idade <= hi equivale exatamente a 2*lo <= bucket <= 2*hi, e
+as faixas etárias de pd.cut também saem do bucket sem perda.
+
+Idade ausente (NaN) fica em células com bucket ausente: conta no total sem
+filtro, mas nunca atende a um filtro de idade, como no índice de bitmaps e
+no SQLite (NULL). Nos histogramas, valores ausentes não entram em nenhum
+intervalo e são contados à parte (missing).
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.model_artifacts import NUMERICAL_COLS
+
+# Dimensões categóricas do cubo (além do bucket de idade e da faixa de FAF)
+CATEGORY_DIMS = ['Gender', 'Obesity', 'family_history', 'FAVC', 'CAEC', 'SMOKE', 'SCC', 'CALC', 'MTRANS']
+
+# Faixas etárias (mesmos bins de pd.cut no dashboard, intervalos fechados à direita)
+AGE_BAND_EDGES = [0, 20, 30, 40, 50, 100]
+AGE_BAND_LABELS = ['<20', '20-30', '30-40', '40-50', '50+']
+
+# Faixas de atividade física: (-0.1, 0], (0, 1], (1, 2], (2, máx]
+FAF_BAND_EDGES = [0, 1, 2]
+FAF_BAND_LABELS = ['0 dias/sem', '0-1 dia/sem', '1-2 dias/sem', '≥2 dias/sem']
+
+
+def age_buckets(age) -> np.ndarray:
+    """
+    Bucket de idade: 2*floor(idade), mais 1 se a idade não for inteira.
+
+    As idades devem ser finitas: NaN viraria um bucket sem sentido, então
+    quem chama mascara os ausentes antes (ver _group_cells).
+    """
+    age = np.asarray(age, dtype=float)
+    floor = np.floor(age)
+    return (2 * floor).astype(np.int64) + (age != floor)
+
+
+def _group_cells(df: pd.DataFrame, dims: list) -> tuple:
+    """
+    Agrupa as linhas pelas combinações observadas das dimensões.
+
+    Returns:
+        Tupla (códigos por célula, categorias, índice da célula de cada linha,
+        número de células); código -1 indica categoria ausente
+    """
+    codes, categories = {}, {}
+    for col in dims:
+        if col == 'AgeBucket':
+            # Idade ausente fica com código -1 (fora de qualquer filtro de idade)
+            age = df['Age'].to_numpy(dtype=float)
+            valid = np.isfinite(age)
+            buckets = age_buckets(np.where(valid, age, 0))
+            bucket_min = int(buckets[valid].min()) if valid.any() else 0
+            codes[col] = np.where(valid, buckets - bucket_min, -1)
+            categories[col] = list(range(bucket_min, bucket_min + int(codes[col].max(initial=-1)) + 1))
+        elif col == 'FAFBand':
+            codes[col] = np.searchsorted(FAF_BAND_EDGES, df['FAF'].to_numpy(dtype=float), side='left')
+            categories[col] = list(FAF_BAND_LABELS)
+        else:
+            values = pd.Categorical(df[col])
+            codes[col] = values.codes.astype(np.int64)
+            categories[col] = list(values.categories)
+    return _unique_cells(codes, categories, dims)
+
+
+def _unique_cells(codes: dict, categories: dict, dims: list) -> tuple:
+    """Combinações distintas de códigos (uma por célula) e a célula de cada entrada"""
+    # Código -1 (ausente) vai para uma posição extra em cada dimensão
+    shape = [len(categories[dim]) + 1 for dim in dims]
+    keys = np.ravel_multi_index([np.where(codes[dim] < 0, size - 1, codes[dim])
+                                 for dim, size in zip(dims, shape)], shape)
+    cell_keys, inverse = np.unique(keys, return_inverse=True)
+
+    cell_codes = np.unravel_index(cell_keys, shape)
+    cell_codes = {dim: np.where(code == size - 1, -1, code)
+                  for dim, code, size in zip(dims, cell_codes, shape)}
+    return cell_codes, categories, inverse, len(cell_keys)
+
+
+class _CellTable:
+    """Células com códigos por dimensão e a máscara dos filtros da barra lateral"""
+
+    def __init__(self, codes: dict, categories: dict, counts: np.ndarray):
+        self.codes = codes
+        self.categories = categories
+        self.counts = counts
+
+    @property
+    def n_cells(self) -> int:
+        return len(self.counts)
+
+    def mask(self, genders=None, age_range: tuple = None, obesity=None) -> np.ndarray:
+        """
+        Células que atendem aos filtros da barra lateral.
+
+        Args:
+            genders: Gêneros selecionados (None = todos)
+            age_range: Tupla (mínimo, máximo) de idades inteiras, inclusiva
+            obesity: Classes de obesidade selecionadas (None = todas)
+        """
+        selected = np.ones(self.n_cells, dtype=bool)
+        if genders is not None:
+            selected &= self._isin('Gender', genders)
+        if obesity is not None:
+            selected &= self._isin('Obesity', obesity)
+        if age_range is not None:
+            codes = self.codes['AgeBucket']
+            buckets = np.asarray(self.categories['AgeBucket'], dtype=np.int64)[np.maximum(codes, 0)]
+            selected &= (codes >= 0) & (buckets >= 2 * age_range[0]) & (buckets <= 2 * age_range[1])
+        return selected
+
+    def _isin(self, dim: str, values) -> np.ndarray:
+        wanted = np.isin(self.categories[dim], list(values))
+        codes = self.codes[dim]
+        return (codes >= 0) & wanted[np.maximum(codes, 0)]
+
+    def total(self, mask: np.ndarray = None) -> int:
+        """Número de pacientes nas células selecionadas"""
+        return int(self.counts[mask].sum() if mask is not None else self.counts.sum())
+
+    def to_state(self) -> tuple:
+        """
+        Conteúdo do cubo para gravar em disco.
+
+        Returns:
+            Tupla (arrays NumPy por nome, metadados serializáveis em JSON)
+        """
+        arrays = {'counts': self.counts}
+        arrays.update({f'codes.{dim}': codes for dim, codes in self.codes.items()})
+        categories = {dim: [value.item() if isinstance(value, np.generic) else value for value in values]
+                      for dim, values in self.categories.items()}
+        return arrays, {'categories': categories}
+
+    @staticmethod
+    def _state_cells(arrays: dict, meta: dict) -> tuple:
+        """Códigos, categorias e contagens gravados por to_state()"""
+        codes = {dim: arrays[f'codes.{dim}'] for dim in meta['categories']}
+        return codes, dict(meta['categories']), arrays['counts']
+
+    def _merge_cells(self, other: '_CellTable', dims: list) -> tuple:
+        """
+        Une as células de dois cubos, recodificando as categorias.
+
+        Categorias iguais nos dois cubos mantêm a ordem; caso contrário a
+        união é ordenada, como em pd.Categorical.
+
+        Returns:
+            Tupla (códigos por célula, categorias, célula unida de cada célula
+            de self seguida das de other, número de células)
+        """
+        codes, categories = {}, {}
+        for dim in dims:
+            mine, theirs = list(self.categories[dim]), list(other.categories[dim])
+            merged = mine if mine == theirs else sorted(set(mine) | set(theirs))
+            position = {value: i for i, value in enumerate(merged)}
+            recoded = []
+            for table in (self, other):
+                # Última posição da tabela de conversão atende ao código -1
+                lookup = np.array([position[value] for value in table.categories[dim]] + [-1], dtype=np.int64)
+                recoded.append(lookup[table.codes[dim]])
+            codes[dim] = np.concatenate(recoded)
+            categories[dim] = merged
+        return _unique_cells(codes, categories, dims)
+
+
+class FilterCube(_CellTable):
+    """
+    Contagens e somas por célula (combinação observada de categorias).
+
+    Cada dimensão é guardada como um array de códigos por célula; consultas
+    montam uma máscara booleana sobre as células e reagrupam com bincount.
+    """
+
+    def __init__(self, codes: dict, categories: dict, counts: np.ndarray, sums: dict):
+        super().__init__(codes, categories, counts)
+        self.sums = sums
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'FilterCube':
+        """
+        Constrói o cubo a partir do DataFrame de pacientes.
+
+        Args:
+            df: DataFrame com as colunas de Obesity.csv e BMI
+        """
+        cell_codes, categories, inverse, n_cells = _group_cells(df, CATEGORY_DIMS + ['AgeBucket', 'FAFBand'])
+        counts = np.bincount(inverse, minlength=n_cells)
+        sums = {col: np.bincount(inverse, weights=df[col].to_numpy(dtype=float), minlength=n_cells)
+                for col in NUMERICAL_COLS if col in df}
+
+        cube = cls(cell_codes, categories, counts, sums)
+        cube._add_age_bands()
+        return cube
+
+    def merge(self, other: 'FilterCube') -> 'FilterCube':
+        """Cubo com os pacientes dos dois cubos (ex.: blocos de uma leitura em partes)"""
+        codes, categories, inverse, n_cells = self._merge_cells(other, CATEGORY_DIMS + ['AgeBucket', 'FAFBand'])
+        counts = np.bincount(inverse, weights=np.concatenate([self.counts, other.counts]), minlength=n_cells)
+        sums = {col: np.bincount(inverse, weights=np.concatenate([self.sums[col], other.sums[col]]), minlength=n_cells)
+                for col in self.sums if col in other.sums}
+        cube = FilterCube(codes, categories, counts.astype(np.int64), sums)
+        cube._add_age_bands()
+        return cube
+
+    def to_state(self) -> tuple:
+        arrays, meta = super().to_state()
+        arrays.update({f'sums.{col}': sums for col, sums in self.sums.items()})
+        return arrays, meta
+
+    @classmethod
+    def from_state(cls, arrays: dict, meta: dict) -> 'FilterCube':
+        """Cubo gravado por to_state()"""
+        codes, categories, counts = cls._state_cells(arrays, meta)
+        sums = {name.split('.', 1)[1]: values for name, values in arrays.items() if name.startswith('sums.')}
+        cube = cls(codes, categories, counts, sums)
+        cube._add_age_bands()
+        return cube
+
+    def _add_age_bands(self) -> None:
+        """Faixa etária de cada célula a partir do bucket (idade <= e <=> bucket <= 2e)"""
+        codes = self.codes['AgeBucket']
+        buckets = np.asarray(self.categories['AgeBucket'], dtype=np.int64)[np.maximum(codes, 0)]
+        band = np.searchsorted(2 * np.asarray(AGE_BAND_EDGES), buckets, side='left') - 1
+        outside = (codes < 0) | (band < 0) | (band >= len(AGE_BAND_LABELS))
+        self.codes['AgeBand'] = np.where(outside, -1, band)
+        self.categories['AgeBand'] = list(AGE_BAND_LABELS)
+
+    def sum(self, measure: str, mask: np.ndarray = None) -> float:
+        """Soma de uma variável numérica nas células selecionadas"""
+        return float(self.sums[measure][mask].sum() if mask is not None else self.sums[measure].sum())
+
+    def mean(self, measure: str, mask: np.ndarray = None) -> float:
+        """Média de uma variável numérica (NaN se não houver pacientes)"""
+        total = self.total(mask)
+        return self.sum(measure, mask) / total if total else float('nan')
+
+    def grouped(self, dims: list, mask: np.ndarray = None, measure: str = None) -> np.ndarray:
+        """
+        Tabela densa de contagens (ou somas de measure) por combinação de dims.
+
+        Returns:
+            Array com uma dimensão por item de dims, na ordem de self.categories;
+            células com categoria ausente são descartadas
+        """
+        shape = [len(self.categories[dim]) for dim in dims]
+        valid = np.ones(self.n_cells, dtype=bool) if mask is None else mask.copy()
+        for dim in dims:
+            valid &= self.codes[dim] >= 0
+        keys = np.ravel_multi_index([self.codes[dim][valid] for dim in dims], shape)
+        weights = self.counts[valid] if measure is None else self.sums[measure][valid]
+        table = np.bincount(keys, weights=weights, minlength=int(np.prod(shape)))
+        if measure is None:
+            table = table.astype(np.int64)
+        return table.reshape(shape)
+
+    def value_counts(self, dim: str, mask: np.ndarray = None) -> pd.Series:
+        """Equivalente a value_counts().sort_index() da coluna (apenas categorias presentes)"""
+        counts = self.grouped([dim], mask)
+        present = counts > 0
+        return pd.Series(counts[present], index=self.labels(dim, present), name='count')
+
+    def group_means(self, dim: str, measure: str, mask: np.ndarray = None) -> pd.Series:
+        """Equivalente a groupby(dim)[measure].mean() (apenas categorias presentes)"""
+        counts = self.grouped([dim], mask)
+        sums = self.grouped([dim], mask, measure)
+        present = counts > 0
+        return pd.Series(sums[present] / counts[present], index=self.labels(dim, present), name=measure)
+
+    def crosstab(self, row: str, col: str, mask: np.ndarray = None, normalize: bool = False) -> pd.DataFrame:
+        """
+        Equivalente a pd.crosstab(df[row], df[col], normalize='index' se normalize).
+
+        Linhas e colunas sem pacientes são omitidas, como em pd.crosstab.
+        """
+        table = self.grouped([row, col], mask)
+        rows = table.sum(axis=1) > 0
+        cols = table.sum(axis=0) > 0
+        table = table[rows][:, cols]
+        if normalize:
+            table = table / table.sum(axis=1, keepdims=True)
+        return pd.DataFrame(table, index=self.labels(row, rows), columns=self.labels(col, cols))
+
+    def labels(self, dim: str, selected: np.ndarray = None) -> pd.Index:
+        """Rótulos das categorias de uma dimensão (faixas como categóricas ordenadas)"""
+        categories = self.categories[dim]
+        values = list(np.asarray(categories, dtype=object)[selected]) if selected is not None else categories
+        if dim in ('AgeBand', 'FAFBand'):
+            return pd.CategoricalIndex(values, categories=categories, ordered=True, name=dim)
+        return pd.Index(values, name=dim)
+
+
+def merge_moments(n_a: int, mean_a: np.ndarray, comoment_a: np.ndarray,
+                  n_b: int, mean_b: np.ndarray, comoment_b: np.ndarray) -> tuple:
+    """
+    Combina as estatísticas de dois grupos (Chan, Golub & LeVeque).
+
+    Args:
+        n_*: Número de linhas de cada grupo
+        mean_*: Vetor de médias de cada grupo
+        comoment_*: Matriz de co-momentos centrados, soma de (x - média)(x - média)^T
+
+    Returns:
+        Tupla (n, média, co-momento) do grupo unido
+    """
+    n = n_a + n_b
+    if n_a == 0 or n_b == 0:
+        return (n, mean_b, comoment_b) if n_a == 0 else (n, mean_a, comoment_a)
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / n)
+    comoment = comoment_a + comoment_b + np.outer(delta, delta) * (n_a * n_b / n)
+    return n, mean, comoment
+
+
+def comoment_corr(comoment: np.ndarray, columns: list) -> pd.DataFrame:
+    """Matriz de correlação de Pearson a partir da matriz de co-momentos centrados"""
+    variances = np.diag(comoment)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        divisor = np.sqrt(np.outer(variances, variances))
+        corr = np.where(divisor > 0, comoment / divisor, np.nan)
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+class MomentCube(_CellTable):
+    """
+    Estatísticas suficientes por Gênero × bucket de idade × Obesidade.
+
+    Cada célula guarda contagem, vetor de médias e matriz de co-momentos
+    centrados das variáveis numéricas; a matriz de correlação de qualquer
+    filtro sai da combinação das células em O(células × variáveis²),
+    independente do número de linhas.
+    """
+
+    DIMS = ['Gender', 'AgeBucket', 'Obesity']
+
+    def __init__(self, codes: dict, categories: dict, counts: np.ndarray,
+                 means: np.ndarray, comoments: np.ndarray, columns: list):
+        super().__init__(codes, categories, counts)
+        self.means = means
+        self.comoments = comoments
+        self.columns = list(columns)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: list = None) -> 'MomentCube':
+        """
+        Calcula as estatísticas de cada célula em duas passadas (médias e,
+        depois, produtos dos desvios em relação à média da própria célula).
+
+        Args:
+            df: DataFrame com as colunas de Obesity.csv e BMI
+            columns: Variáveis numéricas (padrão: NUMERICAL_COLS presentes em df)
+        """
+        columns = [col for col in (columns or NUMERICAL_COLS) if col in df]
+        cell_codes, categories, inverse, n_cells = _group_cells(df, cls.DIMS)
+        X = df[columns].to_numpy(dtype=float)
+
+        counts = np.bincount(inverse, minlength=n_cells)
+        means = np.column_stack([np.bincount(inverse, weights=X[:, j], minlength=n_cells)
+                                 for j in range(X.shape[1])]) / counts[:, None]
+        deviations = X - means[inverse]
+
+        n_features = len(columns)
+        comoments = np.empty((n_cells, n_features, n_features))
+        for i in range(n_features):
+            for j in range(i, n_features):
+                product = np.bincount(inverse, weights=deviations[:, i] * deviations[:, j], minlength=n_cells)
+                comoments[:, i, j] = comoments[:, j, i] = product
+        return cls(cell_codes, categories, counts, means, comoments, columns)
+
+    def merge(self, other: 'MomentCube') -> 'MomentCube':
+        """
+        Cubo com os pacientes dos dois cubos.
+
+        Células que coincidem são combinadas pela forma em lote da fórmula de
+        Chan (a mesma de combine()), sem voltar às linhas.
+        """
+        if self.columns != other.columns:
+            raise ValueError(f"Variáveis diferentes: {self.columns} e {other.columns}")
+        codes, categories, inverse, n_cells = self._merge_cells(other, self.DIMS)
+        counts = np.concatenate([self.counts, other.counts])
+        means = np.concatenate([self.means, other.means])
+        comoments = np.concatenate([self.comoments, other.comoments])
+
+        merged_counts = np.bincount(inverse, weights=counts, minlength=n_cells)
+        merged_means = np.zeros((n_cells, len(self.columns)))
+        np.add.at(merged_means, inverse, means * counts[:, None])
+        merged_means /= merged_counts[:, None]
+
+        delta = means - merged_means[inverse]
+        merged_comoments = np.zeros((n_cells, len(self.columns), len(self.columns)))
+        np.add.at(merged_comoments, inverse, comoments + counts[:, None, None] * delta[:, :, None] * delta[:, None, :])
+        return MomentCube(codes, categories, merged_counts.astype(np.int64), merged_means,
+                          merged_comoments, self.columns)
+
+    def to_state(self) -> tuple:
+        arrays, meta = super().to_state()
+        arrays.update(means=self.means, comoments=self.comoments)
+        meta['columns'] = self.columns
+        return arrays, meta
+
+    @classmethod
+    def from_state(cls, arrays: dict, meta: dict) -> 'MomentCube':
+        """Cubo gravado por to_state()"""
+        codes, categories, counts = cls._state_cells(arrays, meta)
+        return cls(codes, categories, counts, arrays['means'], arrays['comoments'], meta['columns'])
+
+    def combine(self, mask: np.ndarray = None) -> tuple:
+        """
+        Estatísticas do conjunto de células selecionado.
+
+        Forma em lote da fórmula de Chan: co-momento total = soma dos
+        co-momentos das células + soma de n_c (média_c - média)(média_c - média)^T.
+
+        Returns:
+            Tupla (n, vetor de médias, matriz de co-momentos)
+        """
+        counts = self.counts if mask is None else self.counts[mask]
+        means = self.means if mask is None else self.means[mask]
+        comoments = self.comoments if mask is None else self.comoments[mask]
+
+        n = int(counts.sum())
+        if n == 0:
+            n_features = len(self.columns)
+            return 0, np.full(n_features, np.nan), np.zeros((n_features, n_features))
+        mean = counts @ means / n
+        delta = means - mean
+        comoment = comoments.sum(axis=0) + (delta * counts[:, None]).T @ delta
+        return n, mean, comoment
+
+    def corr(self, mask: np.ndarray = None) -> pd.DataFrame:
+        """Equivalente a df_filtrado[columns].corr() (Pearson)"""
+        _, _, comoment = self.combine(mask)
+        return comoment_corr(comoment, self.columns)
+
+
+class HistogramCube(_CellTable):
+    """
+    Histograma de uma variável por Gênero × bucket de idade × Obesidade.
+
+    Os intervalos têm largura fixa e bordas em múltiplos dela (intervalo i =
+    [i × largura, (i + 1) × largura)), então cubos de lotes diferentes se
+    combinam somando contagens; a faixa de intervalos cresce conforme os
+    dados.
+    """
+
+    DIMS = ['Gender', 'AgeBucket', 'Obesity']
+
+    def __init__(self, codes: dict, categories: dict, counts: np.ndarray,
+                 bin_counts: np.ndarray, first_bin: int, bin_width: float, measure: str):
+        super().__init__(codes, categories, counts)
+        self.bin_counts = bin_counts
+        self.first_bin = first_bin
+        self.bin_width = bin_width
+        self.measure = measure
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, measure: str, bin_width: float) -> 'HistogramCube':
+        """
+        Args:
+            df: DataFrame com as colunas de Obesity.csv e BMI
+            measure: Variável do histograma
+            bin_width: Largura dos intervalos
+        """
+        cell_codes, categories, inverse, n_cells = _group_cells(df, cls.DIMS)
+        # Valores ausentes ficam fora dos intervalos (contados em missing())
+        values = df[measure].to_numpy(dtype=float)
+        valid = np.isfinite(values)
+        bins = np.floor(values[valid] / bin_width).astype(np.int64)
+        first_bin = int(bins.min()) if len(bins) else 0
+        n_bins = int(bins.max()) - first_bin + 1 if len(bins) else 0
+
+        keys = inverse[valid] * n_bins + (bins - first_bin)
+        bin_counts = np.bincount(keys, minlength=n_cells * n_bins).reshape(n_cells, n_bins)
+        counts = np.bincount(inverse, minlength=n_cells)
+        return cls(cell_codes, categories, counts, bin_counts, first_bin, bin_width, measure)
+
+    def merge(self, other: 'HistogramCube') -> 'HistogramCube':
+        """Cubo com os pacientes dos dois cubos"""
+        if (self.measure, self.bin_width) != (other.measure, other.bin_width):
+            raise ValueError("Histogramas de variáveis ou larguras diferentes")
+        codes, categories, inverse, n_cells = self._merge_cells(other, self.DIMS)
+        tables = [table for table in (self, other) if table.bin_counts.shape[1]]
+        first_bin = min((table.first_bin for table in tables), default=0)
+        last_bin = max((table.first_bin + table.bin_counts.shape[1] for table in tables), default=0)
+
+        bin_counts = np.zeros((n_cells, last_bin - first_bin), dtype=np.int64)
+        offset = 0
+        for table in (self, other):
+            rows = inverse[offset:offset + table.n_cells]
+            start = table.first_bin - first_bin
+            np.add.at(bin_counts, (rows, slice(start, start + table.bin_counts.shape[1])), table.bin_counts)
+            offset += table.n_cells
+        counts = np.bincount(inverse, weights=np.concatenate([self.counts, other.counts]), minlength=n_cells)
+        return HistogramCube(codes, categories, counts.astype(np.int64), bin_counts,
+                             first_bin, self.bin_width, self.measure)
+
+    def to_state(self) -> tuple:
+        arrays, meta = super().to_state()
+        arrays['bin_counts'] = self.bin_counts
+        meta.update(first_bin=self.first_bin, bin_width=self.bin_width, measure=self.measure)
+        return arrays, meta
+
+    @classmethod
+    def from_state(cls, arrays: dict, meta: dict) -> 'HistogramCube':
+        """Cubo gravado por to_state()"""
+        codes, categories, counts = cls._state_cells(arrays, meta)
+        return cls(codes, categories, counts, arrays['bin_counts'],
+                   meta['first_bin'], meta['bin_width'], meta['measure'])
+
+    def histogram(self, mask: np.ndarray = None) -> tuple:
+        """
+        Histograma das células selecionadas.
+
+        Returns:
+            Tupla (contagens, bordas dos intervalos)
+        """
+        counts = self.bin_counts.sum(axis=0) if mask is None else self.bin_counts[mask].sum(axis=0)
+        edges = (self.first_bin + np.arange(len(counts) + 1)) * self.bin_width
+        return counts, edges
+
+    def missing(self, mask: np.ndarray = None) -> int:
+        """Pacientes das células selecionadas sem valor da variável (fora do histograma)"""
+        bin_counts = self.bin_counts if mask is None else self.bin_counts[mask]
+        return self.total(mask) - int(bin_counts.sum())
@@ -0,0 +1,308 @@
+"""
+Busca de Hiperparâmetros com Orçamento
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Alternativa ao GridSearchCV exaustivo do notebook de treinamento (108
+combinações para Random Forest, 72 para XGBoost e 54 para Gradient
+Boosting, cada uma com 5 folds em sequência). A busca usa successive
+halving: todas as combinações começam avaliadas em uma amostra pequena do
+treino, e a cada rodada só a melhor fração (1/factor) segue, com factor
+vezes mais linhas, até a última rodada usar o treino inteiro. Os ajustes
+de cada rodada (combinação × fold) rodam em paralelo com joblib.
+
+O orçamento pode ser limitado por tempo e por ajustes. Os ajustes de uma
+rodada são entregues aos processos em lotes; passado time_budget segundos,
+nenhum lote novo é entregue (o tempo total passa do orçamento no máximo
+pela duração de um lote). Com max_fits, uma rodada só começa se couber
+inteira no orçamento. Se a busca for interrompida, vence a melhor
+combinação da última rodada concluída; se nem a primeira terminou, a
+melhor entre as combinações já avaliadas em todos os folds.
+
+Nos modelos de boosting o número de árvores da grade vira um teto, com
+parada antecipada: Gradient Boosting usa n_iter_no_change sobre uma
+fração de validação interna, e XGBoost usa early_stopping_rounds sobre
+10% do treino de cada fold. O modelo final do XGBoost é reajustado com o
+número de árvores em que a parada antecipada parou nos folds, sem parada
+no ajuste final (o ensemble compilado exporta todas as árvores).
+
+Uso (a partir da raiz do projeto):
+    python -m src.hyperparameter_search "Random Forest" --time-budget 120
+    python -m src.hyperparameter_search XGBoost --workers 8 --output relatorio_xgboost.json
+"""
+
+import argparse
+import datetime
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from src.artifact_io import write_json
+from src.model_artifacts import MODELS_DIR, ROOT_DIR
+from src.training_runner import RANDOM_STATE, build_model, prepare_training_data
+
+# Grades do notebook de treinamento
+PARAM_GRIDS = {
+    'Random Forest': {
+        'n_estimators': [100, 200, 300],
+        'max_depth': [10, 20, 30, None],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4]
+    },
+    'XGBoost': {
+        'n_estimators': [100, 200, 300],
+        'max_depth': [3, 5, 7, 10],
+        'learning_rate': [0.01, 0.1, 0.3],
+        'subsample': [0.8, 1.0]
+    },
+    'Gradient Boosting': {
+        'n_estimators': [100, 200, 300],
+        'max_depth': [3, 5, 7],
+        'learning_rate': [0.01, 0.1, 0.3],
+        'subsample': [0.8, 1.0]
+    }
+}
+
+# Parada antecipada dos modelos de boosting (rodadas sem melhora)
+EARLY_STOPPING_ROUNDS = 10
+EARLY_STOPPING_FRACTION = 0.1
+
+# Relatório de cada modelo, ao lado de model_metrics.pkl
+SEARCH_REPORT_FILE = 'hyperparameter_search_{model}.json'
+
+# Ajustes entregues por lote, por processo (o orçamento de tempo é conferido entre lotes)
+FITS_PER_WORKER_BATCH = 2
+
+
+def search_report_path(name: str, models_dir: str = None) -> str:
+    """Relatório da busca do modelo (ex.: models/hyperparameter_search_random_forest.json)"""
+    return os.path.join(models_dir or MODELS_DIR, SEARCH_REPORT_FILE.format(model=name.lower().replace(' ', '_')))
+
+
+def _early_stopping_params(name: str) -> dict:
+    """Parâmetros fixos de parada antecipada do modelo (vazio se não for boosting)"""
+    if name == 'Gradient Boosting':
+        return {'n_iter_no_change': EARLY_STOPPING_ROUNDS, 'validation_fraction': EARLY_STOPPING_FRACTION}
+    if name == 'XGBoost':
+        return {'early_stopping_rounds': EARLY_STOPPING_ROUNDS}
+    return {}
+
+
+def _fit_and_score(name: str, params: dict, X, y, train: np.ndarray, val: np.ndarray) -> tuple:
+    """
+    Ajusta uma combinação em um fold.
+
+    Returns:
+        Tupla (acurácia no fold de validação, árvores usadas ou None)
+    """
+    model = build_model(name).set_params(**params, **_early_stopping_params(name))
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+
+    X_train, y_train = X[train], y[train]
+    if name == 'XGBoost':
+        # Conjunto de parada tirado do treino do fold (o fold de validação fica intacto)
+        from sklearn.model_selection import train_test_split
+        X_fit, X_stop, y_fit, y_stop = train_test_split(
+            X_train, y_train, test_size=EARLY_STOPPING_FRACTION, random_state=RANDOM_STATE, stratify=y_train
+        )
+        model.fit(X_fit, y_fit, eval_set=[(X_stop, y_stop)], verbose=False)
+        n_trees = model.best_iteration + 1
+    else:
+        model.fit(X_train, y_train)
+        n_trees = getattr(model, 'n_estimators_', None)
+    return model.score(X[val], y[val]), n_trees
+
+
+def successive_halving(name: str, X_train, y_train, param_grid: dict = None, factor: int = 3,
+                       cv: int = 5, time_budget: float = None, max_fits: int = None,
+                       workers: int = -1, seed: int = RANDOM_STATE) -> dict:
+    """
+    Busca por successive halving com orçamento de tempo e de ajustes.
+
+    Args:
+        name: Modelo (chave de PARAM_GRIDS)
+        X_train, y_train: Treino do notebook
+        param_grid: Grade (padrão: PARAM_GRIDS[name])
+        factor: Fração de combinações mantida (1/factor) e aumento de linhas por rodada
+        cv: Folds estratificados por rodada
+        time_budget: Segundos após os quais nenhum lote de ajustes é entregue
+        max_fits: Máximo de ajustes (combinação × fold) somando as rodadas
+        workers: Processos do joblib (-1 = todos os núcleos)
+        seed: Semente da amostra de linhas de cada rodada
+
+    Returns:
+        Dicionário com best_params, best_score, best_estimator (reajustado no
+        treino inteiro), trajectory (uma entrada por rodada), n_fits,
+        equivalent_full_fits (ajustes ponderados pela fração de linhas),
+        grid_fits (ajustes do GridSearchCV exaustivo), seconds e stopped_by
+    """
+    from joblib import Parallel, delayed, effective_n_jobs
+    from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+    X = np.asarray(X_train, dtype=float)
+    y = np.asarray(y_train)
+    candidates = list(ParameterGrid(param_grid or PARAM_GRIDS[name]))
+    n_samples, n_classes = len(y), len(np.unique(y))
+
+    # Rodadas até restar uma combinação; a última usa o treino inteiro. A
+    # primeira amostra precisa de linhas de todas as classes em cada fold e no
+    # conjunto de parada antecipada
+    n_rounds = 1 + int(math.floor(math.log(len(candidates), factor) + 1e-9))
+    min_resources = max(n_samples // factor ** (n_rounds - 1), 4 * cv * n_classes)
+
+    # Mesma ordem aleatória de linhas em todas as rodadas (amostras encaixadas)
+    order = np.random.default_rng(seed).permutation(n_samples)
+
+    batch_size = FITS_PER_WORKER_BATCH * effective_n_jobs(workers)
+
+    def over_budget():
+        return time_budget is not None and time.perf_counter() - start > time_budget
+
+    start = time.perf_counter()
+    trajectory, n_fits, equivalent_fits, stopped_by = [], 0, 0.0, None
+    with Parallel(n_jobs=workers) as parallel:
+        for round_index in range(n_rounds):
+            n_resources = n_samples if round_index == n_rounds - 1 else min(
+                n_samples, min_resources * factor ** round_index)
+            round_fits = len(candidates) * cv
+            if trajectory and over_budget():
+                stopped_by = 'time_budget'
+                break
+            if max_fits is not None and trajectory and n_fits + round_fits > max_fits:
+                stopped_by = 'max_fits'
+                break
+
+            rows = np.sort(order[:n_resources])
+            folds = list(StratifiedKFold(n_splits=cv).split(rows, y[rows]))
+            jobs = [(params, train, val) for params in candidates for train, val in folds]
+            outputs = []
+            for first in range(0, len(jobs), batch_size):
+                # Na primeira rodada, pelo menos uma combinação é avaliada em todos os folds
+                if over_budget() and (trajectory or len(outputs) >= cv):
+                    stopped_by = 'time_budget'
+                    break
+                outputs += parallel(delayed(_fit_and_score)(name, params, X, y, rows[train], rows[val])
+                                    for params, train, val in jobs[first:first + batch_size])
+
+            n_fits += len(outputs)
+            equivalent_fits += len(outputs) * n_resources / n_samples
+            if stopped_by and trajectory:
+                # Rodada incompleta: vale a melhor combinação da rodada anterior
+                break
+
+            candidates = candidates[:len(outputs) // cv]
+            outputs = outputs[:len(candidates) * cv]
+            scores = np.array([score for score, _ in outputs]).reshape(len(candidates), cv)
+            n_trees = [[trees for _, trees in outputs[i * cv:(i + 1) * cv]] for i in range(len(candidates))]
+            mean_scores = scores.mean(axis=1)
+
+            ranking = np.argsort(-mean_scores, kind='stable')
+            best = ranking[0]
+            trajectory.append({
+                'round': round_index,
+                'n_candidates': len(candidates),
+                'n_resources': int(n_resources),
+                'best_score': float(mean_scores[best]),
+                'best_params': candidates[best],
+                'scores': [float(score) for score in mean_scores[ranking]],
+                'elapsed_seconds': time.perf_counter() - start,
+                'complete': stopped_by is None
+            })
+
+            best_params, best_score, best_trees = candidates[best], float(mean_scores[best]), n_trees[best]
+            if stopped_by:
+                break
+            keep = max(1, math.ceil(len(candidates) / factor))
+            candidates = [candidates[i] for i in ranking[:keep]]
+            n_trees = [n_trees[i] for i in ranking[:keep]]
+
+    # Modelo final no treino inteiro; no XGBoost, com as árvores da parada antecipada
+    final_params = dict(best_params)
+    if name == 'XGBoost':
+        final_params['n_estimators'] = int(np.median(best_trees))
+    elif name == 'Gradient Boosting':
+        final_params.update(_early_stopping_params(name))
+    best_estimator = build_model(name).set_params(**final_params)
+    best_estimator.fit(X_train, y_train)
+
+    return {
+        'model_name': name,
+        'best_params': final_params,
+        'best_score': best_score,
+        'best_estimator': best_estimator,
+        'trajectory': trajectory,
+        'n_fits': n_fits,
+        'equivalent_full_fits': equivalent_fits,
+        'grid_fits': len(list(ParameterGrid(param_grid or PARAM_GRIDS[name]))) * cv,
+        'seconds': time.perf_counter() - start,
+        'stopped_by': stopped_by,
+        'factor': factor,
+        'cv': cv
+    }
+
+
+def save_search_report(result: dict, models_dir: str = None, extra: dict = None, path: str = None) -> str:
+    """
+    Grava melhores parâmetros, trajetória e tempo em JSON ao lado de model_metrics.pkl.
+
+    Cada modelo tem seu arquivo (search_report_path), para que buscas de
+    modelos diferentes não se sobrescrevam.
+
+    Args:
+        result: Retorno de successive_halving
+        models_dir: Diretório dos artefatos (padrão: models/)
+        extra: Campos adicionais (ex.: acurácia no teste)
+        path: Arquivo de destino (substitui o padrão do modelo em models_dir)
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    report = {key: value for key, value in result.items() if key != 'best_estimator'}
+    report.update(extra or {})
+    report['saved_at'] = datetime.datetime.now().isoformat(timespec='seconds')
+    path = path or search_report_path(result['model_name'], models_dir)
+    write_json(path, report)
+    return path
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argv: list = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros por successive halving")
+    parser.add_argument('model', choices=list(PARAM_GRIDS), help="Modelo a otimizar")
+    parser.add_argument('--factor', type=int, default=3, help="Fator de corte e de aumento de linhas por rodada")
+    parser.add_argument('--time-budget', type=float, help="Segundos após os quais nenhum lote de ajustes é entregue")
+    parser.add_argument('--max-fits', type=int, help="Máximo de ajustes (combinação × fold)")
+    parser.add_argument('--workers', type=int, default=-1, help="Processos (-1 = todos os núcleos)")
+    parser.add_argument('--output', help="Relatório JSON (padrão: models/hyperparameter_search_<modelo>.json)")
+    args = parser.parse_args(argv)
+
+    from sklearn.metrics import accuracy_score
+    from src.dataset_cache import load_dataset
+
+    data = prepare_training_data(load_dataset(os.path.join(ROOT_DIR, 'data', 'Obesity.csv')))
+    result = successive_halving(args.model, data['X_train'], data['y_train'], factor=args.factor,
+                                time_budget=args.time_budget, max_fits=args.max_fits, workers=args.workers)
+    test_accuracy = accuracy_score(data['y_test'], result['best_estimator'].predict(data['X_test']))
+
+    for entry in result['trajectory']:
+        print(f"   Rodada {entry['round']}: {entry['n_candidates']:3d} combinações × {entry['n_resources']:,} linhas "
+              f"| melhor CV {entry['best_score']:.2%} | {entry['elapsed_seconds']:.1f}s")
+    print(f"✅ {args.model}: {result['best_params']}")
+    print(f"   CV {result['best_score']:.2%} | teste {test_accuracy:.2%} | {result['n_fits']} ajustes "
+          f"(≈{result['equivalent_full_fits']:.0f} no treino inteiro, contra {result['grid_fits']} do GridSearchCV) "
+          f"em {result['seconds']:.1f}s" + (f" | interrompida por {result['stopped_by']}" if result['stopped_by'] else ""))
+
+    path = save_search_report(result, extra={'test_accuracy': test_accuracy}, path=args.output)
+    print(f"   Relatório: {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
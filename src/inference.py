@@ -0,0 +1,128 @@
+"""
+Inferência de Baixa Latência para um Paciente
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Usa o pré-processamento fundido (src/preprocessing.py) para que a predição
+de um único paciente não precise montar DataFrames nem chamar LabelEncoder e
+StandardScaler a cada requisição.
+"""
+
+import copy
+import time
+
+import numpy as np
+
+from src.preprocessing import FusedPreprocessor
+
+# Paciente de exemplo (aquecimento do modelo e gerador de carga)
+SAMPLE_PATIENT = {
+    'Gender': 'Male', 'Age': 30, 'Height': 1.75, 'Weight': 80,
+    'family_history': 'yes', 'FAVC': 'yes', 'FCVC': 2.0, 'NCP': 3.0,
+    'CAEC': 'Sometimes', 'SMOKE': 'no', 'CH2O': 2.0, 'SCC': 'no',
+    'FAF': 1.0, 'TUE': 1.0, 'CALC': 'Sometimes', 'MTRANS': 'Public_Transportation'
+}
+
+
+def without_feature_names(model):
+    """
+    Modelo pronto para receber ndarray na ordem de colunas do treino.
+
+    O modelo do notebook foi treinado com DataFrame, e o sklearn avisa a cada
+    predição com ndarray ("X does not have valid feature names"). Em vez de
+    filtrar o aviso por chamada (warnings.catch_warnings altera estado global
+    do processo e não é thread-safe), devolve uma cópia rasa sem
+    feature_names_in_; as árvores continuam compartilhadas com o original.
+    """
+    if 'feature_names_in_' not in getattr(model, '__dict__', {}):
+        return model
+    model = copy.copy(model)
+    del model.feature_names_in_
+    return model
+
+
+def predict_proba(model, X: np.ndarray) -> np.ndarray:
+    """predict_proba com o ndarray já pré-processado (veja without_feature_names)"""
+    return without_feature_names(model).predict_proba(X)
+
+
+class ObesityPredictor:
+    """
+    Preditor de um único paciente com uma só passada pelo modelo.
+
+    A classe prevista é o argmax de predict_proba, evitando percorrer o
+    ensemble duas vezes (predict + predict_proba).
+    """
+
+    def __init__(self, model, label_encoders: dict, target_encoder, scaler, feature_names: list):
+        # Sem feature_names_in_: predict_proba não precisa silenciar avisos a cada chamada
+        self.model = without_feature_names(model)
+        self.preprocessor = FusedPreprocessor(label_encoders, scaler, feature_names)
+        self.classes = target_encoder.inverse_transform(model.classes_)
+
+    @classmethod
+    def from_artifacts(cls, artifacts: tuple) -> 'ObesityPredictor':
+        """Cria o preditor a partir da tupla de load_model_artifacts()"""
+        model, label_encoders, target_encoder, scaler, feature_names, _ = artifacts
+        return cls(model, label_encoders, target_encoder, scaler, feature_names)
+
+    def predict(self, record: dict) -> tuple:
+        """
+        Prediz o nível de obesidade de um paciente.
+
+        Args:
+            record: Dicionário com as variáveis de Obesity.csv (BMI opcional)
+
+        Returns:
+            Tupla (classe prevista, array de probabilidades na ordem de self.classes)
+        """
+        proba = predict_proba(self.model, self.preprocessor.transform_record(record))[0]
+        return self.classes[proba.argmax()], proba
+
+    def warmup(self, record: dict = None) -> float:
+        """
+        Executa uma predição descartável para pagar os custos da primeira
+        chamada (páginas do memory-map, caches do modelo) antes do primeiro
+        usuário.
+
+        Returns:
+            Duração da predição de aquecimento em segundos
+        """
+        start = time.perf_counter()
+        self.predict(record or SAMPLE_PATIENT)
+        return time.perf_counter() - start
+
+
+def measure_latency(predictor: ObesityPredictor, record: dict, n_runs: int = 1000) -> dict:
+    """
+    Mede a latência de predição de um paciente.
+
+    Args:
+        predictor: Preditor já inicializado
+        record: Registro usado em todas as execuções
+        n_runs: Número de execuções medidas (após uma execução de aquecimento)
+
+    Returns:
+        Dicionário com p50, p99 e média em microssegundos, separando a montagem
+        do vetor de features do tempo total
+    """
+    predictor.predict(record)
+
+    build_times = np.empty(n_runs)
+    total_times = np.empty(n_runs)
+    for i in range(n_runs):
+        start = time.perf_counter()
+        predictor.preprocessor.transform_record(record)
+        build_times[i] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        predictor.predict(record)
+        total_times[i] = time.perf_counter() - start
+
+    to_us = 1e6
+    return {
+        'build_p50_us': np.percentile(build_times, 50) * to_us,
+        'build_p99_us': np.percentile(build_times, 99) * to_us,
+        'total_p50_us': np.percentile(total_times, 50) * to_us,
+        'total_p99_us': np.percentile(total_times, 99) * to_us,
+        'total_mean_us': total_times.mean() * to_us
+    }
@@ -0,0 +1,72 @@
+"""
+Carregamento dos Artefatos do Modelo
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Funções compartilhadas entre as aplicações Streamlit, scripts de linha de
+comando e testes para carregar o modelo treinado e seus artefatos.
+"""
+
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(ROOT_DIR, 'models')
+
+# Colunas usadas no treinamento (mesma ordem do notebook 02_model_training)
+CATEGORICAL_COLS = ['Gender', 'family_history', 'FAVC', 'CAEC', 'SMOKE', 'SCC', 'CALC', 'MTRANS']
+NUMERICAL_COLS = ['Age', 'Height', 'Weight', 'FCVC', 'NCP', 'CH2O', 'FAF', 'TUE', 'BMI']
+
+# Subdiretório do ensemble compilado (src/compiled_ensemble.py)
+COMPILED_MODEL_DIR = 'compiled_model'
+
+# Subdiretório do bundle versionado (src/model_bundle.py)
+BUNDLE_DIR = 'model_bundle'
+
+
+def load_model_artifacts(models_dir: str = None, compiled: bool = False, use_bundle: bool = True) -> tuple:
+    """
+    Carrega modelo e artefatos gerados pelo notebook de treinamento.
+
+    Quando existe models/model_bundle, carrega tudo dele (um manifesto com
+    checksums e arrays em memory-map); caso contrário lê os pickles avulsos.
+
+    Args:
+        models_dir: Diretório dos artefatos (padrão: models/ na raiz do projeto)
+        compiled: Se True, usa o ensemble compilado em arrays (models/compiled_model)
+            no lugar de best_model.pkl. O bundle já guarda o modelo compilado
+            quando há exportador; se ele guardou um pickle, gera ValueError
+        use_bundle: Se False, ignora o bundle e lê os pickles
+
+    Raises:
+        ValueError: compiled=True e o modelo gravado não tem ensemble compilado
+
+    Returns:
+        Tupla (model, label_encoders, target_encoder, scaler, feature_names, metrics)
+    """
+    models_dir = models_dir or MODELS_DIR
+
+    bundle_dir = os.path.join(models_dir, BUNDLE_DIR)
+    if use_bundle and os.path.exists(bundle_dir):
+        from src.model_bundle import load_bundle, read_manifest
+        saved_model = read_manifest(bundle_dir)['model']
+        if compiled and saved_model['format'] != 'compiled':
+            raise ValueError(f"O bundle em {bundle_dir} não tem ensemble compilado "
+                             f"(modelo {saved_model['type']} gravado em pickle)")
+        return load_bundle(bundle_dir)
+
+    import joblib
+
+    if compiled:
+        from src.compiled_ensemble import CompiledEnsemble
+        model = CompiledEnsemble.load(os.path.join(models_dir, COMPILED_MODEL_DIR))
+    else:
+        model = joblib.load(os.path.join(models_dir, 'best_model.pkl'))
+    label_encoders = joblib.load(os.path.join(models_dir, 'label_encoders.pkl'))
+    target_encoder = joblib.load(os.path.join(models_dir, 'target_encoder.pkl'))
+    scaler = joblib.load(os.path.join(models_dir, 'scaler.pkl'))
+    feature_names = joblib.load(os.path.join(models_dir, 'feature_names.pkl'))
+
+    # Métricas são opcionais (apenas informativas)
+    metrics_path = os.path.join(models_dir, 'model_metrics.pkl')
+    metrics = joblib.load(metrics_path) if os.path.exists(metrics_path) else None
+
+    return model, label_encoders, target_encoder, scaler, feature_names, metrics
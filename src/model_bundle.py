@@ -0,0 +1,281 @@
+"""
+Pacote Versionado do Modelo (Bundle)
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Reúne modelo, encoders, scaler, nomes das features e métricas em um único
+diretório descrito por manifest.json (versão do esquema e SHA-256 de cada
+arquivo), no lugar de seis pickles carregados um a um.
+
+Layout de models/model_bundle/:
+    manifest.json        Versão do esquema, tipo do modelo e checksums
+    preprocessing.json   Features, classes dos encoders e parâmetros do scaler
+    metrics.json         Métricas do notebook (opcional)
+    model/               Ensemble compilado: um .npy por array (memory-map)
+    model.joblib         Apenas para modelos sem exportador compilado
+
+Os arrays do ensemble são abertos com np.load(mmap_mode='r'): as páginas
+ficam no cache do sistema operacional e são compartilhadas, somente
+leitura, entre todos os processos do Streamlit, do serviço HTTP e dos testes.
+
+Uso (a partir da raiz do projeto):
+    python -m src.model_bundle build models/
+    python -m src.model_bundle verify models/model_bundle
+"""
+
+import argparse
+import datetime
+import os
+import sys
+
+import numpy as np
+
+from src.artifact_io import SCHEMA_VERSIONS, read_json, sha256_file, staged_directory, write_json
+from src.compiled_ensemble import CompiledEnsemble, export_model
+
+SCHEMA_VERSION = SCHEMA_VERSIONS['model_bundle']
+
+MANIFEST_FILE = 'manifest.json'
+PREPROCESSING_FILE = 'preprocessing.json'
+METRICS_FILE = 'metrics.json'
+COMPILED_MODEL_DIR = 'model'
+PICKLED_MODEL_FILE = 'model.joblib'
+
+
+class BundleError(ValueError):
+    """Bundle ausente, corrompido ou de versão incompatível"""
+
+
+class BundleLabelEncoder:
+    """
+    Subconjunto do LabelEncoder reconstruído do bundle.
+
+    Mantém a mesma interface usada pelo projeto (classes_, transform,
+    inverse_transform) sem importar sklearn na inicialização dos apps.
+    """
+
+    def __init__(self, classes):
+        self.classes_ = np.array(classes, dtype=object)
+
+    def transform(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=object)
+        codes = np.minimum(np.searchsorted(self.classes_, values), len(self.classes_) - 1)
+        unseen = self.classes_[codes] != values
+        if unseen.any():
+            raise ValueError(f"y contains previously unseen labels: {sorted(map(str, set(values[unseen])))}")
+        return codes
+
+    def inverse_transform(self, codes) -> np.ndarray:
+        return self.classes_[np.asarray(codes, dtype=int)]
+
+
+class BundleScaler:
+    """Subconjunto do StandardScaler reconstruído do bundle: (X - média) / escala"""
+
+    def __init__(self, mean, var, scale, n_samples_seen: int, columns: list = None):
+        self.mean_ = np.array(mean)
+        self.var_ = np.array(var)
+        self.scale_ = np.array(scale)
+        self.n_samples_seen_ = np.int64(n_samples_seen)
+        self.n_features_in_ = len(self.mean_)
+        if columns:
+            self.feature_names_in_ = np.array(columns, dtype=object)
+
+    def transform(self, X) -> np.ndarray:
+        X = np.array(X, dtype=float)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+
+def save_bundle(directory: str, model, label_encoders: dict, target_encoder, scaler,
+                feature_names: list, metrics: dict = None) -> dict:
+    """
+    Grava o bundle do modelo (substituição atômica do diretório).
+
+    Args:
+        directory: Diretório de destino (ex.: models/model_bundle)
+        model, label_encoders, target_encoder, scaler, feature_names, metrics:
+            Artefatos gerados pelo notebook de treinamento
+
+    Returns:
+        Manifesto gravado
+    """
+    with staged_directory(directory) as staging:
+        try:
+            model_format = 'compiled'
+            export_model(model).save(os.path.join(staging, COMPILED_MODEL_DIR))
+        except ValueError:
+            # Modelo sem exportador (ex.: LogisticRegression): mantém o pickle
+            import joblib
+            model_format = 'joblib'
+            joblib.dump(model, os.path.join(staging, PICKLED_MODEL_FILE))
+
+        scaler_cols = list(getattr(scaler, 'feature_names_in_', []))
+        write_json(os.path.join(staging, PREPROCESSING_FILE), {
+            'feature_names': list(feature_names),
+            'categories': {col: [str(v) for v in encoder.classes_] for col, encoder in label_encoders.items()},
+            'target_classes': [str(v) for v in target_encoder.classes_],
+            'scaler': {
+                'columns': scaler_cols,
+                'mean': np.asarray(scaler.mean_).tolist(),
+                'var': np.asarray(scaler.var_).tolist(),
+                'scale': np.asarray(scaler.scale_).tolist(),
+                'n_samples_seen': int(scaler.n_samples_seen_)
+            }
+        })
+
+        if metrics is not None:
+            payload = {key: value for key, value in metrics.items() if key != 'results_df'}
+            if 'results_df' in metrics:
+                table = metrics['results_df']
+                payload['results_df'] = {'columns': list(table.columns), 'data': table.to_numpy().tolist()}
+            write_json(os.path.join(staging, METRICS_FILE), payload)
+
+        files = {}
+        for root, _, filenames in os.walk(staging):
+            for filename in sorted(filenames):
+                path = os.path.join(root, filename)
+                files[os.path.relpath(path, staging).replace(os.sep, '/')] = sha256_file(path)
+
+        manifest = {
+            'schema_version': SCHEMA_VERSION,
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'model': {'format': model_format, 'type': type(model).__name__},
+            'files': dict(sorted(files.items()))
+        }
+        write_json(os.path.join(staging, MANIFEST_FILE), manifest)
+    return manifest
+
+
+def read_manifest(directory: str) -> dict:
+    """
+    Lê e valida o manifesto do bundle.
+
+    Raises:
+        BundleError: Manifesto ausente ou versão de esquema incompatível
+    """
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        raise BundleError(f"Bundle não encontrado: {path}")
+    manifest = read_json(path)
+    if manifest.get('schema_version') != SCHEMA_VERSION:
+        raise BundleError(
+            f"Versão do bundle incompatível: {manifest.get('schema_version')} "
+            f"(esperada {SCHEMA_VERSION}). Gere o bundle novamente pelo notebook."
+        )
+    return manifest
+
+
+def verify_bundle(directory: str) -> dict:
+    """
+    Confere o SHA-256 de todos os arquivos listados no manifesto.
+
+    Returns:
+        Manifesto validado
+
+    Raises:
+        BundleError: Arquivo ausente ou com checksum divergente
+    """
+    manifest = read_manifest(directory)
+    for relpath, expected in manifest['files'].items():
+        path = os.path.join(directory, relpath)
+        if not os.path.exists(path):
+            raise BundleError(f"Arquivo do bundle ausente: {relpath}")
+        if sha256_file(path) != expected:
+            raise BundleError(f"Checksum divergente: {relpath}")
+    return manifest
+
+
+def load_bundle(directory: str, mmap_mode: str = 'r', verify: bool = False) -> tuple:
+    """
+    Carrega o bundle gravado por save_bundle().
+
+    Args:
+        directory: Diretório do bundle
+        mmap_mode: Modo de memory-map dos arrays do ensemble (None = em memória)
+        verify: Se True, confere os checksums antes de carregar. Desligado por
+            padrão: reler e hashear todos os arquivos a cada inicialização
+            anularia o ganho do memory-map; a conferência roda uma vez, no
+            build ou na CI (python -m src.model_bundle verify)
+
+    Returns:
+        Tupla (model, label_encoders, target_encoder, scaler, feature_names, metrics),
+        no mesmo formato de src.model_artifacts.load_model_artifacts(); encoders
+        e scaler são BundleLabelEncoder/BundleScaler (sem importar sklearn)
+    """
+    manifest = verify_bundle(directory) if verify else read_manifest(directory)
+
+    if manifest['model']['format'] == 'compiled':
+        model = CompiledEnsemble.load(os.path.join(directory, COMPILED_MODEL_DIR), mmap_mode=mmap_mode)
+    else:
+        import joblib
+        model = joblib.load(os.path.join(directory, PICKLED_MODEL_FILE))
+
+    preprocessing = read_json(os.path.join(directory, PREPROCESSING_FILE))
+
+    label_encoders = {col: BundleLabelEncoder(classes) for col, classes in preprocessing['categories'].items()}
+    target_encoder = BundleLabelEncoder(preprocessing['target_classes'])
+    params = preprocessing['scaler']
+    scaler = BundleScaler(params['mean'], params['var'], params['scale'],
+                          params['n_samples_seen'], params['columns'])
+
+    metrics = load_bundle_metrics(directory)
+    return model, label_encoders, target_encoder, scaler, preprocessing['feature_names'], metrics
+
+
+def load_bundle_metrics(directory: str) -> dict:
+    """
+    Lê apenas as métricas do bundle (sem carregar modelo nem sklearn).
+
+    Returns:
+        Dicionário de métricas com results_df como DataFrame, ou None se o
+        bundle não tiver métricas
+    """
+    metrics_path = os.path.join(directory, METRICS_FILE)
+    if not os.path.exists(metrics_path):
+        return None
+    metrics = read_json(metrics_path)
+    if 'results_df' in metrics:
+        import pandas as pd
+        table = metrics['results_df']
+        metrics['results_df'] = pd.DataFrame(table['data'], columns=table['columns'])
+    return metrics
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Bundle versionado do modelo")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Gera o bundle a partir dos pickles de models/")
+    build_parser.add_argument('models_dir', help="Diretório com best_model.pkl e demais artefatos")
+    build_parser.add_argument('--output', help="Destino (padrão: <models_dir>/model_bundle)")
+
+    verify_parser = subparsers.add_parser('verify', help="Confere versão e checksums do bundle")
+    verify_parser.add_argument('bundle_dir', help="Diretório do bundle")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        from src.model_artifacts import BUNDLE_DIR, load_model_artifacts
+        artifacts = load_model_artifacts(args.models_dir, use_bundle=False)
+        output = args.output or os.path.join(args.models_dir, BUNDLE_DIR)
+        manifest = save_bundle(output, *artifacts)
+        print(f"✅ Bundle gravado em {output} ({len(manifest['files'])} arquivos, "
+              f"modelo {manifest['model']['type']} em formato {manifest['model']['format']})")
+        return 0
+
+    try:
+        manifest = verify_bundle(args.bundle_dir)
+    except BundleError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(f"✅ Bundle íntegro: esquema v{manifest['schema_version']}, {len(manifest['files'])} arquivos")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+Avaliação por Predições Fora do Fold (Out-of-Fold)
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+No notebook de treinamento, a acurácia, a precisão, o recall e o F1 do
+teste saíam de um ajuste; cross_val_score reajustava o mesmo modelo mais
+cinco vezes e descartava tudo além da acurácia de cada fold; e a matriz de
+confusão e a acurácia por classe eram recalculadas depois. Aqui cada fold
+é ajustado uma única vez (pelas tarefas de src.training_runner), as
+probabilidades de cada fold de validação são guardadas em uma matriz
+out-of-fold do tamanho do treino, e todas as métricas, a matriz de
+confusão e a acurácia por classe são derivadas desses arrays, em NumPy.
+
+O resultado fica em models/evaluation/, lido pela aba "Modelo de ML" do
+dashboard sem recalcular nada (e sem importar scikit-learn):
+    manifest.json   Versão do esquema, classes, modelos, métricas de teste
+                    e out-of-fold, matrizes de confusão e SHA-256 dos arrays
+    arrays.npz      y_train, y_test, folds e as probabilidades out-of-fold
+                    e de teste de cada modelo (modelo × linha × classe)
+
+Uso (a partir da raiz do projeto):
+    python -m src.oof_evaluation build --workers 4
+    python -m src.oof_evaluation show
+"""
+
+import argparse
+import datetime
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.artifact_io import SCHEMA_VERSIONS, read_json, sha256_file, staged_directory, write_json
+from src.model_artifacts import MODELS_DIR, ROOT_DIR
+
+SCHEMA_VERSION = SCHEMA_VERSIONS['oof_evaluation']
+
+EVALUATION_DIR = 'evaluation'
+MANIFEST_FILE = 'manifest.json'
+ARRAYS_FILE = 'arrays.npz'
+
+# Piso das probabilidades no log loss (evita log(0))
+LOG_LOSS_EPS = 1e-15
+
+
+def evaluation_path(models_dir: str = None) -> str:
+    """Diretório da avaliação (models/evaluation)"""
+    return os.path.join(models_dir or MODELS_DIR, EVALUATION_DIR)
+
+
+# ============================================================================
+# MÉTRICAS A PARTIR DOS ARRAYS
+# ============================================================================
+
+def confusion_from_labels(y_true: np.ndarray, y_pred: np.ndarray, n_classes: int) -> np.ndarray:
+    """Matriz de confusão (linhas = classe real, colunas = prevista)"""
+    y_true, y_pred = np.asarray(y_true, dtype=np.int64), np.asarray(y_pred, dtype=np.int64)
+    return np.bincount(y_true * n_classes + y_pred, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+
+def classification_metrics(y_true: np.ndarray, proba: np.ndarray) -> dict:
+    """
+    Métricas do notebook derivadas das probabilidades (mesmos valores do sklearn).
+
+    Args:
+        y_true: Classes codificadas (0..n_classes-1)
+        proba: Probabilidades por classe (linhas × classes)
+
+    Returns:
+        Dicionário com accuracy, precision, recall e f1_score (média
+        ponderada pelo suporte, como average='weighted'), log_loss,
+        confusion_matrix e class_accuracy (recall de cada classe)
+    """
+    y_true = np.asarray(y_true, dtype=np.int64)
+    n_classes = proba.shape[1]
+    cm = confusion_from_labels(y_true, proba.argmax(axis=1), n_classes)
+    tp = np.diag(cm).astype(float)
+    support, predicted = cm.sum(axis=1), cm.sum(axis=0)
+
+    # Divisões por zero valem 0, como zero_division=0 no sklearn
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    weights = support / support.sum()
+
+    true_proba = np.clip(proba[np.arange(len(y_true)), y_true], LOG_LOSS_EPS, 1.0)
+    return {
+        'accuracy': float(tp.sum() / len(y_true)),
+        'precision': float(weights @ precision),
+        'recall': float(weights @ recall),
+        'f1_score': float(weights @ f1),
+        'log_loss': float(-np.log(true_proba).mean()),
+        'confusion_matrix': cm,
+        'class_accuracy': recall
+    }
+
+
+def fold_scores(y_true: np.ndarray, proba: np.ndarray, folds: np.ndarray) -> np.ndarray:
+    """Acurácia de cada fold (mesmos valores de cross_val_score)"""
+    correct = proba.argmax(axis=1) == np.asarray(y_true)
+    return np.array([correct[folds == fold].mean() for fold in range(int(folds.max()) + 1)])
+
+
+def summarize(y_train: np.ndarray, y_test: np.ndarray, folds: np.ndarray,
+              oof_proba: np.ndarray, test_proba: np.ndarray) -> dict:
+    """Métricas de teste e out-of-fold de um modelo"""
+    scores = fold_scores(y_train, oof_proba, folds)
+    return {
+        'holdout': classification_metrics(y_test, test_proba),
+        'oof': dict(classification_metrics(y_train, oof_proba), fold_scores=scores,
+                    cv_mean=float(scores.mean()), cv_std=float(scores.std()))
+    }
+
+
+# ============================================================================
+# PERSISTÊNCIA
+# ============================================================================
+
+def save_evaluation(results: dict, y_train: np.ndarray, y_test: np.ndarray, folds: np.ndarray,
+                    class_names: list, models_dir: str = None, selected_model: str = None) -> dict:
+    """
+    Grava probabilidades e métricas em models/evaluation (substituição
+    atômica do diretório).
+
+    Args:
+        results: Resultados de src.training_runner.train_model_zoo (com
+            oof_proba e test_proba)
+        y_train, y_test, folds: Alvos e folds usados no treinamento
+        class_names: Classes do target_encoder, na ordem dos códigos
+        models_dir: Diretório dos artefatos (padrão: models/)
+        selected_model: Modelo em produção (destacado no dashboard)
+
+    Returns:
+        Manifesto gravado
+    """
+    with staged_directory(evaluation_path(models_dir)) as staging:
+        names = list(results)
+        y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+        oof_proba = np.stack([results[name]['oof_proba'] for name in names])
+        test_proba = np.stack([results[name]['test_proba'] for name in names])
+        np.savez(os.path.join(staging, ARRAYS_FILE), y_train=y_train, y_test=y_test, folds=np.asarray(folds),
+                 oof_proba=oof_proba, test_proba=test_proba)
+
+        manifest = {
+            'schema_version': SCHEMA_VERSION,
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'class_names': [str(name) for name in class_names],
+            'models': names,
+            'selected_model': selected_model,
+            'n_train': int(len(y_train)),
+            'n_test': int(len(y_test)),
+            'n_folds': int(np.max(folds)) + 1,
+            'metrics': {name: summarize(y_train, y_test, folds, oof_proba[i], test_proba[i])
+                        for i, name in enumerate(names)},
+            'files': {ARRAYS_FILE: sha256_file(os.path.join(staging, ARRAYS_FILE))}
+        }
+        write_json(os.path.join(staging, MANIFEST_FILE), manifest)
+    return load_evaluation(models_dir)
+
+
+def load_evaluation(models_dir: str = None) -> dict:
+    """
+    Manifesto da avaliação (métricas já calculadas, sem ler os arrays).
+
+    Returns:
+        Manifesto com confusion_matrix, class_accuracy e fold_scores como
+        arrays NumPy, ou None se ausente ou de outra versão do esquema
+    """
+    path = os.path.join(evaluation_path(models_dir), MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    manifest = read_json(path)
+    if manifest.get('schema_version') != SCHEMA_VERSION:
+        return None
+    for summary in manifest['metrics'].values():
+        for metrics in summary.values():
+            for key in ('confusion_matrix', 'class_accuracy', 'fold_scores'):
+                if key in metrics:
+                    metrics[key] = np.asarray(metrics[key])
+    return manifest
+
+
+def load_evaluation_arrays(models_dir: str = None, verify: bool = True) -> dict:
+    """
+    Probabilidades e alvos gravados.
+
+    Raises:
+        ValueError: Se o SHA-256 de arrays.npz não confere com o manifesto
+    """
+    directory = evaluation_path(models_dir)
+    path = os.path.join(directory, ARRAYS_FILE)
+    if verify:
+        manifest = load_evaluation(models_dir)
+        if manifest is None or sha256_file(path) != manifest['files'][ARRAYS_FILE]:
+            raise ValueError(f"Avaliação corrompida ou desatualizada: {directory}")
+    with np.load(path) as arrays:
+        return {key: arrays[key] for key in arrays.files}
+
+
+def persisted_model_name(models_dir: str = None) -> str:
+    """
+    Nome do modelo gravado em models_dir (model_name das métricas do bundle
+    ou de model_metrics.pkl), ou None se não houver métricas.
+    """
+    from src.model_artifacts import BUNDLE_DIR
+    from src.model_bundle import load_bundle_metrics
+
+    models_dir = models_dir or MODELS_DIR
+    bundle_dir = os.path.join(models_dir, BUNDLE_DIR)
+    if os.path.exists(bundle_dir):
+        metrics = load_bundle_metrics(bundle_dir)
+    else:
+        import joblib
+        path = os.path.join(models_dir, 'model_metrics.pkl')
+        metrics = joblib.load(path) if os.path.exists(path) else None
+    return metrics.get('model_name') if metrics else None
+
+
+def evaluation_table(manifest: dict) -> pd.DataFrame:
+    """Tabela de comparação: métricas de teste e out-of-fold por modelo"""
+    rows = []
+    for name in manifest['models']:
+        holdout, oof = manifest['metrics'][name]['holdout'], manifest['metrics'][name]['oof']
+        rows.append({
+            'Modelo': name,
+            'Acurácia teste (%)': holdout['accuracy'] * 100,
+            'F1 teste (%)': holdout['f1_score'] * 100,
+            'Acurácia OOF (%)': oof['accuracy'] * 100,
+            'F1 OOF (%)': oof['f1_score'] * 100,
+            'Log loss OOF': oof['log_loss'],
+            'CV (%)': oof['cv_mean'] * 100,
+            'CV desvio (pp)': oof['cv_std'] * 100
+        })
+    return pd.DataFrame(rows).sort_values('Acurácia teste (%)', ascending=False).reset_index(drop=True)
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argv: list = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Avaliação dos modelos por predições out-of-fold")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Treina os modelos uma vez por fold e grava a avaliação "
+                                                "(o modelo gravado em models/ precisa estar entre eles)")
+    build.add_argument('--workers', type=int, help="Processos do pool (padrão: núcleos disponíveis)")
+    build.add_argument('--models-dir', default=MODELS_DIR, help="Diretório dos artefatos (padrão: models/)")
+
+    show = subparsers.add_parser('show', help="Mostra a avaliação gravada")
+    show.add_argument('--models-dir', default=MODELS_DIR)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        from src.dataset_cache import load_dataset
+        from src.training_runner import MODEL_NAMES, fold_assignments, prepare_training_data, train_model_zoo
+
+        # O modelo destacado é o gravado em models/, não o mais acurado do zoo: um
+        # modelo otimizado no notebook não é reproduzido aqui
+        selected = persisted_model_name(args.models_dir)
+        if selected not in MODEL_NAMES:
+            print(f"❌ Modelo gravado em {args.models_dir} ({selected or 'sem métricas'}) não está entre os "
+                  f"avaliados ({', '.join(MODEL_NAMES)}); avaliação não gravada")
+            return 1
+
+        data = prepare_training_data(load_dataset(os.path.join(ROOT_DIR, 'data', 'Obesity.csv')))
+        results, report = train_model_zoo(data['X_train'], data['y_train'], data['X_test'], data['y_test'],
+                                          workers=args.workers)
+        save_evaluation(results, data['y_train'], data['y_test'], fold_assignments(data['y_train']),
+                        data['target_encoder'].classes_, args.models_dir, selected_model=selected)
+        print(f"✅ {report['n_jobs']} ajustes (modelo × fold) em {report['wall_seconds']:.1f}s")
+
+    manifest = load_evaluation(args.models_dir)
+    if manifest is None:
+        print(f"❌ Avaliação não encontrada em {evaluation_path(args.models_dir)}")
+        return 1
+    print(evaluation_table(manifest).round(2).to_string(index=False))
+    print(f"   {evaluation_path(args.models_dir)} ({manifest['created_at']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
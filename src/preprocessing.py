@@ -0,0 +1,150 @@
+"""
+Pré-processamento Fundido (Encoding + Normalização)
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Substitui as chamadas LabelEncoder.transform por coluna e o
+StandardScaler.transform sobre cópias de DataFrame por um único objeto
+pré-computado a partir de label_encoders.pkl e scaler.pkl: tabelas de
+consulta por variável categórica e vetores de média/escala já alinhados com
+a ordem de feature_names.
+"""
+
+import numpy as np
+
+from src.model_artifacts import CATEGORICAL_COLS, NUMERICAL_COLS
+
+
+class UnknownCategoryError(ValueError):
+    """Valor categórico não visto no treinamento"""
+
+    def __init__(self, column: str, values, accepted):
+        self.column = column
+        self.values = list(values)
+        self.accepted = list(accepted)
+        super().__init__(
+            f"Categoria desconhecida para '{column}': {self.values[:5]}. "
+            f"Valores aceitos: {self.accepted}"
+        )
+
+
+class FusedPreprocessor:
+    """
+    Converte registros brutos na matriz usada pelo modelo em uma passada.
+
+    Categóricas viram códigos (mesma numeração do LabelEncoder) e, em
+    seguida, toda a matriz passa por (X - média) / escala. Nas posições
+    categóricas a média é 0 e a escala é 1, então a normalização das
+    numéricas é uma única operação vetorizada sobre a matriz inteira.
+    """
+
+    def __init__(self, label_encoders: dict, scaler, feature_names: list):
+        self.feature_names = list(feature_names)
+        n_features = len(self.feature_names)
+
+        # Tabelas de consulta (registro único) e classes ordenadas (lote)
+        self.category_classes = {col: np.asarray(label_encoders[col].classes_) for col in CATEGORICAL_COLS}
+        self.category_codes = {
+            col: {value: code for code, value in enumerate(classes)}
+            for col, classes in self.category_classes.items()
+        }
+
+        self.mean = np.zeros(n_features)
+        self.scale = np.ones(n_features)
+        scaler_cols = list(getattr(scaler, 'feature_names_in_', NUMERICAL_COLS))
+        for col, mean, scale in zip(scaler_cols, scaler.mean_, scaler.scale_):
+            position = self.feature_names.index(col)
+            self.mean[position] = mean
+            self.scale[position] = scale
+
+        self._plan = [(col, self.category_codes.get(col)) for col in self.feature_names]
+
+    @classmethod
+    def from_artifacts(cls, artifacts: tuple) -> 'FusedPreprocessor':
+        """Cria o pré-processador a partir da tupla de load_model_artifacts()"""
+        _, label_encoders, _, scaler, feature_names, _ = artifacts
+        return cls(label_encoders, scaler, feature_names)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def transform_record(self, record: dict) -> np.ndarray:
+        """
+        Converte um paciente em matriz (1, n_features).
+
+        Args:
+            record: Dicionário com as variáveis de Obesity.csv (BMI opcional)
+
+        Returns:
+            Array 2D com uma linha pronta para o modelo
+
+        Raises:
+            UnknownCategoryError: Valor categórico não visto no treinamento
+            KeyError: Variável obrigatória ausente
+        """
+        if 'BMI' not in record:
+            record = dict(record, BMI=record['Weight'] / (record['Height'] ** 2))
+
+        row = np.empty((1, self.n_features), dtype=float)
+        values = row[0]
+        for i, (col, codes) in enumerate(self._plan):
+            value = record[col]
+            if codes is None:
+                values[i] = value
+            else:
+                try:
+                    values[i] = codes[value]
+                except KeyError:
+                    raise UnknownCategoryError(col, [value], codes) from None
+
+        np.subtract(row, self.mean, out=row)
+        np.divide(row, self.scale, out=row)
+        return row
+
+    def transform(self, batch) -> np.ndarray:
+        """
+        Converte um lote bruto em matriz (n, n_features).
+
+        Args:
+            batch: DataFrame ou dicionário coluna -> array com as variáveis de
+                Obesity.csv (BMI é calculado se ausente)
+
+        Returns:
+            Array 2D pronto para o modelo
+
+        Raises:
+            UnknownCategoryError: Valor categórico não visto no treinamento
+        """
+        columns = {col: np.asarray(batch[col]) for col in self.feature_names if col != 'BMI'}
+        if 'BMI' in batch:
+            columns['BMI'] = np.asarray(batch['BMI'], dtype=float)
+        else:
+            columns['BMI'] = columns['Weight'].astype(float) / (columns['Height'].astype(float) ** 2)
+
+        n_rows = len(columns['BMI'])
+        X = np.empty((n_rows, self.n_features), dtype=float)
+        for i, col in enumerate(self.feature_names):
+            if col in self.category_classes:
+                X[:, i] = self._encode_column(col, columns[col])
+            else:
+                X[:, i] = columns[col]
+
+        X -= self.mean
+        X /= self.scale
+        return X
+
+    def _encode_column(self, col: str, values: np.ndarray) -> np.ndarray:
+        """Códigos do LabelEncoder via busca binária nas classes ordenadas"""
+        classes = self.category_classes[col]
+        values = values.astype(classes.dtype, copy=False)
+        try:
+            codes = np.searchsorted(classes, values)
+        except TypeError:
+            # Valores de outro tipo (ex.: NaN em coluna de texto)
+            invalid = {value for value in values if not isinstance(value, type(classes[0]))}
+            raise UnknownCategoryError(col, invalid, classes) from None
+        codes = np.minimum(codes, len(classes) - 1)
+        unknown = classes[codes] != values
+        if unknown.any():
+            raise UnknownCategoryError(col, np.unique(values[unknown].astype(str)), classes)
+        return codes
@@ -0,0 +1,345 @@
+"""
+Serviço HTTP de Predição com Micro-Batching
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Servidor HTTP mínimo (asyncio, apenas biblioteca padrão + artefatos do
+modelo) que agrupa requisições concorrentes em micro-lotes: as requisições
+que chegam dentro de uma janela de tempo configurável são pontuadas com uma
+única chamada a predict_proba. Quando a fila enche, o serviço responde 503
+(backpressure) em vez de acumular latência.
+
+Uso (a partir da raiz do projeto):
+    python -m src.scoring_service serve --port 8080 --batch-window-ms 5
+    python -m src.scoring_service load-test --port 8080 --requests 2000 --concurrency 64
+
+Endpoints:
+    POST /predict  -> corpo JSON com as variáveis de Obesity.csv
+    GET  /health   -> estatísticas do micro-batching
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.inference import SAMPLE_PATIENT, ObesityPredictor, predict_proba
+from src.model_artifacts import load_model_artifacts
+from src.translations import get_obesity_label
+
+DEFAULT_BATCH_WINDOW_MS = 5.0
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_QUEUE = 4096
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 503: 'Service Unavailable'}
+
+
+class QueueFullError(Exception):
+    """Fila de predição cheia (o cliente deve tentar novamente)"""
+
+
+class MicroBatcher:
+    """
+    Agrupa predições concorrentes em lotes.
+
+    Cada requisição monta seu vetor de features e entra na fila; um único
+    worker retira o primeiro item, espera até batch_window_ms por mais itens
+    (ou até max_batch_size) e chama predict_proba uma vez para o lote inteiro.
+    """
+
+    def __init__(self, predictor: ObesityPredictor, batch_window_ms: float = DEFAULT_BATCH_WINDOW_MS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.predictor = predictor
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_queue = max_queue
+        self.stats = {'requests': 0, 'rejected': 0, 'batches': 0, 'largest_batch': 0}
+        self._queue = None
+        self._worker = None
+        # Uma thread dedicada mantém o event loop livre durante predict_proba
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self):
+        """Inicia o worker de micro-batching no event loop atual"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Encerra o worker"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def predict(self, record: dict) -> tuple:
+        """
+        Enfileira um paciente e aguarda a predição do lote.
+
+        Raises:
+            ValueError: Registro inválido (categoria desconhecida, campo ausente)
+            QueueFullError: Fila cheia
+        """
+        try:
+            row = self.predictor.preprocessor.transform_record(record)[0]
+        except KeyError as e:
+            raise ValueError(f"Campo obrigatório ausente: {e.args[0]}") from None
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((row, future))
+        except asyncio.QueueFull:
+            self.stats['rejected'] += 1
+            raise QueueFullError("Fila de predição cheia") from None
+
+        self.stats['requests'] += 1
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            X = np.vstack([row for row, _ in batch])
+            try:
+                proba = await loop.run_in_executor(self._executor, predict_proba, self.predictor.model, X)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            labels = self.predictor.classes[proba.argmax(axis=1)]
+            for (_, future), label, row_proba in zip(batch, labels, proba):
+                if not future.done():
+                    future.set_result((label, row_proba))
+
+            self.stats['batches'] += 1
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+
+
+class ScoringServer:
+    """Servidor HTTP/1.1 (keep-alive) sobre asyncio.start_server"""
+
+    def __init__(self, batcher: MicroBatcher, host: str = '127.0.0.1', port: int = 8080):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        """Inicia o servidor; com port=0 a porta escolhida fica em self.port"""
+        await self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Encerra o servidor e o worker de micro-batching"""
+        self._server.close()
+        await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                data = json.dumps(payload).encode('utf-8')
+                extra = 'Retry-After: 1\r\n' if status == 503 else ''
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"{extra}"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple:
+        if method == 'GET' and path == '/health':
+            stats = dict(self.batcher.stats, queue_depth=self.batcher._queue.qsize())
+            stats['mean_batch_size'] = stats['requests'] / stats['batches'] if stats['batches'] else 0.0
+            return 200, stats
+
+        if method == 'POST' and path == '/predict':
+            try:
+                record = json.loads(body)
+            except ValueError as e:
+                return 400, {'error': str(e)}
+            if not isinstance(record, dict):
+                return 400, {'error': "O corpo deve ser um objeto JSON com as variáveis do paciente"}
+
+            try:
+                label, proba = await self.batcher.predict(record)
+            except QueueFullError as e:
+                return 503, {'error': str(e)}
+            except KeyError as e:
+                return 400, {'error': f"Variável obrigatória ausente: {e.args[0]}"}
+            except (ValueError, TypeError) as e:
+                return 400, {'error': str(e)}
+
+            return 200, {
+                'prediction': str(label),
+                'label': get_obesity_label(str(label)),
+                'probabilities': {str(cls): float(p) for cls, p in zip(self.batcher.predictor.classes, proba)}
+            }
+
+        return 404, {'error': f"Rota não encontrada: {method} {path}"}
+
+
+async def run_load_test(host: str, port: int, record: dict, n_requests: int = 1000,
+                        concurrency: int = 32) -> dict:
+    """
+    Gerador de carga local: n_requests POST /predict em conexões keep-alive.
+
+    Args:
+        host, port: Endereço do serviço
+        record: Paciente enviado em todas as requisições
+        n_requests: Total de requisições
+        concurrency: Número de conexões simultâneas
+
+    Returns:
+        Dicionário com throughput, latências (ms) e contagem por status HTTP
+    """
+    body = json.dumps(record).encode('utf-8')
+    request = (
+        f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode('latin-1') + body
+
+    latencies = []
+    status_counts = {}
+    remaining = [n_requests]
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                start = time.perf_counter()
+                writer.write(request)
+                await writer.drain()
+
+                status = int((await reader.readline()).split()[1])
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':')[1])
+                await reader.readexactly(length)
+
+                latencies.append(time.perf_counter() - start)
+                status_counts[status] = status_counts.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed if elapsed > 0 else float('inf'),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'status_counts': status_counts
+    }
+
+
+def main(argv: list = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Serviço HTTP de predição de obesidade")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help="Iniciar o serviço")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080)
+    serve.add_argument('--models-dir', default=None, help="Diretório dos artefatos do modelo")
+    serve.add_argument('--compiled', action='store_true',
+                       help="Usar o ensemble compilado em arrays (models/compiled_model)")
+    serve.add_argument('--batch-window-ms', type=float, default=DEFAULT_BATCH_WINDOW_MS,
+                       help="Janela para agrupar requisições em um lote")
+    serve.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    serve.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                       help="Tamanho máximo da fila antes de responder 503")
+
+    load = subparsers.add_parser('load-test', help="Gerar carga contra um serviço local")
+    load.add_argument('--host', default='127.0.0.1')
+    load.add_argument('--port', type=int, default=8080)
+    load.add_argument('--requests', type=int, default=2000)
+    load.add_argument('--concurrency', type=int, default=64)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        predictor = ObesityPredictor.from_artifacts(load_model_artifacts(args.models_dir, compiled=args.compiled))
+        batcher = MicroBatcher(predictor, args.batch_window_ms, args.max_batch_size, args.max_queue)
+        server = ScoringServer(batcher, args.host, args.port)
+        print(f"✅ Serviço de predição em http://{args.host}:{args.port} "
+              f"(janela {args.batch_window_ms}ms, lote máx. {args.max_batch_size})")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    stats = asyncio.run(run_load_test(args.host, args.port, SAMPLE_PATIENT,
+                                      args.requests, args.concurrency))
+    print(f"✅ {stats['requests']:,} requisições em {stats['seconds']:.2f}s "
+          f"({stats['requests_per_second']:,.0f} req/s)")
+    print(f"   Latência p50: {stats['p50_ms']:.2f}ms | p99: {stats['p99_ms']:.2f}ms")
+    print(f"   Status HTTP: {stats['status_counts']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
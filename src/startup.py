@@ -0,0 +1,66 @@
+"""
+Medição de Inicialização dos Apps Streamlit
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Cronometra as fases de uma execução do script (imports, artefatos,
+aquecimento, renderização) e registra o tempo até a primeira renderização
+de cada sessão. Bibliotecas usadas só em algumas abas (plotly, pandas,
+joblib) são importadas dentro dessas abas, e as paletas de cor são
+memorizadas em src/translations.py sem importar matplotlib.
+"""
+
+import sys
+import time
+
+# Referência do processo: primeira importação deste módulo pelo servidor
+PROCESS_START = time.perf_counter()
+
+FIRST_RENDER_KEY = '_startup_first_render'
+
+
+class StartupTimer:
+    """Cronômetro de fases de uma execução do script"""
+
+    def __init__(self, start: float = None):
+        self.start = start if start is not None else time.perf_counter()
+        self.phases = {}
+        self._last = self.start
+
+    def mark(self, phase: str) -> None:
+        """Encerra a fase atual com o nome informado"""
+        now = time.perf_counter()
+        self.phases[phase] = (now - self._last) * 1000
+        self._last = now
+
+    def report(self) -> dict:
+        """Duração de cada fase e total em milissegundos"""
+        return {
+            'phases_ms': dict(self.phases),
+            'total_ms': (self._last - self.start) * 1000,
+            'since_process_start_ms': (self._last - PROCESS_START) * 1000
+        }
+
+
+def report_first_render(session_state, timer: StartupTimer, app_name: str) -> dict:
+    """
+    Registra o tempo até a primeira renderização da sessão.
+
+    Apenas a primeira execução do script em cada sessão é registrada (e
+    impressa no log do servidor); as seguintes reaproveitam o valor.
+
+    Args:
+        session_state: st.session_state da sessão atual
+        timer: Cronômetro iniciado no topo do script
+        app_name: Nome do app usado no log
+
+    Returns:
+        Relatório da primeira renderização da sessão
+    """
+    if FIRST_RENDER_KEY not in session_state:
+        timer.mark('renderizacao')
+        report = timer.report()
+        session_state[FIRST_RENDER_KEY] = report
+        phases = ', '.join(f"{name} {ms:.0f}ms" for name, ms in report['phases_ms'].items())
+        print(f"[startup] {app_name}: primeira renderização em {report['total_ms']:.0f}ms ({phases})",
+              file=sys.stderr, flush=True)
+    return session_state[FIRST_RENDER_KEY]
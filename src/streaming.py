@@ -0,0 +1,361 @@
+"""
+Ingestão em Blocos com Agregados Incrementais
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Lê CSVs no esquema de data/Obesity.csv em blocos de linhas e mantém
+agregados combináveis (src.filter_cube): contagens por classe, somas para
+as médias por grupo de FAF e CH2O, contagens das tabelas cruzadas,
+estatísticas da matriz de correlação e histogramas de IMC e idade. Cada
+bloco vira um cubo pequeno que é somado ao acumulado e descartado, então a
+memória fica limitada pelo tamanho do bloco e pelo número de células, e
+não pelo número de pacientes.
+
+Novos arquivos entram sem reprocessar os anteriores. Para cada fonte o
+manifesto guarda SHA-256, tamanho e número de linhas lidas:
+    - mesmo conteúdo: nada é lido;
+    - arquivo que cresceu com os bytes antigos intactos (linhas acrescentadas
+      ao final): apenas o trecho novo é lido;
+    - qualquer outra mudança: os agregados não podem ser subtraídos.
+      AggregateStore.ingest recusa o arquivo com SourceChangedError, e
+      ensure_aggregates (usado pelo comando ingest e, por refresh_aggregates,
+      pelo dashboard) refaz os agregados relendo todas as fontes conhecidas.
+      --rebuild força essa releitura mesmo sem mudanças.
+
+Erros de esquema (colunas ausentes) ou de leitura de um arquivo não
+refazem nada: o erro é propagado e os agregados gravados ficam como estão.
+
+Layout de data/cache/aggregates/:
+    manifest.json     Versão do esquema, fontes ingeridas e metadados dos cubos
+    aggregates.npz    Arrays dos cubos
+
+Uso (a partir da raiz do projeto):
+    python -m src.streaming ingest
+    python -m src.streaming ingest data/novos_pacientes.csv --chunksize 100000
+    python -m src.streaming ingest data/Obesity.csv data/novos_pacientes.csv --rebuild
+"""
+
+import argparse
+import datetime
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.artifact_io import SCHEMA_VERSIONS, read_json, sha256_file, staged_directory, write_json
+from src.dataset_cache import CACHE_DIR, DATA_PATH
+from src.filter_cube import CATEGORY_DIMS, FilterCube, HistogramCube, MomentCube
+from src.model_artifacts import NUMERICAL_COLS
+
+SCHEMA_VERSION = SCHEMA_VERSIONS['streaming']
+
+STORE_DIR = os.path.join(CACHE_DIR, 'aggregates')
+MANIFEST_FILE = 'manifest.json'
+ARRAYS_FILE = 'aggregates.npz'
+
+# Linhas lidas por bloco
+DEFAULT_CHUNKSIZE = 50_000
+
+# Largura dos intervalos finos dos histogramas (divide as larguras
+# "redondas" usadas pelo dashboard, ver src.chart_data.rebin_histogram)
+HISTOGRAM_BIN_WIDTHS = {'BMI': 0.1, 'Age': 0.5}
+
+# Colunas obrigatórias de cada CSV (BMI é calculado se ausente)
+REQUIRED_COLUMNS = CATEGORY_DIMS + [col for col in NUMERICAL_COLS if col != 'BMI']
+
+
+class SourceChangedError(ValueError):
+    """Arquivo já ingerido mudou de outra forma que não por linhas acrescentadas ao final"""
+
+
+def _read_chunks(path: str, offset: int, columns: list, chunksize: int):
+    """
+    Blocos do CSV a partir de um deslocamento em bytes.
+
+    Com offset 0 o arquivo é lido inteiro, com cabeçalho; depois dele, os
+    bytes novos são lidos sem cabeçalho, com os nomes de coluna gravados.
+    """
+    with open(path, 'rb') as f:
+        if offset:
+            f.seek(offset)
+            reader = pd.read_csv(f, chunksize=chunksize, header=None, names=columns)
+        else:
+            reader = pd.read_csv(f, chunksize=chunksize)
+        yield from reader
+
+
+def _prepare_chunk(chunk: pd.DataFrame, source: str) -> pd.DataFrame:
+    """Valida o esquema de um bloco e acrescenta o IMC"""
+    missing = [col for col in REQUIRED_COLUMNS if col not in chunk]
+    if missing:
+        raise ValueError(f"{source}: colunas ausentes {missing}")
+    if 'BMI' not in chunk:
+        chunk = chunk.assign(BMI=chunk['Weight'] / (chunk['Height'] ** 2))
+    return chunk
+
+
+class AggregateStore:
+    """
+    Agregados acumulados de todos os CSVs ingeridos.
+
+    Attributes:
+        cube: FilterCube (contagens, somas e tabelas cruzadas)
+        moments: MomentCube (matriz de correlação)
+        histograms: HistogramCube por variável (HISTOGRAM_BIN_WIDTHS)
+        sources: Manifesto de cada arquivo ingerido, por caminho absoluto
+    """
+
+    def __init__(self, cube: FilterCube = None, moments: MomentCube = None,
+                 histograms: dict = None, sources: dict = None):
+        self.cube = cube
+        self.moments = moments
+        self.histograms = histograms or {}
+        self.sources = sources or {}
+
+    @property
+    def n_rows(self) -> int:
+        return self.cube.total() if self.cube is not None else 0
+
+    @staticmethod
+    def _merge(current, new):
+        return new if current is None else current.merge(new)
+
+    def _aggregate_chunks(self, chunks, source: str) -> tuple:
+        """Cubos acumulados com os blocos (o estado só muda se todos forem válidos)"""
+        cube, moments, histograms = self.cube, self.moments, dict(self.histograms)
+        n_rows = 0
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            chunk = _prepare_chunk(chunk, source)
+            cube = self._merge(cube, FilterCube.from_frame(chunk))
+            moments = self._merge(moments, MomentCube.from_frame(chunk))
+            for measure, width in HISTOGRAM_BIN_WIDTHS.items():
+                histograms[measure] = self._merge(histograms.get(measure),
+                                                  HistogramCube.from_frame(chunk, measure, width))
+            n_rows += len(chunk)
+        return cube, moments, histograms, n_rows
+
+    def ingest(self, path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> int:
+        """
+        Acrescenta um CSV (ou o trecho novo de um CSV já ingerido) aos agregados.
+
+        Args:
+            path: CSV no esquema de Obesity.csv
+            chunksize: Linhas por bloco
+
+        Returns:
+            Número de linhas lidas (0 se o arquivo não mudou)
+
+        Raises:
+            SourceChangedError: Arquivo já ingerido que mudou de outra forma
+                que não por linhas acrescentadas ao final
+            ValueError: Esquema inválido ou arquivo alterado durante a leitura
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+        recorded = self.sources.get(key)
+
+        if recorded is None:
+            offset, columns = 0, list(pd.read_csv(path, nrows=0).columns)
+        else:
+            if (recorded['size'], recorded['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                return 0
+            offset = recorded['size']
+            if stat.st_size < offset or sha256_file(path, offset) != recorded['sha256']:
+                raise SourceChangedError(f"{path} mudou desde a última ingestão; refaça os agregados (--rebuild)")
+            if stat.st_size == offset:
+                recorded['mtime_ns'] = stat.st_mtime_ns
+                return 0
+            with open(path, 'rb') as f:
+                f.seek(offset - 1)
+                if f.read(1) != b'\n':
+                    raise SourceChangedError(f"{path}: a última linha ingerida não terminava com quebra de linha")
+            columns = recorded['columns']
+
+        chunks = _read_chunks(path, offset, columns, chunksize)
+        cube, moments, histograms, n_rows = self._aggregate_chunks(chunks, path)
+        if os.path.getsize(path) != stat.st_size:
+            raise ValueError(f"{path} mudou durante a leitura; ingira novamente")
+
+        self.cube, self.moments, self.histograms = cube, moments, histograms
+        self.sources[key] = {
+            'file': os.path.basename(path),
+            'sha256': sha256_file(path, stat.st_size),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'n_rows': (recorded['n_rows'] if recorded else 0) + n_rows,
+            'columns': columns,
+            'ingested_at': datetime.datetime.now().isoformat(timespec='seconds')
+        }
+        return n_rows
+
+    def save(self, directory: str = STORE_DIR) -> None:
+        """Grava os agregados (substituição atômica do diretório)"""
+        tables = {'cube': self.cube, 'moments': self.moments}
+        tables.update({f'histogram.{measure}': cube for measure, cube in self.histograms.items()})
+
+        arrays, tables_meta = {}, {}
+        for name, table in tables.items():
+            if table is None:
+                continue
+            table_arrays, tables_meta[name] = table.to_state()
+            arrays.update({f'{name}/{key}': values for key, values in table_arrays.items()})
+
+        with staged_directory(directory, per_process=True) as staging:
+            np.savez(os.path.join(staging, ARRAYS_FILE), **arrays)
+            write_json(os.path.join(staging, MANIFEST_FILE), {
+                'schema_version': SCHEMA_VERSION,
+                'saved_at': datetime.datetime.now().isoformat(timespec='seconds'),
+                'n_rows': self.n_rows,
+                'sources': self.sources,
+                'tables': tables_meta
+            })
+
+    @classmethod
+    def load(cls, directory: str = STORE_DIR) -> 'AggregateStore':
+        """Agregados gravados por save() (vazio se ausente ou de outra versão do esquema)"""
+        manifest = read_store_manifest(directory)
+        if manifest is None:
+            return cls()
+
+        with np.load(os.path.join(directory, ARRAYS_FILE)) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+
+        def table_arrays(name):
+            prefix = f'{name}/'
+            return {key[len(prefix):]: values for key, values in arrays.items() if key.startswith(prefix)}
+
+        tables = manifest['tables']
+        cube = FilterCube.from_state(table_arrays('cube'), tables['cube']) if 'cube' in tables else None
+        moments = MomentCube.from_state(table_arrays('moments'), tables['moments']) if 'moments' in tables else None
+        histograms = {name.split('.', 1)[1]: HistogramCube.from_state(table_arrays(name), meta)
+                      for name, meta in tables.items() if name.startswith('histogram.')}
+        return cls(cube, moments, histograms, manifest['sources'])
+
+
+def read_store_manifest(directory: str = STORE_DIR) -> dict:
+    """Manifesto dos agregados gravados, ou None se ausente ou de outra versão do esquema"""
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    manifest = read_json(path)
+    return manifest if manifest.get('schema_version') == SCHEMA_VERSION else None
+
+
+def store_version(manifest: dict) -> str:
+    """
+    Versão dos agregados: SHA-256 do conteúdo lido de cada fonte do manifesto.
+
+    Serve de chave para caches derivados das mesmas fontes, como os do
+    dashboard.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(manifest['sources']):
+        digest.update(f"{path}\0{manifest['sources'][path]['sha256']}\n".encode())
+    return digest.hexdigest()
+
+
+def ensure_aggregates(sources: list = None, directory: str = STORE_DIR,
+                      chunksize: int = DEFAULT_CHUNKSIZE, rebuild: bool = False) -> tuple:
+    """
+    Agregados atualizados com os CSVs, lendo apenas o que ainda não foi ingerido.
+
+    Se uma fonte já ingerida mudou de forma que não é um acréscimo
+    (SourceChangedError), todas as fontes conhecidas são relidas. Outros erros
+    (ex.: colunas ausentes em um arquivo novo) são propagados sem refazer nem
+    gravar nada.
+
+    Args:
+        sources: CSVs a ingerir (padrão: data/Obesity.csv)
+        directory: Diretório dos agregados (padrão: data/cache/aggregates)
+        chunksize: Linhas por bloco
+        rebuild: Ignora os agregados gravados e relê todas as fontes
+
+    Returns:
+        Tupla (AggregateStore, linhas lidas por fonte)
+    """
+    sources = list(sources or [DATA_PATH])
+    store = AggregateStore() if rebuild else AggregateStore.load(directory)
+    recorded = {path: dict(meta) for path, meta in store.sources.items()}
+    try:
+        read = {path: store.ingest(path, chunksize) for path in sources}
+    except SourceChangedError:
+        # Mudança que não é um acréscimo: recomeça com as fontes já conhecidas
+        known = [path for path in store.sources if os.path.exists(path)]
+        store = AggregateStore()
+        read = {path: store.ingest(path, chunksize) for path in dict.fromkeys(known + sources)}
+
+    # Arquivo apenas tocado (mesmo conteúdo) também regrava o manifesto, com a nova data
+    if any(read.values()) or rebuild or store.sources != recorded:
+        store.save(directory)
+    return store, read
+
+
+def refresh_aggregates(sources: list = None, directory: str = STORE_DIR,
+                       chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
+    """
+    Agregados em dia com os CSVs e com todas as fontes já ingeridas.
+
+    Quando nada mudou custa um stat por fonte e a leitura do manifesto, sem
+    carregar os cubos. Se alguma fonte mudou, ensure_aggregates lê o que
+    falta; se uma fonte conhecida foi removida, os agregados são refeitos com
+    as que restam.
+
+    Args:
+        sources: CSVs que devem estar nos agregados (padrão: data/Obesity.csv)
+        directory: Diretório dos agregados (padrão: data/cache/aggregates)
+        chunksize: Linhas por bloco
+
+    Returns:
+        Manifesto dos agregados (as chaves de 'sources' são as fontes de todas
+        as linhas agregadas)
+    """
+    manifest = read_store_manifest(directory)
+    recorded = manifest['sources'] if manifest else {}
+    removed = [path for path in recorded if not os.path.exists(path)]
+    paths = list(dict.fromkeys([path for path in recorded if path not in removed] +
+                               [os.path.abspath(path) for path in sources or [DATA_PATH]]))
+
+    def changed(path):
+        stat = os.stat(path)
+        return path not in recorded or (recorded[path]['size'], recorded[path]['mtime_ns']) != (stat.st_size, stat.st_mtime_ns)
+
+    if manifest is None or removed or any(changed(path) for path in paths):
+        ensure_aggregates(paths, directory, chunksize, rebuild=bool(removed))
+        manifest = read_store_manifest(directory)
+    return manifest
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Agregados incrementais do dataset de pacientes")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help="Acrescenta CSVs novos (ou linhas novas) aos agregados")
+    ingest_parser.add_argument('sources', nargs='*', default=[DATA_PATH], help="CSVs de pacientes")
+    ingest_parser.add_argument('--store', default=STORE_DIR, help="Diretório dos agregados (padrão: data/cache/aggregates)")
+    ingest_parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Linhas por bloco")
+    ingest_parser.add_argument('--rebuild', action='store_true', help="Relê todas as fontes desde o início")
+
+    args = parser.parse_args(argv)
+
+    try:
+        store, read = ensure_aggregates(args.sources, args.store, args.chunksize, rebuild=args.rebuild)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    for path, n_rows in read.items():
+        status = f"{n_rows:,} linhas novas" if n_rows else "sem mudanças"
+        print(f"   {os.path.basename(path)}: {status}")
+    print(f"✅ Agregados em {args.store}: {store.n_rows:,} pacientes de {len(store.sources)} arquivo(s), "
+          f"{store.cube.n_cells if store.cube else 0:,} células")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""
+Pipeline de Treinamento com Cache por Etapa
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Reproduz o notebook 02_model_training como uma sequência de etapas:
+
+    load → encode → scale → split → fit → evaluate → export
+
+Cada etapa grava sua saída em data/cache/pipeline/<etapa>/<chave>.joblib,
+onde a chave é o SHA-256 dos parâmetros da etapa, da sua versão e das
+chaves das etapas anteriores. A chave de load é o SHA-256 do CSV, então a
+cadeia inteira depende do conteúdo dos dados, não da data do arquivo.
+Rodar de novo depois de uma mudança só recalcula as etapas a partir dela:
+trocar a lista de modelos refaz apenas fit (dos modelos novos), evaluate e
+export; um CSV igual, apenas tocado, não refaz nada.
+
+A etapa fit tem uma chave por modelo (hiperparâmetros, folds e versões do
+scikit-learn/XGBoost), e os modelos ausentes do cache são treinados juntos
+pelo pool de src.training_runner. A etapa export grava os artefatos em
+models/ (pickles, model_metrics.pkl, ensemble compilado, bundle e a
+avaliação out-of-fold de src.oof_evaluation) e registra sua chave em
+models/pipeline_state.json; com a mesma chave e os arquivos presentes,
+nada é regravado.
+
+Uso (a partir da raiz do projeto):
+    python -m src.training_pipeline run
+    python -m src.training_pipeline run --models "Random Forest" XGBoost --force fit
+    python -m src.training_pipeline clean
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.artifact_io import SCHEMA_VERSIONS, read_json, write_json
+from src.dataset_cache import CACHE_DIR, DATA_PATH, ensure_cache, load_dataset
+from src.model_artifacts import COMPILED_MODEL_DIR, MODELS_DIR
+from src.oof_evaluation import evaluation_path, load_evaluation, save_evaluation
+from src.training_runner import (
+    CV_FOLDS, MODEL_NAMES, RANDOM_STATE, TEST_SIZE, build_model, encode_data, fold_assignments, scale_data,
+    split_data, train_model_zoo
+)
+
+# Versão do layout de pipeline_state.json
+SCHEMA_VERSION = SCHEMA_VERSIONS['training_pipeline']
+
+PIPELINE_CACHE_DIR = os.path.join(CACHE_DIR, 'pipeline')
+STATE_FILE = 'pipeline_state.json'
+
+STAGES = ['load', 'encode', 'scale', 'split', 'fit', 'evaluate', 'export']
+
+# Incrementar a versão de uma etapa quando o código dela mudar: invalida a
+# etapa e todas as seguintes
+STAGE_VERSIONS = {'load': 2, 'encode': 1, 'scale': 1, 'split': 1, 'fit': 2, 'evaluate': 2, 'export': 3}
+
+# Arquivos gravados em models/ pela etapa export (mesmos nomes do notebook)
+EXPORT_FILES = ['best_model.pkl', 'label_encoders.pkl', 'target_encoder.pkl', 'scaler.pkl',
+                'feature_names.pkl', 'model_metrics.pkl']
+
+
+def stage_key(stage: str, params: dict = None, upstream: list = ()) -> str:
+    """SHA-256 da etapa, sua versão, seus parâmetros e as chaves anteriores"""
+    payload = {'stage': stage, 'version': STAGE_VERSIONS[stage], 'params': params or {}, 'upstream': list(upstream)}
+    encoded = json.dumps(payload, sort_keys=True, default=repr).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _library_versions() -> dict:
+    import sklearn
+    import xgboost
+    return {'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__,
+            'xgboost': xgboost.__version__}
+
+
+class StageCache:
+    """Saídas das etapas em <diretório>/<etapa>/<chave>.joblib"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or PIPELINE_CACHE_DIR
+
+    def path(self, stage: str, key: str) -> str:
+        return os.path.join(self.directory, stage, f'{key}.joblib')
+
+    def get(self, stage: str, key: str):
+        """Saída gravada, ou None se ausente"""
+        path = self.path(stage, key)
+        return joblib.load(path) if os.path.exists(path) else None
+
+    def put(self, stage: str, key: str, value) -> None:
+        """Grava em arquivo temporário e troca de nome (leitores nunca veem um arquivo pela metade)"""
+        path = self.path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(value, path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _evaluate(results: dict) -> dict:
+    """
+    Tabela de comparação e melhor modelo (seções 5 e 6 do notebook); matriz
+    de confusão e acurácia por classe vêm das probabilidades guardadas em fit.
+    """
+    results_df = pd.DataFrame({
+        'Modelo': list(results.keys()),
+        'Acurácia (%)': [results[m]['accuracy']*100 for m in results.keys()],
+        'Precisão (%)': [results[m]['precision']*100 for m in results.keys()],
+        'Recall (%)': [results[m]['recall']*100 for m in results.keys()],
+        'F1-Score (%)': [results[m]['f1_score']*100 for m in results.keys()],
+        'CV Score (%)': [results[m]['cv_mean']*100 for m in results.keys()]
+    }).sort_values('Acurácia (%)', ascending=False).reset_index(drop=True)
+
+    best_model_name = results_df.iloc[0]['Modelo']
+    return {
+        'results_df': results_df,
+        'best_model_name': best_model_name,
+        'best_accuracy': results[best_model_name]['accuracy'],
+        'confusion_matrix': results[best_model_name]['confusion_matrix'],
+        'class_accuracy': results[best_model_name]['class_accuracy']
+    }
+
+
+def read_state(models_dir: str = None) -> dict:
+    """Estado da última exportação, ou None se ausente ou de outra versão do esquema"""
+    path = os.path.join(models_dir or MODELS_DIR, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    state = read_json(path)
+    return state if state.get('schema_version') == SCHEMA_VERSION else None
+
+
+def _export(models_dir: str, model, encoded: dict, scaled: dict, split: dict, results: dict,
+            evaluation: dict, n_folds: int) -> list:
+    """Artefatos do notebook e avaliação out-of-fold em models_dir; retorna os caminhos gravados"""
+    from src.compiled_ensemble import export_model
+    from src.distillation import load_student, remove_student
+    from src.model_bundle import save_bundle
+
+    os.makedirs(models_dir, exist_ok=True)
+    feature_names = scaled['X_scaled'].columns.tolist()
+    model_metrics = {
+        'model_name': evaluation['best_model_name'],
+        'accuracy': evaluation['best_accuracy'],
+        'results_df': evaluation['results_df']
+    }
+    artifacts = dict(zip(EXPORT_FILES, [model, encoded['label_encoders'], encoded['target_encoder'],
+                                        scaled['scaler'], feature_names, model_metrics]))
+    written = []
+    for name, value in artifacts.items():
+        path = os.path.join(models_dir, name)
+        joblib.dump(value, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        written.append(path)
+
+    compiled_path = os.path.join(models_dir, COMPILED_MODEL_DIR)
+    try:
+        export_model(model).save(compiled_path)
+        written.append(compiled_path)
+    except ValueError:
+        # Modelo sem exportador compilado (ex.: Regressão Logística): o ensemble
+        # de uma execução anterior não pode continuar servindo com compiled=True
+        shutil.rmtree(compiled_path, ignore_errors=True)
+
+    bundle_path = os.path.join(models_dir, 'model_bundle')
+    save_bundle(bundle_path, model, encoded['label_encoders'], encoded['target_encoder'], scaled['scaler'],
+                feature_names, model_metrics)
+    written.append(bundle_path)
+
+    # Aluno destilado de outro professor não serve mais (refazer com
+    # python -m src.distillation build)
+    if load_student(models_dir)[0] is None:
+        remove_student(models_dir)
+
+    save_evaluation(results, split['y_train'], split['y_test'], fold_assignments(split['y_train'], n_folds),
+                    encoded['target_encoder'].classes_, models_dir, selected_model=evaluation['best_model_name'])
+    written.append(evaluation_path(models_dir))
+    return written
+
+
+def run_pipeline(source: str = DATA_PATH, models: list = None, models_dir: str = None,
+                 cache_dir: str = None, test_size: float = TEST_SIZE, random_state: int = RANDOM_STATE,
+                 n_folds: int = CV_FOLDS, workers: int = None, force: str = None) -> dict:
+    """
+    Executa as etapas, reaproveitando as saídas em cache.
+
+    Args:
+        source: CSV de pacientes
+        models: Modelos candidatos (padrão: MODEL_NAMES)
+        models_dir: Destino dos artefatos (padrão: models/)
+        cache_dir: Cache das etapas (padrão: data/cache/pipeline; se informado,
+            o cache colunar do CSV também fica nele, em data/)
+        test_size, random_state: Divisão treino/teste
+        n_folds: Folds da validação cruzada
+        workers: Processos do treinamento (padrão: núcleos disponíveis)
+        force: Etapa a partir da qual ignorar o cache (ex.: 'fit')
+
+    Returns:
+        Dicionário com as saídas das etapas (encoded, scaled, split, results,
+        evaluation, best_model) e report: lista de {stage, key, hit, seconds},
+        uma entrada por etapa (uma por modelo em fit)
+    """
+    models = list(models or MODEL_NAMES)
+    models_dir = models_dir or MODELS_DIR
+    cache = StageCache(cache_dir)
+    forced = set(STAGES[STAGES.index(force):]) if force else set()
+    report = []
+
+    def cached(stage, key, compute, label=None):
+        start = time.perf_counter()
+        value = None if stage in forced else cache.get(stage, key)
+        hit = value is not None
+        if not hit:
+            value = compute()
+            cache.put(stage, key, value)
+        report.append({'stage': label or stage, 'key': key, 'hit': hit, 'seconds': time.perf_counter() - start})
+        return value
+
+    # load: o cache colunar do CSV já é a saída; a chave é o SHA-256 do conteúdo
+    start = time.perf_counter()
+    data_cache_dir = os.path.join(cache_dir, 'data') if cache_dir else None
+    manifest, rebuilt = ensure_cache(source, data_cache_dir, force='load' in forced)
+    load_key = stage_key('load', {'sha256': manifest['source']['sha256']})
+    df = load_dataset(source, data_cache_dir)
+    report.append({'stage': 'load', 'key': load_key, 'hit': not rebuilt, 'seconds': time.perf_counter() - start})
+
+    encode_key = stage_key('encode', upstream=[load_key])
+    encoded = cached('encode', encode_key, lambda: encode_data(df))
+
+    scale_key = stage_key('scale', upstream=[encode_key])
+    scaled = cached('scale', scale_key, lambda: scale_data(encoded['X_encoded'], encoded['numerical_cols']))
+
+    split_key = stage_key('split', {'test_size': test_size, 'random_state': random_state}, [encode_key, scale_key])
+    split = cached('split', split_key, lambda: split_data(scaled['X_scaled'], encoded['y_encoded'],
+                                                          test_size, random_state))
+
+    # fit: uma chave por modelo; os ausentes são treinados juntos no pool
+    versions = _library_versions()
+    fit_keys = {name: stage_key('fit', {'model': name, 'params': build_model(name).get_params(),
+                                        'n_folds': n_folds, 'versions': versions}, [split_key])
+                for name in models}
+    results = {} if 'fit' in forced else {
+        name: value for name in models if (value := cache.get('fit', fit_keys[name])) is not None}
+    missing = [name for name in models if name not in results]
+    trained, fit_seconds = {}, {}
+    if missing:
+        trained, training_report = train_model_zoo(split['X_train'], split['y_train'], split['X_test'],
+                                                   split['y_test'], names=missing, workers=workers, n_folds=n_folds)
+        fit_seconds = training_report['model_seconds']
+        for name, result in trained.items():
+            cache.put('fit', fit_keys[name], result)
+    for name in models:
+        report.append({'stage': f'fit:{name}', 'key': fit_keys[name], 'hit': name not in trained,
+                       'seconds': fit_seconds.get(name, 0.0)})
+    results = {name: results.get(name) or trained[name] for name in models}
+
+    evaluate_key = stage_key('evaluate', upstream=[split_key] + [fit_keys[name] for name in models])
+    evaluation = cached('evaluate', evaluate_key,
+                        lambda: _evaluate(results))
+    best_model = results[evaluation['best_model_name']]['model']
+
+    # export: pula a gravação se models/ já tem os artefatos desta chave
+    export_key = stage_key('export', upstream=[evaluate_key, encode_key, scale_key])
+    start = time.perf_counter()
+    state = read_state(models_dir)
+    hit = ('export' not in forced and state is not None and state['export_key'] == export_key
+           and all(os.path.exists(os.path.join(models_dir, name)) for name in EXPORT_FILES)
+           and load_evaluation(models_dir) is not None)
+    if not hit:
+        _export(models_dir, best_model, encoded, scaled, split, results, evaluation, n_folds)
+    report.append({'stage': 'export', 'key': export_key, 'hit': hit, 'seconds': time.perf_counter() - start})
+
+    if not hit:
+        state = {
+            'schema_version': SCHEMA_VERSION,
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'source': os.path.abspath(source),
+            'export_key': export_key,
+            'best_model_name': evaluation['best_model_name'],
+            'versions': versions,
+            'stages': {entry['stage']: entry['key'] for entry in report}
+        }
+        path = os.path.join(models_dir, STATE_FILE)
+        write_json(path + '.tmp', state)
+        os.replace(path + '.tmp', path)
+
+    return {
+        'encoded': encoded, 'scaled': scaled, 'split': split, 'results': results,
+        'evaluation': evaluation, 'best_model': best_model, 'report': report
+    }
+
+
+def format_report(report: list) -> str:
+    """Tabela texto com etapa, acerto no cache e tempo"""
+    lines = []
+    for entry in report:
+        status = 'cache' if entry['hit'] else 'calculada'
+        lines.append(f"   {entry['stage']:28s} {status:10s} {entry['seconds']:7.2f}s  {entry['key'][:12]}")
+    hits = sum(entry['hit'] for entry in report)
+    lines.append(f"   {hits}/{len(report)} etapas reaproveitadas do cache")
+    return '\n'.join(lines)
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argv: list = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Pipeline de treinamento com cache por etapa")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="Executa as etapas pendentes e exporta os artefatos")
+    run.add_argument('--source', default=DATA_PATH, help="CSV de pacientes (padrão: data/Obesity.csv)")
+    run.add_argument('--models', nargs='+', default=MODEL_NAMES, choices=MODEL_NAMES, metavar='MODELO',
+                     help="Modelos candidatos (padrão: todos)")
+    run.add_argument('--models-dir', default=MODELS_DIR, help="Destino dos artefatos (padrão: models/)")
+    run.add_argument('--workers', type=int, help="Processos do treinamento (padrão: núcleos disponíveis)")
+    run.add_argument('--force', choices=STAGES, help="Recalcula a partir desta etapa, ignorando o cache")
+
+    clean = subparsers.add_parser('clean', help="Remove o cache das etapas")
+    clean.add_argument('--cache-dir', default=PIPELINE_CACHE_DIR)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'clean':
+        StageCache(args.cache_dir).clear()
+        print(f"✅ Cache removido: {args.cache_dir}")
+        return 0
+
+    outputs = run_pipeline(args.source, args.models, args.models_dir, workers=args.workers, force=args.force)
+    evaluation = outputs['evaluation']
+    print(format_report(outputs['report']))
+    print(f"✅ {evaluation['best_model_name']}: {evaluation['best_accuracy']:.2%} no teste | "
+          f"artefatos em {args.models_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
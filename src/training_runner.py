@@ -0,0 +1,448 @@
+"""
+Treinamento Paralelo dos Modelos Candidatos
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Extrai do notebook 02_model_training a comparação dos modelos baseline
+(Regressão Logística, Árvore de Decisão, Random Forest, Gradient Boosting e
+XGBoost). No notebook, cada modelo é ajustado no treino, avaliado no teste e
+depois passa por cross_val_score(cv=5), que reajusta o modelo mais cinco
+vezes, tudo em sequência. Aqui cada par (modelo × fold) vira uma tarefa
+independente, distribuída em um pool de processos.
+
+As matrizes de treino e teste são gravadas uma única vez em .npy e abertas
+em memory-map por cada processo, em vez de serem serializadas com pickle
+em cada tarefa. As tarefas mais caras são enviadas primeiro, para que o
+pool não termine esperando um Gradient Boosting isolado. Os folds são os
+mesmos de cross_val_score (StratifiedKFold sem embaralhar), então as
+métricas coincidem com o caminho serial do notebook.
+
+Uso (a partir da raiz do projeto):
+    python -m src.training_runner
+    python -m src.training_runner --workers 8 --compare-serial --report models/training_report.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.model_artifacts import ROOT_DIR
+
+MODEL_NAMES = ['Logistic Regression', 'Decision Tree', 'Random Forest', 'Gradient Boosting', 'XGBoost']
+
+# Custo relativo aproximado de um ajuste (ordem de envio ao pool)
+COST_HINT = {'Gradient Boosting': 10, 'Random Forest': 4, 'XGBoost': 3, 'Logistic Regression': 1, 'Decision Tree': 1}
+
+CV_FOLDS = 5
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+
+def build_model(name: str):
+    """Modelo candidato com os mesmos hiperparâmetros do notebook de treinamento"""
+    if name == 'Logistic Regression':
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(max_iter=1000, random_state=RANDOM_STATE)
+    if name == 'Decision Tree':
+        from sklearn.tree import DecisionTreeClassifier
+        return DecisionTreeClassifier(random_state=RANDOM_STATE)
+    if name == 'Random Forest':
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(n_estimators=100, random_state=RANDOM_STATE)
+    if name == 'Gradient Boosting':
+        from sklearn.ensemble import GradientBoostingClassifier
+        return GradientBoostingClassifier(random_state=RANDOM_STATE)
+    if name == 'XGBoost':
+        from xgboost import XGBClassifier
+        return XGBClassifier(random_state=RANDOM_STATE, eval_metric='mlogloss')
+    raise ValueError(f"Modelo desconhecido: {name}")
+
+
+def encode_data(df: pd.DataFrame) -> dict:
+    """
+    LabelEncoder por coluna categórica e no alvo, como no notebook de treinamento.
+
+    Args:
+        df: Dataset de pacientes com BMI (ex.: src.dataset_cache.load_dataset())
+
+    Returns:
+        Dicionário com X_encoded, y_encoded, label_encoders, target_encoder
+        e numerical_cols
+    """
+    from sklearn.preprocessing import LabelEncoder
+
+    X = df.drop('Obesity', axis=1)
+    categorical_cols = X.select_dtypes(include=['object', 'category']).columns.tolist()
+    numerical_cols = X.select_dtypes(include=[np.number]).columns.tolist()
+
+    label_encoders = {}
+    X_encoded = X.copy()
+    for col in categorical_cols:
+        encoder = LabelEncoder()
+        X_encoded[col] = encoder.fit_transform(X[col])
+        label_encoders[col] = encoder
+
+    target_encoder = LabelEncoder()
+    y_encoded = target_encoder.fit_transform(df['Obesity'])
+    return {
+        'X_encoded': X_encoded, 'y_encoded': y_encoded, 'label_encoders': label_encoders,
+        'target_encoder': target_encoder, 'numerical_cols': numerical_cols
+    }
+
+
+def scale_data(X_encoded: pd.DataFrame, numerical_cols: list) -> dict:
+    """StandardScaler nas colunas numéricas; retorna X_scaled e scaler"""
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    X_scaled = X_encoded.copy()
+    X_scaled[numerical_cols] = scaler.fit_transform(X_encoded[numerical_cols])
+    return {'X_scaled': X_scaled, 'scaler': scaler}
+
+
+def split_data(X_scaled: pd.DataFrame, y_encoded: np.ndarray, test_size: float = TEST_SIZE,
+               random_state: int = RANDOM_STATE) -> dict:
+    """Divisão treino/teste estratificada; retorna X_train, X_test, y_train e y_test"""
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_scaled, y_encoded, test_size=test_size, random_state=random_state, stratify=y_encoded
+    )
+    return {'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test}
+
+
+def prepare_training_data(df: pd.DataFrame) -> dict:
+    """
+    Encoding, normalização e divisão treino/teste do notebook de treinamento.
+
+    Args:
+        df: Dataset de pacientes com BMI (ex.: src.dataset_cache.load_dataset())
+
+    Returns:
+        Dicionário com X_scaled, y_encoded, label_encoders, target_encoder,
+        scaler, X_train, X_test, y_train e y_test
+    """
+    encoded = encode_data(df)
+    scaled = scale_data(encoded['X_encoded'], encoded['numerical_cols'])
+    split = split_data(scaled['X_scaled'], encoded['y_encoded'])
+    return {
+        'X_scaled': scaled['X_scaled'], 'y_encoded': encoded['y_encoded'],
+        'label_encoders': encoded['label_encoders'], 'target_encoder': encoded['target_encoder'],
+        'scaler': scaled['scaler'], **split
+    }
+
+
+def fold_assignments(y: np.ndarray, n_folds: int = CV_FOLDS) -> np.ndarray:
+    """Fold de validação de cada linha (mesmas partições de cross_val_score)"""
+    from sklearn.model_selection import StratifiedKFold
+
+    folds = np.empty(len(y), dtype=np.int64)
+    for fold, (_, val_index) in enumerate(StratifiedKFold(n_splits=n_folds).split(np.zeros(len(y)), y)):
+        folds[val_index] = fold
+    return folds
+
+
+# ============================================================================
+# TAREFAS (executadas nos processos do pool)
+# ============================================================================
+
+# Arrays abertos em memory-map por processo (um diretório por execução)
+_SHARED = {}
+
+
+def share_arrays(directory: str, **arrays) -> None:
+    """Grava os arrays em .npy para serem abertos em memory-map pelos processos"""
+    for name, values in arrays.items():
+        np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(values))
+
+
+def load_shared(directory: str) -> dict:
+    """Arrays gravados por share_arrays, abertos uma vez por processo (somente leitura)"""
+    if directory not in _SHARED:
+        _SHARED[directory] = {
+            os.path.splitext(name)[0]: np.load(os.path.join(directory, name), mmap_mode='r')
+            for name in os.listdir(directory) if name.endswith('.npy')
+        }
+    return _SHARED[directory]
+
+
+def _set_threads(model, threads: int):
+    """Limita as threads internas do modelo (evita disputa de núcleos no pool)"""
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=threads)
+    return model
+
+
+def run_job(name: str, fold: int, directory: str, columns: list, threads: int = 1) -> dict:
+    """
+    Um ajuste do zoológico de modelos.
+
+    Args:
+        name: Modelo (MODEL_NAMES)
+        fold: Fold de validação cruzada, ou None para o ajuste no treino
+            completo avaliado no teste
+        directory: Diretório dos arrays compartilhados
+        columns: Nomes das features (o modelo é ajustado com um DataFrame,
+            como no notebook)
+        threads: Threads internas do modelo
+
+    Returns:
+        Dicionário com as probabilidades por classe no teste (fold None,
+        junto com o modelo ajustado) ou no fold de validação, e o tempo do
+        ajuste
+    """
+    data = load_shared(directory)
+    model = _set_threads(build_model(name), threads)
+    n_classes = int(data['y_train'].max()) + 1
+    start = time.perf_counter()
+
+    if fold is None:
+        model.fit(pd.DataFrame(data['X_train'], columns=columns, copy=False), data['y_train'])
+        X_eval = pd.DataFrame(data['X_test'], columns=columns, copy=False)
+        result = {'model': model}
+    else:
+        train, val = data['folds'] != fold, data['folds'] == fold
+        X_train = pd.DataFrame(data['X_train'], columns=columns, copy=False)
+        model.fit(X_train[train], data['y_train'][train])
+        X_eval = X_train[val]
+        result = {}
+
+    # Colunas de todas as classes, mesmo se alguma faltou no treino do fold
+    proba = np.zeros((len(X_eval), n_classes))
+    proba[:, model.classes_] = model.predict_proba(X_eval)
+    result.update(proba=proba, name=name, fold=fold, seconds=time.perf_counter() - start)
+    return result
+
+
+def _run_job_args(args: tuple) -> dict:
+    return run_job(*args)
+
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+def _collect(jobs: list, y_train: np.ndarray, y_test: np.ndarray, folds: np.ndarray) -> dict:
+    """
+    Resultados por modelo no formato do notebook (results[name]), derivados
+    das probabilidades (src.oof_evaluation): teste do ajuste no treino
+    completo e out-of-fold dos folds de validação.
+    """
+    from src.oof_evaluation import summarize
+
+    results = {}
+    for name in dict.fromkeys(job['name'] for job in jobs):
+        model_jobs = [job for job in jobs if job['name'] == name]
+        holdout = next(job for job in model_jobs if job['fold'] is None)
+        oof_proba = np.zeros_like(holdout['proba'], shape=(len(y_train), holdout['proba'].shape[1]))
+        for job in model_jobs:
+            if job['fold'] is not None:
+                oof_proba[folds == job['fold']] = job['proba']
+
+        summary = summarize(y_train, y_test, folds, oof_proba, holdout['proba'])
+        test_metrics, oof = summary['holdout'], summary['oof']
+        results[name] = {
+            'model': holdout['model'],
+            'accuracy': test_metrics['accuracy'],
+            'precision': test_metrics['precision'],
+            'recall': test_metrics['recall'],
+            'f1_score': test_metrics['f1_score'],
+            'cv_mean': oof['cv_mean'],
+            'cv_std': oof['cv_std'],
+            'cv_scores': oof['fold_scores'],
+            'predictions': holdout['proba'].argmax(axis=1),
+            'confusion_matrix': test_metrics['confusion_matrix'],
+            'class_accuracy': test_metrics['class_accuracy'],
+            'test_proba': holdout['proba'],
+            'oof_proba': oof_proba,
+            'oof_metrics': oof,
+            'fit_seconds': sum(job['seconds'] for job in model_jobs)
+        }
+    return results
+
+
+def train_model_zoo(X_train, y_train, X_test, y_test, names: list = None,
+                    workers: int = None, n_folds: int = CV_FOLDS) -> tuple:
+    """
+    Ajusta os modelos (treino completo + validação cruzada) em paralelo.
+
+    Args:
+        X_train, y_train, X_test, y_test: Divisão do notebook de treinamento
+        names: Modelos a treinar (padrão: MODEL_NAMES)
+        workers: Processos do pool (padrão: núcleos disponíveis; 1 = sem pool)
+        n_folds: Folds da validação cruzada
+
+    Returns:
+        Tupla (results, report): results[name] tem as chaves do notebook
+        (model, accuracy, precision, recall, f1_score, cv_mean, cv_std,
+        predictions), a matriz de confusão e a acurácia por classe do teste, e
+        as probabilidades de teste e out-of-fold (test_proba, oof_proba,
+        oof_metrics); report tem tempo de parede, soma dos tempos das tarefas
+        e tempo por modelo
+    """
+    names = list(names or MODEL_NAMES)
+    workers = max(1, workers or os.cpu_count() or 1)
+    columns = list(X_train.columns) if hasattr(X_train, 'columns') else [f'x{i}' for i in range(X_train.shape[1])]
+    y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+
+    folds = fold_assignments(y_train, n_folds)
+
+    directory = tempfile.mkdtemp(prefix='training-runner-')
+    try:
+        share_arrays(directory, X_train=np.asarray(X_train, dtype=float), y_train=y_train,
+                     X_test=np.asarray(X_test, dtype=float), folds=folds)
+
+        # Mais caras primeiro; o ajuste no treino completo antes dos folds do mesmo modelo
+        tasks = [(name, fold) for name in sorted(names, key=lambda name: -COST_HINT.get(name, 1))
+                 for fold in [None] + list(range(n_folds))]
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        args = [(name, fold, directory, columns, threads) for name, fold in tasks]
+
+        start = time.perf_counter()
+        if workers == 1:
+            jobs = [_run_job_args(arg) for arg in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                jobs = list(pool.map(_run_job_args, args))
+        wall_seconds = time.perf_counter() - start
+    finally:
+        _SHARED.pop(directory, None)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    jobs.sort(key=lambda job: (names.index(job['name']), -1 if job['fold'] is None else job['fold']))
+    results = _collect(jobs, y_train, y_test, folds)
+    report = {
+        'workers': workers,
+        'cpu_count': os.cpu_count(),
+        'n_jobs': len(jobs),
+        'wall_seconds': wall_seconds,
+        'job_seconds': sum(job['seconds'] for job in jobs),
+        'model_seconds': {name: result['fit_seconds'] for name, result in results.items()}
+    }
+    return results, report
+
+
+def evaluate_estimator(name: str, model, X_train, y_train, X_test, y_test, n_folds: int = CV_FOLDS) -> dict:
+    """
+    Resultados de um modelo já ajustado fora do zoológico (ex.: o modelo
+    otimizado pela busca de hiperparâmetros), no mesmo formato de
+    train_model_zoo: probabilidades de teste do próprio modelo e
+    out-of-fold de cópias (sklearn.base.clone) ajustadas nos mesmos folds.
+
+    Args:
+        name: Nome do modelo nos resultados (ex.: "Random Forest (otimizado)")
+        model: Modelo ajustado em X_train
+        X_train, y_train, X_test, y_test: Divisão do notebook de treinamento
+        n_folds: Folds da validação cruzada
+
+    Returns:
+        Dicionário {name: resultado}, para somar a results
+    """
+    from sklearn.base import clone
+
+    X_train = X_train if hasattr(X_train, 'iloc') else pd.DataFrame(X_train)
+    y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+    n_classes = int(y_train.max()) + 1
+    folds = fold_assignments(y_train, n_folds)
+
+    def job(fitted, X_eval, fold, seconds):
+        proba = np.zeros((len(X_eval), n_classes))
+        proba[:, fitted.classes_] = fitted.predict_proba(X_eval)
+        return {'model': fitted, 'proba': proba, 'name': name, 'fold': fold, 'seconds': seconds}
+
+    jobs = [job(model, X_test, None, 0.0)]
+    for fold in range(n_folds):
+        start = time.perf_counter()
+        fitted = clone(model).fit(X_train[folds != fold], y_train[folds != fold])
+        jobs.append(job(fitted, X_train[folds == fold], fold, time.perf_counter() - start))
+    return _collect(jobs, y_train, y_test, folds)
+
+
+def train_serial(X_train, y_train, X_test, y_test, names: list = None, n_folds: int = CV_FOLDS) -> tuple:
+    """
+    Caminho serial do notebook (fit, predict e cross_val_score por modelo),
+    como referência de tempo e de métricas.
+
+    Returns:
+        Tupla (acurácia e scores de validação por modelo, tempo de parede em segundos)
+    """
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import cross_val_score
+
+    results = {}
+    start = time.perf_counter()
+    for name in names or MODEL_NAMES:
+        model = build_model(name)
+        model.fit(X_train, y_train)
+        accuracy = accuracy_score(y_test, model.predict(X_test))
+        cv_scores = cross_val_score(model, X_train, y_train, cv=n_folds)
+        results[name] = {'accuracy': accuracy, 'cv_scores': cv_scores}
+    return results, time.perf_counter() - start
+
+
+def results_table(results: dict) -> pd.DataFrame:
+    """Tabela de comparação do notebook (ordenada por acurácia)"""
+    return pd.DataFrame({
+        'Modelo': list(results.keys()),
+        'Acurácia (%)': [results[m]['accuracy'] * 100 for m in results],
+        'Precisão (%)': [results[m]['precision'] * 100 for m in results],
+        'Recall (%)': [results[m]['recall'] * 100 for m in results],
+        'F1-Score (%)': [results[m]['f1_score'] * 100 for m in results],
+        'CV Score (%)': [results[m]['cv_mean'] * 100 for m in results]
+    }).sort_values('Acurácia (%)', ascending=False).reset_index(drop=True)
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argv: list = None) -> int:
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(description="Treinamento paralelo dos modelos candidatos")
+    parser.add_argument('--workers', type=int, default=None, help="Processos do pool (padrão: núcleos disponíveis)")
+    parser.add_argument('--models', nargs='+', default=MODEL_NAMES, choices=MODEL_NAMES, metavar='MODELO',
+                        help="Modelos a treinar (padrão: todos)")
+    parser.add_argument('--compare-serial', action='store_true',
+                        help="Roda também o caminho serial do notebook e mostra o ganho")
+    parser.add_argument('--report', help="Arquivo JSON para gravar o relatório de tempos")
+    args = parser.parse_args(argv)
+
+    from src.dataset_cache import load_dataset
+
+    data = prepare_training_data(load_dataset(os.path.join(ROOT_DIR, 'data', 'Obesity.csv')))
+    split = (data['X_train'], data['y_train'], data['X_test'], data['y_test'])
+
+    results, report = train_model_zoo(*split, names=args.models, workers=args.workers)
+    print(results_table(results).to_string(index=False))
+    print(f"\n✅ {report['n_jobs']} ajustes (modelo × fold) em {report['workers']} processo(s) "
+          f"({report['cpu_count']} núcleos): {report['wall_seconds']:.1f}s de parede, "
+          f"{report['job_seconds']:.1f}s somando as tarefas")
+
+    if args.compare_serial:
+        serial, serial_seconds = train_serial(*split, names=args.models)
+        report['serial_seconds'] = serial_seconds
+        report['speedup'] = serial_seconds / report['wall_seconds']
+        report['same_metrics'] = all(
+            np.isclose(serial[name]['accuracy'], results[name]['accuracy']) and
+            np.allclose(serial[name]['cv_scores'], results[name]['cv_scores'])
+            for name in args.models
+        )
+        print(f"   Serial (notebook): {serial_seconds:.1f}s | ganho: {report['speedup']:.2f}x | "
+              f"métricas iguais: {'sim' if report['same_metrics'] else 'não'}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"   Relatório: {args.report}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
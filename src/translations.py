@@ -5,6 +5,8 @@ Tech Challenge Fase 4 - POSTECH Data Analytics
 Baseado no dicionário de dados oficial (dicionario_obesity_fiap.pdf)
 """
 
+import functools
+
 # ============================================================================
 # CORES PADRÃO DO PROJETO
 # ============================================================================
@@ -13,6 +15,21 @@ PRIMARY_COLOR = '#1a252f'      # Azul muito escuro (quase navy)
 SECONDARY_COLOR = '#2c5f7c'    # Azul médio escurecido
 ACCENT_COLOR = '#8b3a3a'       # Vermelho escuro/bordô
 
+# Pontos de controle do colormap 'Blues' do matplotlib (ColorBrewer), para
+# gerar as paletas sem importar o matplotlib nos apps
+_BLUES_ANCHORS = (
+    (0.9686274509803922, 0.984313725490196, 1.0),
+    (0.8705882352941177, 0.9215686274509803, 0.9686274509803922),
+    (0.7764705882352941, 0.8588235294117647, 0.9372549019607843),
+    (0.6196078431372549, 0.792156862745098, 0.8823529411764706),
+    (0.4196078431372549, 0.6823529411764706, 0.8392156862745098),
+    (0.25882352941176473, 0.5725490196078431, 0.7764705882352941),
+    (0.12941176470588237, 0.44313725490196076, 0.7098039215686275),
+    (0.03137254901960784, 0.3176470588235294, 0.611764705882353),
+    (0.03137254901960784, 0.18823529411764706, 0.4196078431372549),
+)
+_BLUES_LUT_SIZE = 256
+
 # ============================================================================
 # TRADUÇÃO DE VARIÁVEIS
 # ============================================================================
@@ -100,6 +117,11 @@ OBESITY_ORDER = [
     'Obesity_Type_III'
 ]
 
+# Posição de cada classe em OBESITY_ORDER (consulta O(1) para ordenação);
+# classes desconhecidas vão para o fim
+OBESITY_ORDER_INDEX = {obesity_class: i for i, obesity_class in enumerate(OBESITY_ORDER)}
+UNKNOWN_ORDER = len(OBESITY_ORDER)
+
 # Descrições detalhadas dos níveis de obesidade (baseado em OMS)
 OBESITY_DESCRIPTIONS = {
     'Insufficient_Weight': 'IMC < 18.5 - Risco de desnutrição',
@@ -254,21 +276,152 @@ def get_color_palette(n_colors: int = 7, reverse: bool = False) -> list:
     Returns:
         Lista de cores em hexadecimal
     """
-    import matplotlib.cm as cm
+    return list(_color_palette(n_colors, reverse))
+
+
+@functools.lru_cache(maxsize=None)
+def _color_palette(n_colors: int, reverse: bool) -> tuple:
+    """Paleta memorizada (mesmos hex de matplotlib.cm.get_cmap('Blues', 256))"""
     import numpy as np
-    
-    blues = cm.get_cmap('Blues', 256)
-    
+
     if reverse:
         color_indices = np.linspace(0.95, 0.35, n_colors)
     else:
         color_indices = np.linspace(0.35, 0.95, n_colors)
-    
-    colors = [blues(idx) for idx in color_indices]
-    
-    # Converter RGBA para hex
-    import matplotlib.colors as mcolors
-    return [mcolors.rgb2hex(color[:3]) for color in colors]
+
+    # Mesma discretização de Colormap.__call__: posição * N truncada
+    lut = _blues_lut()
+    positions = np.minimum((color_indices * _BLUES_LUT_SIZE).astype(int), _BLUES_LUT_SIZE - 1)
+    return tuple(
+        '#' + ''.join(format(round(channel * 255), '02x') for channel in lut[position])
+        for position in positions
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _blues_lut():
+    """Tabela de 256 cores interpolada como em LinearSegmentedColormap"""
+    import numpy as np
+
+    anchors = np.array(_BLUES_ANCHORS)
+    x = np.linspace(0, 1, len(anchors)) * (_BLUES_LUT_SIZE - 1)
+    xind = (_BLUES_LUT_SIZE - 1) * np.linspace(0, 1, _BLUES_LUT_SIZE)
+    ind = np.searchsorted(x, xind)[1:-1]
+    distance = (xind[1:-1] - x[ind - 1]) / (x[ind] - x[ind - 1])
+    inner = distance[:, None] * (anchors[ind] - anchors[ind - 1]) + anchors[ind - 1]
+    return np.clip(np.vstack([anchors[:1], inner, anchors[-1:]]), 0.0, 1.0)
+
+
+# ============================================================================
+# TRADUÇÃO VETORIZADA (pandas Series, Index e colunas categóricas)
+# ============================================================================
+#
+# As funções abaixo traduzem cada categoria distinta uma única vez e remapeiam
+# os códigos categóricos, de modo que o custo cresce com o número de
+# categorias e não com o número de linhas.
+
+def obesity_order_key(obesity_class: str) -> int:
+    """Chave de ordenação de uma classe conforme OBESITY_ORDER (uso em sorted)"""
+    return OBESITY_ORDER_INDEX.get(obesity_class, UNKNOWN_ORDER)
+
+
+def obesity_order_codes(values):
+    """
+    Posição em OBESITY_ORDER de cada valor de uma Series ou Index.
+
+    Pode ser usada como key em sort_values/sort_index:
+        df.sort_values('Obesity', key=obesity_order_codes)
+
+    Returns:
+        Series/Index de inteiros alinhado com values (desconhecidos = UNKNOWN_ORDER)
+    """
+    return _map_categories(values, obesity_order_key, categorical=False, dtype='int64', missing=UNKNOWN_ORDER)
+
+
+def translate_values(values, variable: str = None, categorical: bool = False):
+    """
+    Versão vetorizada de translate_value.
+
+    Args:
+        values: Series ou Index com valores em inglês
+        variable: Nome da variável (para traduções específicas por escala)
+        categorical: Se True, retorna dtype category (mais leve para milhões de linhas)
+
+    Returns:
+        Series/Index traduzido, com o mesmo índice/nome de values
+    """
+    return _map_categories(values, lambda value: translate_value(value, variable), categorical)
+
+
+def get_obesity_labels(values, with_description: bool = False, categorical: bool = False):
+    """
+    Versão vetorizada de get_obesity_label.
+
+    Com categorical=True, as categorias resultantes seguem OBESITY_ORDER
+    (gráficos e ordenações respeitam a ordem clínica).
+
+    Returns:
+        Series/Index com os rótulos em português
+    """
+    return _map_categories(values, lambda value: get_obesity_label(value, with_description), categorical,
+                           order_key=obesity_order_key)
+
+
+def translate_variables(names, full_description: bool = False):
+    """
+    Versão vetorizada de translate_variable para Index de colunas ou Series.
+
+    Exemplo: df.rename(columns=translate_variable) equivale a
+    df.set_axis(translate_variables(df.columns), axis=1)
+    """
+    return _map_categories(names, lambda name: translate_variable(name, full_description), categorical=False)
+
+
+def _map_categories(values, func, categorical: bool, dtype=object, missing=float('nan'), order_key=None):
+    """
+    Aplica func a cada categoria distinta e remapeia os códigos.
+
+    Args:
+        values: Series ou Index (qualquer dtype; valores ausentes são preservados)
+        func: Função aplicada uma vez por categoria
+        categorical: Se True, retorna dtype category
+        dtype: dtype do resultado não categórico
+        missing: Valor do resultado não categórico para entradas ausentes
+        order_key: Ordenação das categorias de origem (resultado categórico)
+    """
+    import numpy as np
+    import pandas as pd
+
+    is_index = isinstance(values, pd.Index)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = np.asarray(values.cat.codes if not is_index else values.codes)
+        categories = values.cat.categories if not is_index else values.categories
+    else:
+        codes, categories = pd.factorize(values)
+
+    if order_key is not None and len(categories):
+        order = np.argsort([order_key(category) for category in categories], kind='stable')
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        categories = categories[order]
+        codes = np.where(codes >= 0, rank[codes], -1)
+
+    mapped = [func(category) for category in categories]
+
+    if categorical:
+        # Categorias distintas podem ter a mesma tradução: deduplicar e remapear
+        targets = pd.unique(pd.Series(mapped, dtype=object))
+        position = {target: i for i, target in enumerate(targets)}
+        remap = np.array([position[target] for target in mapped], dtype=codes.dtype)
+        new_codes = np.where(codes >= 0, remap[codes] if len(remap) else codes, -1)
+        result = pd.Categorical.from_codes(new_codes, categories=targets)
+    else:
+        table = np.array(mapped + [missing], dtype=dtype)
+        result = table[codes]  # código -1 (ausente) aponta para a última posição
+
+    if is_index:
+        return pd.Index(result, name=values.name)
+    return pd.Series(result, index=values.index, name=values.name)
 
 
 # ============================================================================
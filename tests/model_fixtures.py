@@ -0,0 +1,97 @@
+"""
+Artefatos de modelo para os testes
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+O arquivo best_model.pkl não é versionado. Para que os testes rodem em um
+clone limpo, este módulo treina um modelo pequeno com os mesmos encoders e
+scaler de models/ e grava um diretório de artefatos temporário (pickles e
+bundle versionado, como o notebook de treinamento).
+"""
+
+import functools
+import os
+import shutil
+import tempfile
+
+import joblib
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NUMERICAL_COLS = ['Age', 'Height', 'Weight', 'FCVC', 'NCP', 'CH2O', 'FAF', 'TUE', 'BMI']
+
+
+def load_raw_data() -> pd.DataFrame:
+    """Carregar Obesity.csv com a coluna BMI calculada"""
+    df = pd.read_csv(os.path.join(ROOT_DIR, 'data', 'Obesity.csv'))
+    df['BMI'] = df['Weight'] / (df['Height'] ** 2)
+    return df
+
+
+def encode_features(df: pd.DataFrame, encoders, scaler, feature_names) -> pd.DataFrame:
+    """Pipeline de referência (mesmo do notebook e do app de predição)"""
+    X = df[feature_names].copy()
+    for col, encoder in encoders.items():
+        X[col] = encoder.transform(X[col])
+    X[NUMERICAL_COLS] = scaler.transform(X[NUMERICAL_COLS])
+    return X
+
+
+def train_model(kind: str = 'random_forest', X=None, y=None):
+    """Treinar um modelo pequeno do tipo informado"""
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+    if X is None:
+        X, y = get_training_data()
+
+    if kind == 'random_forest':
+        model = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=42)
+    elif kind == 'gradient_boosting':
+        model = GradientBoostingClassifier(n_estimators=15, max_depth=3, random_state=42)
+    elif kind == 'xgboost':
+        from xgboost import XGBClassifier
+        model = XGBClassifier(n_estimators=15, max_depth=4, random_state=42, eval_metric='mlogloss')
+    else:
+        raise ValueError(f"Tipo de modelo desconhecido: {kind}")
+
+    return model.fit(X, y)
+
+
+@functools.lru_cache(maxsize=None)
+def get_training_data():
+    """Matriz de treino codificada e alvo codificado"""
+    models_dir = os.path.join(ROOT_DIR, 'models')
+    encoders = joblib.load(os.path.join(models_dir, 'label_encoders.pkl'))
+    scaler = joblib.load(os.path.join(models_dir, 'scaler.pkl'))
+    feature_names = joblib.load(os.path.join(models_dir, 'feature_names.pkl'))
+    target_encoder = joblib.load(os.path.join(models_dir, 'target_encoder.pkl'))
+
+    df = load_raw_data()
+    X = encode_features(df, encoders, scaler, feature_names)
+    y = target_encoder.transform(df['Obesity'])
+    return X, y
+
+
+@functools.lru_cache(maxsize=None)
+def get_models_dir() -> str:
+    """
+    Diretório de artefatos completo para os testes.
+
+    Usa models/ quando best_model.pkl existe; caso contrário copia os
+    artefatos versionados para um diretório temporário, treina um modelo e
+    grava o bundle (carregado por load_model_artifacts).
+    """
+    models_dir = os.path.join(ROOT_DIR, 'models')
+    if os.path.exists(os.path.join(models_dir, 'best_model.pkl')):
+        return models_dir
+
+    tmp_dir = tempfile.mkdtemp(prefix='obesity_models_')
+    for filename in os.listdir(models_dir):
+        if filename.endswith('.pkl'):
+            shutil.copy(os.path.join(models_dir, filename), tmp_dir)
+    joblib.dump(train_model(), os.path.join(tmp_dir, 'best_model.pkl'))
+
+    from src.model_artifacts import BUNDLE_DIR, load_model_artifacts
+    from src.model_bundle import save_bundle
+    save_bundle(os.path.join(tmp_dir, BUNDLE_DIR), *load_model_artifacts(tmp_dir, use_bundle=False))
+    return tmp_dir
@@ -0,0 +1,98 @@
+"""
+Testes das fontes de agregação do dashboard (cubo e SQLite)
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_analytics_source.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import load_raw_data
+from src.analytics_source import (
+    CubeSource, SQLiteSource, build_database, dashboard_queries, ensure_database
+)
+from src.dataset_cache import DATA_PATH
+
+OBESITY = ['Insufficient_Weight', 'Normal_Weight', 'Obesity_Type_I', 'Obesity_Type_II',
+           'Obesity_Type_III', 'Overweight_Level_I', 'Overweight_Level_II']
+
+FILTERS = [
+    (['Female', 'Male'], (14, 61), OBESITY),
+    (['Male'], (20, 30), OBESITY),
+    (['Female'], (25, 25), OBESITY),
+    (['Female', 'Male'], (14, 19), ['Obesity_Type_I', 'Normal_Weight']),
+    ([], (14, 61), OBESITY),
+]
+
+
+def test_backends_return_same_results():
+    """Cubo e SQLite devem devolver os mesmos objetos pandas para o dashboard"""
+    df = load_raw_data()
+    cube_source = CubeSource.from_frame(df)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sqlite_source = SQLiteSource(os.path.join(tmp_dir, 'pacientes.sqlite'))
+        build_database(path=sqlite_source.path, frame=df)
+
+        for genders, age_range, obesity in FILTERS:
+            expected = dashboard_queries(cube_source.view(genders, age_range, obesity))
+            results = dashboard_queries(sqlite_source.view(genders, age_range, obesity))
+            for name, value in results.items():
+                if isinstance(value, pd.DataFrame):
+                    pd.testing.assert_frame_equal(value, expected[name], check_exact=False)
+                elif isinstance(value, pd.Series):
+                    pd.testing.assert_series_equal(value, expected[name], check_exact=False)
+                elif isinstance(value, tuple):
+                    assert np.array_equal(value[0], expected[name][0]), name
+                    assert np.allclose(value[1], expected[name][1]), name
+                else:
+                    assert np.allclose(value, expected[name], equal_nan=True), name
+            selected = df['Gender'].isin(genders) & df['Age'].between(*age_range) & df['Obesity'].isin(obesity)
+            assert results['total'] == selected.sum()
+            assert results['histogram_BMI'][0].sum() == selected.sum()
+
+            rows = sqlite_source.view(genders, age_range, obesity).rows(['Obesity', 'Weight'])
+            assert list(rows.columns) == ['Obesity', 'Weight'] and len(rows) == selected.sum()
+            assert np.array_equal(rows['Weight'], df.loc[selected, 'Weight'])
+
+        assert sqlite_source.categories('Gender') == ['Female', 'Male']
+        assert sqlite_source.bounds('Age') == (df['Age'].min(), df['Age'].max())
+    print(f"✅ Cubo e SQLite concordam em {len(results)} consultas para {len(FILTERS)} estados dos filtros")
+
+
+def test_database_rebuilt_only_when_csv_changes():
+    """Banco com índices, refeito apenas quando o conteúdo do CSV muda"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, 'pacientes.csv')
+        path = os.path.join(tmp_dir, 'pacientes.sqlite')
+        shutil.copy(DATA_PATH, source)
+
+        meta, rebuilt = ensure_database(source, path)
+        assert rebuilt and meta['n_rows'] == '2111'
+        assert not ensure_database(source, path)[1]
+
+        indexes = {row[1] for row in SQLiteSource(path).execute("PRAGMA index_list(patients)")}
+        assert {'idx_patients_gender', 'idx_patients_age', 'idx_patients_obesity'} <= indexes
+
+        with open(source, 'a', encoding='utf-8') as f:
+            f.write("Male,30,1.80,90,yes,no,2,3,Sometimes,no,2,no,1,1,no,Walking,Overweight_Level_II\n")
+        meta, rebuilt = ensure_database(source, path)
+        assert rebuilt and meta['n_rows'] == '2112'
+        assert SQLiteSource(path).view(['Male'], (30, 30), ['Overweight_Level_II']).total() >= 1
+        assert sorted(os.listdir(tmp_dir)) == ['pacientes.csv', 'pacientes.sqlite']
+    print("✅ Banco SQLite indexado e refeito apenas quando o SHA-256 do CSV muda")
+
+
+if __name__ == "__main__":
+    test_backends_return_same_results()
+    test_database_rebuilt_only_when_csv_changes()
@@ -0,0 +1,89 @@
+"""
+Testes das funções compartilhadas de artefatos versionados
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_artifact_io.py
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from src import artifact_io
+from src.artifact_io import read_json, sha256_file, staged_directory, write_json
+
+
+def test_sha256_file_and_prefix():
+    """Checksum do arquivo inteiro e dos primeiros bytes"""
+    content = os.urandom(3 << 20) + b'fim'
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'dados.bin')
+        with open(path, 'wb') as f:
+            f.write(content)
+
+        assert sha256_file(path) == hashlib.sha256(content).hexdigest()
+        assert sha256_file(path, 1000) == hashlib.sha256(content[:1000]).hexdigest()
+        assert sha256_file(path, 0) == hashlib.sha256(b'').hexdigest()
+    print("✅ SHA-256 do arquivo e do prefixo")
+
+
+def test_staged_directory_is_atomic():
+    """Destino só é substituído quando o bloco termina sem erro"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        target = os.path.join(tmp_dir, 'artefato')
+
+        with staged_directory(target) as staging:
+            write_json(os.path.join(staging, 'manifest.json'), {'versao': 1, 'media': np.float64(0.5),
+                                                                 'contagens': np.arange(3)})
+        assert read_json(os.path.join(target, 'manifest.json')) == {'versao': 1, 'media': 0.5, 'contagens': [0, 1, 2]}
+
+        try:
+            with staged_directory(target, per_process=True) as staging:
+                write_json(os.path.join(staging, 'manifest.json'), {'versao': 2})
+                raise RuntimeError("falha no meio da gravação")
+        except RuntimeError:
+            pass
+        assert read_json(os.path.join(target, 'manifest.json'))['versao'] == 1, "Destino não deve mudar"
+        assert os.listdir(tmp_dir) == ['artefato'], "Temporário deve ser apagado"
+    print("✅ Gravação atômica do diretório")
+
+
+def test_staged_directory_keeps_previous_on_failed_swap():
+    """Se a troca falhar, o conteúdo anterior volta para o destino"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        target = os.path.join(tmp_dir, 'artefato')
+        with staged_directory(target) as staging:
+            write_json(os.path.join(staging, 'manifest.json'), {'versao': 1})
+
+        real_replace = os.replace
+
+        def failing_replace(src, dst):
+            if src.endswith('.tmp'):
+                raise OSError("falha ao instalar o temporário")
+            return real_replace(src, dst)
+
+        with mock.patch.object(artifact_io.os, 'replace', side_effect=failing_replace):
+            try:
+                with staged_directory(target) as staging:
+                    write_json(os.path.join(staging, 'manifest.json'), {'versao': 2})
+            except OSError:
+                pass
+            else:
+                assert False, "Falha na troca deve ser propagada"
+        assert read_json(os.path.join(target, 'manifest.json'))['versao'] == 1
+        assert os.listdir(tmp_dir) == ['artefato'], "Temporário e cópia anterior devem ser apagados"
+    print("✅ Conteúdo anterior preservado quando a troca falha")
+
+
+if __name__ == "__main__":
+    test_sha256_file_and_prefix()
+    test_staged_directory_is_atomic()
+    test_staged_directory_keeps_previous_on_failed_swap()
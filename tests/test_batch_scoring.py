@@ -0,0 +1,85 @@
+"""
+Testes da predição em lote
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_batch_scoring.py
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import encode_features, get_models_dir, load_raw_data
+from src.batch_scoring import get_bmi_band, score_csv, score_dataframe
+from src.model_artifacts import load_model_artifacts
+
+
+def test_bmi_band():
+    """Verificar limiares das faixas de IMC"""
+    bands = get_bmi_band(np.array([17.0, 18.5, 24.9, 25.0, 29.99, 30.0, 45.0]))
+    expected = ['Abaixo do normal', 'Normal', 'Normal', 'Sobrepeso', 'Sobrepeso', 'Obesidade', 'Obesidade']
+    assert list(bands) == expected, f"Faixas incorretas: {list(bands)}"
+    print("✅ Faixas de IMC corretas")
+
+
+def test_score_dataframe_matches_single_row_pipeline():
+    """Predição em lote deve coincidir com o pipeline linha a linha"""
+    model, encoders, target_encoder, scaler, feature_names, _ = load_model_artifacts(get_models_dir())
+    df = load_raw_data().drop(columns=['BMI']).head(200)
+
+    scored = score_dataframe(df, model, encoders, target_encoder, scaler, feature_names)
+
+    reference = encode_features(load_raw_data().head(200), encoders, scaler, feature_names)
+    expected = target_encoder.inverse_transform(model.predict(reference))
+    proba_cols = [f'Prob_{cls}' for cls in target_encoder.classes_]
+
+    assert (scored['Predicao'].to_numpy() == expected).all(), "Classes divergentes"
+    assert np.allclose(scored[proba_cols].to_numpy(), model.predict_proba(reference))
+    assert np.allclose(scored[proba_cols].sum(axis=1), 1.0), "Probabilidades devem somar 1"
+    print(f"✅ {len(scored)} linhas pontuadas em lote, idênticas ao pipeline individual")
+
+
+def test_score_csv_in_chunks():
+    """Pontuar CSV em vários blocos e conferir o arquivo de saída"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, 'entrada.csv')
+        output_path = os.path.join(tmp_dir, 'saida.csv')
+        load_raw_data().drop(columns=['BMI']).to_csv(input_path, index=False)
+
+        stats = score_csv(input_path, output_path, chunksize=500, models_dir=get_models_dir())
+        output = pd.read_csv(output_path)
+
+        assert stats['rows'] == len(output) == 2111, f"Linhas incorretas: {stats['rows']}"
+        assert stats['chunks'] == 5, f"Blocos incorretos: {stats['chunks']}"
+        assert {'Predicao', 'Predicao_PT', 'Faixa_IMC'}.issubset(output.columns)
+        print(f"✅ CSV pontuado: {stats['rows_per_second']:,.0f} linhas/s")
+
+
+def test_unknown_category_error():
+    """Categorias desconhecidas devem gerar erro claro"""
+    model, encoders, target_encoder, scaler, feature_names, _ = load_model_artifacts(get_models_dir())
+    df = load_raw_data().head(3).copy()
+    df.loc[0, 'MTRANS'] = 'Teleport'
+
+    try:
+        score_dataframe(df, model, encoders, target_encoder, scaler, feature_names)
+    except ValueError as e:
+        assert 'MTRANS' in str(e), f"Mensagem sem a coluna: {e}"
+        print("✅ Categoria desconhecida rejeitada")
+    else:
+        assert False, "Categoria desconhecida não foi rejeitada"
+
+
+if __name__ == "__main__":
+    test_bmi_band()
+    test_score_dataframe_matches_single_row_pipeline()
+    test_score_csv_in_chunks()
+    test_unknown_category_error()
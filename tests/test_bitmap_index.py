@@ -0,0 +1,70 @@
+"""
+Testes dos índices bitmap dos filtros do dashboard
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_bitmap_index.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import load_raw_data
+from src.bitmap_index import BitmapIndex, pack_bits, popcount
+
+FILTERS = [
+    (['Female', 'Male'], (14, 61), None),
+    (['Male'], (20, 30), None),
+    (['Female'], (25, 25), None),
+    (['Female', 'Male'], (14, 19), ['Obesity_Type_I', 'Normal_Weight']),
+    (['Female', 'Male'], (40, 61), ['Obesity_Type_III', 'Overweight_Level_II', 'Insufficient_Weight']),
+    ([], (14, 61), None),
+    (['Female', 'Male'], (0, 13), None),
+]
+
+
+def test_bitmap_filters_match_row_masks():
+    """Bitsets combinados devem selecionar as mesmas linhas que o filtro por colunas"""
+    df = load_raw_data()
+    bitmaps = BitmapIndex.from_frame(df)
+    for genders, age_range, obesity in FILTERS:
+        expected = df['Gender'].isin(genders) & (df['Age'] >= age_range[0]) & (df['Age'] <= age_range[1])
+        if obesity is not None:
+            expected &= df['Obesity'].isin(obesity)
+
+        words = bitmaps.select(genders, age_range, obesity)
+        assert words.dtype == np.uint64 and len(words) == -(-len(df) // 64)
+        assert bitmaps.count(words) == expected.sum()
+        assert np.array_equal(bitmaps.to_mask(words), expected.to_numpy())
+    assert bitmaps.count(bitmaps.select()) == len(df)
+    print(f"✅ {len(FILTERS)} combinações de filtros por bitmap idênticas às máscaras das colunas")
+
+
+def test_pack_bits_and_popcount():
+    """Empacotamento com preenchimento zerado e contagem de bits"""
+    rng = np.random.default_rng(0)
+    for n_rows in [0, 1, 63, 64, 65, 1000]:
+        mask = rng.random(n_rows) < 0.3
+        words = pack_bits(mask)
+        assert len(words) == -(-n_rows // 64)
+        assert popcount(words) == mask.sum()
+
+    # Idade ausente não entra em nenhuma faixa
+    df = pd.DataFrame({'Gender': ['Male', 'Female', 'Male'], 'Age': [20.0, np.nan, 20.5],
+                       'Obesity': ['Normal_Weight'] * 3})
+    bitmaps = BitmapIndex.from_frame(df)
+    assert list(bitmaps.to_mask(bitmaps.select(age_range=(0, 100)))) == [True, False, True]
+    assert list(bitmaps.to_mask(bitmaps.select(['Male'], (20, 20)))) == [True, False, False]
+    print("✅ Bitsets empacotados em palavras de 64 bits com popcount correto")
+
+
+if __name__ == "__main__":
+    test_bitmap_filters_match_row_masks()
+    test_pack_bits_and_popcount()
@@ -0,0 +1,114 @@
+"""
+Testes dos dados de gráficos calculados no servidor
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_chart_data.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import load_raw_data
+from src.chart_data import (
+    box_statistics, density_grid, histogram_counts, nice_bin_edges, rebin_histogram, scatter_render_mode,
+    stratified_sample
+)
+from src.filter_cube import HistogramCube
+
+
+def test_stratified_sample_keeps_class_proportions():
+    """Amostra limitada, determinística, ordenada e com a proporção de cada classe"""
+    labels = pd.concat([load_raw_data()['Obesity']] * 100, ignore_index=True)
+    sample = stratified_sample(labels, 5000)
+
+    assert len(sample) == 5000
+    assert np.all(np.diff(sample) > 0)
+    assert np.array_equal(sample, stratified_sample(labels, 5000))
+
+    expected = labels.value_counts(normalize=True) * 5000
+    counts = labels.iloc[sample].value_counts()
+    assert np.all(np.abs(counts - expected.reindex(counts.index)) < 1)
+
+    # Classe rara continua representada; poucos pontos seguem inteiros
+    rare = np.array(['comum'] * 100_000 + ['rara'])
+    assert 'rara' in rare[stratified_sample(rare, 1000)]
+    assert np.array_equal(stratified_sample(labels[:300], 5000), np.arange(300))
+    assert scatter_render_mode(len(sample)) == 'webgl' and scatter_render_mode(300) == 'svg'
+    print(f"✅ Amostra de {len(sample):,} de {len(labels):,} linhas com proporções preservadas")
+
+
+def test_density_grid_matches_histogram2d():
+    """Grade de densidade deve coincidir com np.histogram2d"""
+    df = load_raw_data()
+    grid = density_grid(df['Height'], df['Weight'], df['Obesity'], bins=40)
+
+    expected, _, _ = np.histogram2d(df['Weight'], df['Height'], bins=40)
+    assert np.array_equal(grid['counts'], expected)
+    assert grid['counts'].sum() == len(df)
+
+    # Célula mais cheia: classe predominante confere com as linhas
+    row, col = np.unravel_index(grid['counts'].argmax(), grid['counts'].shape)
+    x_edges = np.histogram_bin_edges(df['Height'], bins=40)
+    y_edges = np.histogram_bin_edges(df['Weight'], bins=40)
+    in_cell = (df['Height'].between(x_edges[col], x_edges[col + 1], inclusive='left') &
+               df['Weight'].between(y_edges[row], y_edges[row + 1], inclusive='left'))
+    assert grid['classes'][grid['dominant'][row, col]] == df.loc[in_cell, 'Obesity'].value_counts().idxmax()
+    assert np.all((grid['dominant'] == -1) == (grid['counts'] == 0))
+
+    empty = density_grid([], [], np.array([], dtype=object), bins=10)
+    assert empty['counts'].sum() == 0 and np.all(empty['dominant'] == -1)
+    print(f"✅ Grade {grid['counts'].shape} idêntica a np.histogram2d")
+
+
+def test_histogram_and_box_statistics():
+    """Contagens por intervalo e estatísticas do boxplot devem coincidir com NumPy/pandas"""
+    df = load_raw_data()
+
+    counts, edges = histogram_counts(df['BMI'], 40)
+    assert np.array_equal(counts, np.histogram(df['BMI'], bins=edges)[0])
+    assert counts.sum() == len(df) and len(counts) <= 40
+    assert np.allclose(np.diff(edges), edges[1] - edges[0])
+    assert list(nice_bin_edges([25.0] * 5, 30)) == [25.0, 26.0]
+
+    stats = box_statistics(df['Weight'], df['Obesity'], max_outliers=3)
+    for label, group in df.groupby('Obesity')['Weight']:
+        box = stats[label]
+        q1, median, q3 = group.quantile([0.25, 0.5, 0.75])
+        assert np.allclose([box['q1'], box['median'], box['q3']], [q1, median, q3], rtol=1e-12)
+        iqr = q3 - q1
+        inside = group[group.between(q1 - 1.5 * iqr, q3 + 1.5 * iqr)]
+        assert (box['lowerfence'], box['upperfence']) == (inside.min(), inside.max())
+        outliers = np.sort(group[~group.isin(inside)])
+        assert len(box['outliers']) == min(len(outliers), 3) and box['n'] == len(group)
+        if len(outliers):
+            assert box['outliers'][0] == outliers[0] and box['outliers'][-1] == outliers[-1]
+    print(f"✅ Histograma com {len(counts)} intervalos e boxplot de {len(stats)} classes calculados no servidor")
+
+
+def test_rebinned_histogram_matches_direct_counts():
+    """Histograma reagrupado do cubo deve coincidir com o calculado sobre as linhas"""
+    df = load_raw_data()
+    for column, width, nbins in [('BMI', 0.1, 40), ('Age', 0.5, 30)]:
+        cube = HistogramCube.from_frame(df, column, width)
+        for genders, age_range in [(['Female', 'Male'], (14, 61)), (['Male'], (20, 30))]:
+            rows = df[df['Gender'].isin(genders) & df['Age'].between(*age_range)]
+            counts, edges = rebin_histogram(*cube.histogram(cube.mask(genders, age_range)), nbins)
+            expected_counts, expected_edges = histogram_counts(rows[column], nbins)
+            assert np.array_equal(counts, expected_counts), (column, genders)
+            assert np.allclose(edges, expected_edges)
+    print(f"✅ Histogramas reagrupados de intervalos finos ({cube.bin_counts.shape[1]} de idade) iguais aos diretos")
+
+
+if __name__ == "__main__":
+    test_stratified_sample_keeps_class_proportions()
+    test_density_grid_matches_histogram2d()
+    test_histogram_and_box_statistics()
+    test_rebinned_histogram_matches_direct_counts()
@@ -0,0 +1,126 @@
+"""
+Testes do ensemble compilado em arrays NumPy
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_compiled_ensemble.py
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import get_training_data, train_model
+from src.compiled_ensemble import CompiledEnsemble, export_model
+
+
+def check_parity(kind: str, model=None, exact: bool = True):
+    """
+    predict_proba compilado deve ser idêntico ao original.
+
+    Com exact=False aceita diferenças de arredondamento float32 (ordem da
+    soma das folhas em ensembles com centenas de árvores), mas as classes
+    previstas continuam idênticas.
+    """
+    X, _ = get_training_data()
+    model = model if model is not None else train_model(kind)
+    compiled = export_model(model)
+
+    expected = model.predict_proba(X)
+    result = compiled.predict_proba(X.to_numpy(dtype=float))
+
+    max_diff = np.abs(result - expected).max()
+    if exact:
+        assert np.array_equal(result, expected), f"{kind}: diferença máxima {max_diff:.2e}"
+    else:
+        assert np.allclose(result, expected, rtol=1e-5, atol=1e-7), f"{kind}: diferença máxima {max_diff:.2e}"
+        assert np.array_equal(result.argmax(axis=1), expected.argmax(axis=1))
+    assert np.array_equal(compiled.classes_, model.classes_)
+    print(f"✅ {kind}: {compiled.n_trees} árvores, diferença máxima {max_diff:.1e}")
+
+
+def test_random_forest_parity():
+    """Paridade exata com RandomForestClassifier"""
+    check_parity('random_forest')
+
+
+def test_gradient_boosting_parity():
+    """Paridade exata com GradientBoostingClassifier"""
+    check_parity('gradient_boosting')
+
+
+def test_xgboost_parity():
+    """Paridade exata com XGBClassifier"""
+    check_parity('xgboost')
+
+
+def test_default_depth_parity():
+    """Paridade com os hiperparâmetros padrão (árvores profundas, como no notebook)"""
+    from sklearn.ensemble import RandomForestClassifier
+    from xgboost import XGBClassifier
+
+    X, y = get_training_data()
+    check_parity('random_forest (padrão)', RandomForestClassifier(n_estimators=30, random_state=42).fit(X, y))
+    check_parity('xgboost (padrão)', XGBClassifier(random_state=42, eval_metric='mlogloss').fit(X, y), exact=False)
+
+
+def test_xgboost_early_stopping_parity():
+    """XGBoost com parada antecipada exporta só as rodadas até best_iteration"""
+    from sklearn.model_selection import train_test_split
+    from xgboost import XGBClassifier
+
+    X, y = get_training_data()
+    X_fit, X_val, y_fit, y_val = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    model = XGBClassifier(n_estimators=300, learning_rate=0.3, early_stopping_rounds=5,
+                          random_state=42, eval_metric='mlogloss')
+    model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+    assert model.best_iteration + 1 < model.get_booster().num_boosted_rounds(), "Parada antecipada não ocorreu"
+
+    check_parity('xgboost (parada antecipada)', model, exact=False)
+    assert export_model(model).n_trees == (model.best_iteration + 1) * len(model.classes_)
+
+
+def test_save_and_memory_mapped_load():
+    """Ensemble gravado deve ser recarregado via memory-map sem diferenças"""
+    X, _ = get_training_data()
+    compiled = export_model(train_model('random_forest'))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        compiled.save(tmp_dir)
+        loaded = CompiledEnsemble.load(tmp_dir)
+
+        assert isinstance(loaded.value, np.memmap), "Arrays devem ser memory-mapped"
+        assert np.array_equal(loaded.predict_proba(X.to_numpy(dtype=float)),
+                              compiled.predict_proba(X.to_numpy(dtype=float)))
+        del loaded
+    print("✅ Ensemble recarregado via memory-map")
+
+
+def test_unsupported_model():
+    """Modelos que não são ensembles de árvores devem ser rejeitados"""
+    from sklearn.linear_model import LogisticRegression
+
+    X, y = get_training_data()
+    try:
+        export_model(LogisticRegression(max_iter=200).fit(X, y))
+    except ValueError as e:
+        assert 'LogisticRegression' in str(e)
+        print("✅ Modelo não suportado rejeitado")
+    else:
+        assert False, "LogisticRegression não deveria ser compilado"
+
+
+if __name__ == "__main__":
+    test_random_forest_parity()
+    test_gradient_boosting_parity()
+    test_xgboost_parity()
+    test_default_depth_parity()
+    test_xgboost_early_stopping_parity()
+    test_save_and_memory_mapped_load()
+    test_unsupported_model()
@@ -0,0 +1,99 @@
+"""
+Testes do cache colunar do dataset
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_dataset_cache.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import load_raw_data
+from src.dataset_cache import DATA_PATH, cache_path, dataset_version, ensure_cache, load_dataset
+
+
+def test_cache_matches_csv():
+    """Cache deve reproduzir o CSV com categóricas em códigos e numéricas float64"""
+    expected = load_raw_data()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        df = load_dataset(DATA_PATH, cache_dir)
+
+        assert list(df.columns) == list(expected.columns)
+        for col in expected.columns:
+            if expected[col].dtype == object:
+                assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+                assert df[col].cat.codes.dtype == np.int8, col
+                assert (df[col].astype(object) == expected[col]).all(), col
+            else:
+                assert df[col].dtype == np.float64, col
+                assert np.array_equal(df[col], expected[col]), col
+
+        assert isinstance(df['Age'].to_numpy().base, np.memmap)
+        assert df.memory_usage(deep=True).sum() < expected.memory_usage(deep=True).sum() / 5
+    print("✅ Cache colunar idêntico ao CSV (float64, códigos int8, IMC incluído)")
+
+
+def test_rebuild_only_when_hash_changes():
+    """Tocar o arquivo não refaz o cache; alterar o conteúdo refaz"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, 'pacientes.csv')
+        shutil.copy(DATA_PATH, source)
+
+        manifest, rebuilt = ensure_cache(source, tmp_dir)
+        assert rebuilt and manifest['n_rows'] == 2111
+        assert not ensure_cache(source, tmp_dir)[1]
+
+        stat = os.stat(source)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert not ensure_cache(source, tmp_dir)[1], "Mesmo conteúdo não deve refazer o cache"
+        version = dataset_version(source, tmp_dir)
+        assert version == manifest['source']['sha256']
+
+        with open(source, 'a', encoding='utf-8') as f:
+            f.write("Male,30,1.80,90,yes,no,2,3,Sometimes,no,2,no,1,1,no,Walking,Overweight_Level_II\n")
+        manifest, rebuilt = ensure_cache(source, tmp_dir)
+        assert rebuilt and manifest['n_rows'] == 2112
+        assert dataset_version(source, tmp_dir) != version, "Versão deve mudar com o conteúdo"
+
+        df = load_dataset(source, tmp_dir)
+        assert df['Obesity'].iloc[-1] == 'Overweight_Level_II'
+        assert np.isclose(df['BMI'].iloc[-1], 90 / 1.80 ** 2, rtol=1e-6)
+        # Sem diretórios temporários de reconstrução esquecidos
+        assert sorted(os.listdir(tmp_dir)) == ['pacientes', 'pacientes.csv']
+        assert os.path.isdir(cache_path(source, tmp_dir))
+    print("✅ Cache refeito apenas quando o SHA-256 do CSV muda")
+
+
+def test_training_features_match_serving():
+    """Features de treino vindas do cache são as mesmas que o preditor monta para cada paciente"""
+    from src.preprocessing import FusedPreprocessor
+    from src.training_runner import encode_data, scale_data
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        encoded = encode_data(load_dataset(DATA_PATH, cache_dir))
+    scaled = scale_data(encoded['X_encoded'], encoded['numerical_cols'])
+    X_scaled = scaled['X_scaled']
+
+    preprocessor = FusedPreprocessor(encoded['label_encoders'], scaled['scaler'], list(X_scaled.columns))
+    records = load_raw_data().drop(columns=['Obesity', 'BMI']).to_dict('records')
+    served = np.vstack([preprocessor.transform_record(record) for record in records])
+
+    assert np.array_equal(served, X_scaled.to_numpy(dtype=float)), \
+        f"Diferença máxima {np.abs(served - X_scaled.to_numpy(dtype=float)).max():.2e}"
+    print(f"✅ {len(records)} pacientes: features de treino idênticas às do preditor")
+
+
+if __name__ == "__main__":
+    test_cache_matches_csv()
+    test_rebuild_only_when_hash_changes()
+    test_training_features_match_serving()
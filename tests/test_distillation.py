@@ -0,0 +1,118 @@
+"""
+Testes do modelo aluno destilado e da cascata do preditor
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_distillation.py
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import get_models_dir, get_training_data, load_raw_data, train_model
+from src.distillation import (
+    CascadePredictor, calibrate_threshold, distill, load_student, remove_student, save_student, student_path,
+    train_student
+)
+from src.inference import ObesityPredictor
+from src.model_artifacts import BUNDLE_DIR, load_model_artifacts
+from src.model_bundle import save_bundle
+
+
+def test_threshold_meets_target_agreement():
+    """Limiar calibrado: concordância alvo entre os atendidos, sem separar empates"""
+    rng = np.random.default_rng(0)
+    confidence = rng.uniform(0.3, 1.0, size=2000).round(2)
+    teacher_labels = rng.integers(0, 3, size=2000)
+    # Quanto maior a confiança, maior a chance de concordar com o professor
+    agrees = rng.uniform(size=2000) < confidence ** 4
+    student_labels = np.where(agrees, teacher_labels, (teacher_labels + 1) % 3)
+    proba = np.zeros((2000, 3))
+    proba[np.arange(2000), student_labels] = confidence
+    proba[np.arange(2000), (student_labels + 1) % 3] = 1 - confidence
+
+    threshold = calibrate_threshold(proba, teacher_labels, 0.95)
+    covered = confidence >= threshold
+    assert agrees[covered].mean() >= 0.95 and 0 < covered.mean() < 1
+    lower = confidence[~covered].max()
+    assert agrees[confidence >= lower].mean() < 0.95
+    assert calibrate_threshold(proba[~agrees], teacher_labels[~agrees], 0.95) == float('inf')
+    print(f"✅ Limiar {threshold:.2f}: {covered.mean():.1%} atendidos com {agrees[covered].mean():.1%} de concordância")
+
+
+def test_cascade_guardrail_and_predictor():
+    """Aluno compilado fiel à árvore, trava de acurácia e cascata no preditor"""
+    from sklearn.model_selection import train_test_split
+    from sklearn.tree import DecisionTreeRegressor
+
+    X, y = get_training_data()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X.to_numpy(dtype=float), y, test_size=0.2, random_state=42, stratify=y)
+    # Professor sem ver o teste, como no notebook
+    teacher = train_model('random_forest', X_train, y_train)
+    artifacts = (teacher,) + load_model_artifacts(get_models_dir())[1:]
+
+    student = train_student(teacher, X_train, max_depth=6)
+    tree = DecisionTreeRegressor(max_depth=6, min_samples_leaf=5, random_state=42).fit(
+        X_train, teacher.predict_proba(X_train))
+    expected = tree.predict(X_test)
+    assert np.allclose(student.predict_proba(X_test), expected / expected.sum(axis=1, keepdims=True))
+
+    student, policy = distill(teacher, X_train, X_test, y_test, max_depth=6)
+    report = policy['holdout']
+    assert policy['guardrail_ok'] and report['coverage'] > 0.4 and report['agreement'] >= 0.97
+    assert report['cascade_accuracy'] >= report['teacher_accuracy'] - 0.01
+    assert report['student_p50_us'] < report['teacher_p50_us']
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        # Professor gravado em models_dir, como o notebook faz antes da destilação
+        save_bundle(os.path.join(models_dir, BUNDLE_DIR), *artifacts[:5])
+        artifacts = load_model_artifacts(models_dir)
+        save_student(student, policy, models_dir)
+        loaded, saved_policy = load_student(models_dir)
+        assert saved_policy['threshold'] == policy['threshold'] and saved_policy['teacher_sha256']
+        predictor = CascadePredictor.from_artifacts(artifacts, models_dir)
+        assert isinstance(predictor, CascadePredictor)
+
+        reference = ObesityPredictor.from_artifacts(artifacts)
+        sources = []
+        for record in load_raw_data().head(200).to_dict('records'):
+            predicted_class, proba, source = predictor.predict_with_source(record)
+            row = predictor.preprocessor.transform_record(record)
+            if source == 'student':
+                assert np.allclose(proba, loaded.predict_proba(row)[0]) and proba.max() >= predictor.threshold
+            else:
+                assert source == 'teacher' and predicted_class == reference.predict(record)[0]
+            assert predictor.predict(record)[0] == predicted_class
+            sources.append(source)
+        assert 'student' in sources
+        # Sem estado por predição: o preditor pode ser compartilhado entre sessões
+        assert not hasattr(predictor, 'last_source') and not hasattr(predictor, 'served')
+
+        # Novo professor gravado: o aluno antigo é recusado
+        retrained = train_model('random_forest', X_train[::2], y_train[::2])
+        save_bundle(os.path.join(models_dir, BUNDLE_DIR), retrained, *artifacts[1:5])
+        assert load_student(models_dir) == (None, None)
+        assert type(CascadePredictor.from_artifacts(load_model_artifacts(models_dir), models_dir)) is ObesityPredictor
+
+        try:
+            save_student(student, dict(policy, guardrail_ok=False), models_dir)
+            assert False, "Aluno reprovado na trava não deve ser gravado"
+        except ValueError:
+            pass
+        assert remove_student(models_dir) and not os.path.exists(student_path(models_dir))
+        assert not remove_student(models_dir)
+    print(f"✅ Cascata: aluno atende {report['coverage']:.1%}, concordância {report['agreement']:.2%}, "
+          f"{report['speedup']:.1f}x mais rápida")
+
+
+if __name__ == "__main__":
+    test_threshold_meets_target_agreement()
+    test_cascade_guardrail_and_predictor()
@@ -0,0 +1,80 @@
+"""
+Testes do cache de figuras do dashboard
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_figure_cache.py
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from src.figure_cache import FigureCache, filter_key, pickled_size
+
+
+def test_filter_key_is_canonical():
+    """Mesmos filtros em qualquer ordem geram a mesma chave"""
+    key = filter_key(['Female', 'Male'], (14, 61), ['Normal_Weight', 'Obesity_Type_I'])
+
+    assert key == filter_key(['Male', 'Female'], [14.0, 61.0], ('Obesity_Type_I', 'Normal_Weight'))
+    assert key != filter_key(['Female'], (14, 61), ['Normal_Weight', 'Obesity_Type_I'])
+    assert key != filter_key(['Female', 'Male'], (14, 60), ['Normal_Weight', 'Obesity_Type_I'])
+    assert key != filter_key(['Female', 'Male'], (14, 61), ['Normal_Weight', 'Obesity_Type_I'], 'abc123'), \
+        "Outra versão do dataset deve gerar outra chave"
+    print(f"✅ Chave canônica dos filtros: {key}")
+
+
+def test_lru_eviction_within_budget():
+    """Orçamento respeitado, item menos usado removido primeiro e contadores corretos"""
+    cache = FigureCache(max_bytes=300, sizeof=len)
+    builds = []
+
+    def builder(name, size=100):
+        return lambda: builds.append(name) or 'x' * size
+
+    cache.get_or_build('a', builder('a'))
+    cache.get_or_build('b', builder('b'))
+    cache.get_or_build('c', builder('c'))
+    cache.get_or_build('a', builder('a'))          # acerto: 'a' passa a ser o mais recente
+    cache.get_or_build('d', builder('d'))          # remove 'b', o menos usado
+
+    assert builds == ['a', 'b', 'c', 'd']
+    assert 'a' in cache and 'b' not in cache and len(cache) == 3
+    assert cache.get_or_build('huge', builder('huge', 1000)) == 'x' * 1000
+    assert 'huge' not in cache, "Itens maiores que o orçamento não devem ser guardados"
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 5, 1)
+    assert stats['bytes'] == 300 <= stats['max_bytes']
+    print(f"✅ LRU dentro do orçamento: {stats}")
+
+
+def test_shared_figures_across_sessions():
+    """Sessões concorrentes na mesma visão reaproveitam a mesma figura"""
+    import plotly.express as px
+
+    cache = FigureCache()
+    key = (filter_key(['Female', 'Male'], (14, 61), ['Normal_Weight']), 'histograma')
+
+    def render(_):
+        return cache.get_or_build(key, lambda: px.histogram(x=list(range(100)), nbins=10))
+
+    first = render(0)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        figures = list(pool.map(render, range(50)))
+
+    assert all(figure is first for figure in figures)
+    stats = cache.stats()
+    assert stats['misses'] == 1 and stats['hits'] == 50
+    assert stats['bytes'] == pickled_size(first)
+    print(f"✅ Taxa de acerto {stats['hit_rate']:.0%} com {stats['bytes']:,} bytes em cache")
+
+
+if __name__ == "__main__":
+    test_filter_key_is_canonical()
+    test_lru_eviction_within_budget()
+    test_shared_figures_across_sessions()
@@ -0,0 +1,186 @@
+"""
+Testes do cubo de agregados do dashboard
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_filter_cube.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import load_raw_data
+from src.bitmap_index import BitmapIndex
+from src.filter_cube import (
+    AGE_BAND_EDGES, AGE_BAND_LABELS, FAF_BAND_LABELS, FilterCube, HistogramCube, MomentCube, merge_moments
+)
+from src.model_artifacts import NUMERICAL_COLS
+
+FILTERS = [
+    (['Female', 'Male'], (14, 61), None),
+    (['Male'], (20, 30), None),
+    (['Female'], (25, 25), None),
+    (['Female', 'Male'], (14, 19), ['Obesity_Type_I', 'Normal_Weight']),
+    (['Female', 'Male'], (40, 61), ['Obesity_Type_III', 'Overweight_Level_II', 'Insufficient_Weight']),
+]
+
+
+def filter_rows(df, genders, age_range, obesity):
+    """Filtro original do dashboard sobre as linhas"""
+    selected = df['Gender'].isin(genders) & (df['Age'] >= age_range[0]) & (df['Age'] <= age_range[1])
+    if obesity is not None:
+        selected &= df['Obesity'].isin(obesity)
+    return df[selected]
+
+
+def test_cube_matches_row_level_aggregates():
+    """Totais, médias, contagens e crosstabs do cubo devem coincidir com pandas"""
+    df = load_raw_data()
+    cube = FilterCube.from_frame(df)
+
+    for genders, age_range, obesity in FILTERS:
+        rows = filter_rows(df, genders, age_range, obesity)
+        mask = cube.mask(genders, age_range, obesity)
+
+        assert cube.total(mask) == len(rows), (genders, age_range, obesity)
+        for measure in ['Age', 'BMI', 'FAF']:
+            assert np.isclose(cube.mean(measure, mask), rows[measure].mean(), rtol=1e-12)
+
+        assert cube.value_counts('Obesity', mask).equals(rows['Obesity'].value_counts().sort_index().rename('count').rename_axis('Obesity'))
+        expected_means = rows.groupby('Obesity')['CH2O'].mean()
+        assert np.allclose(cube.group_means('Obesity', 'CH2O', mask), expected_means, rtol=1e-12)
+
+        for row in ['Gender', 'family_history', 'FAVC']:
+            expected = pd.crosstab(rows[row], rows['Obesity'], normalize='index')
+            result = cube.crosstab(row, 'Obesity', mask, normalize=True)
+            assert result.index.equals(expected.index) and result.columns.equals(expected.columns), row
+            assert np.array_equal(result.to_numpy(), expected.to_numpy()), row
+
+    print(f"✅ Cubo com {cube.n_cells} células coincide com o filtro por linhas")
+
+
+def test_age_and_faf_bands():
+    """Faixas derivadas do cubo devem reproduzir pd.cut"""
+    df = load_raw_data()
+    cube = FilterCube.from_frame(df)
+
+    for genders, age_range, obesity in FILTERS:
+        rows = filter_rows(df, genders, age_range, obesity)
+        mask = cube.mask(genders, age_range, obesity)
+
+        bands = pd.cut(rows['Age'], bins=AGE_BAND_EDGES, labels=AGE_BAND_LABELS)
+        expected = pd.crosstab(bands, rows['Obesity'], normalize='index')
+        result = cube.crosstab('AgeBand', 'Obesity', mask, normalize=True)
+        assert list(result.index) == list(expected.index)
+        assert np.array_equal(result.to_numpy(), expected.to_numpy())
+
+        # Limite superior do dashboard (máx. + 0.1), mantido acima de 2 para filtros sem FAF > 2
+        top = max(rows['FAF'].max(), 2) + 0.1
+        faf = pd.cut(rows['FAF'], bins=[-0.1, 0, 1, 2, top], labels=FAF_BAND_LABELS)
+        expected_counts = faf.value_counts(sort=False).to_numpy()
+        assert np.array_equal(cube.grouped(['FAFBand'], mask), expected_counts)
+
+    print("✅ Faixas etárias e de atividade física idênticas a pd.cut")
+
+
+def test_cube_size_bounded_by_categories():
+    """Replicar os pacientes não deve aumentar o número de células"""
+    df = load_raw_data()
+    cube = FilterCube.from_frame(df)
+    big_cube = FilterCube.from_frame(pd.concat([df] * 20, ignore_index=True))
+
+    assert big_cube.n_cells == cube.n_cells
+    assert big_cube.total() == 20 * len(df)
+    assert np.isclose(big_cube.mean('BMI'), df['BMI'].mean(), rtol=1e-12)
+    print(f"✅ {big_cube.total():,} pacientes em {big_cube.n_cells} células")
+
+
+def test_correlation_matches_pandas():
+    """Correlação montada a partir dos momentos deve coincidir com DataFrame.corr()"""
+    df = load_raw_data()
+    moments = MomentCube.from_frame(df)
+
+    for genders, age_range, obesity in FILTERS + [(['Female'], (25, 25), ['Obesity_Type_III'])]:
+        rows = filter_rows(df, genders, age_range, obesity)
+        result = moments.corr(moments.mask(genders, age_range, obesity))
+        expected = rows[NUMERICAL_COLS].corr()
+
+        assert result.index.equals(expected.index) and result.columns.equals(expected.columns)
+        assert np.allclose(result, expected, rtol=1e-10, atol=1e-12, equal_nan=True), (genders, age_range, obesity)
+        assert np.array_equal(np.isnan(result.to_numpy()), np.isnan(expected.to_numpy()))
+
+    # Filtro vazio e variável constante: NaN como no pandas
+    assert moments.corr(moments.mask(['Female'], (70, 80))).isna().all().all()
+    constant = df.assign(FCVC=2.0)
+    result = MomentCube.from_frame(constant).corr()
+    expected = constant[NUMERICAL_COLS].corr()
+    assert np.allclose(result, expected, rtol=1e-10, atol=1e-12, equal_nan=True)
+    print(f"✅ Correlações de {moments.n_cells} células idênticas a DataFrame.corr()")
+
+
+def test_moment_merge_is_stable():
+    """Combinar partes deve independer da ordem e resistir a grandes deslocamentos"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 3)) + 1e8
+
+    def moments_of(part):
+        mean = part.mean(axis=0)
+        return len(part), mean, (part - mean).T @ (part - mean)
+
+    parts = np.array_split(X, [50, 51, 320])
+    forward = moments_of(parts[0])
+    for part in parts[1:]:
+        forward = merge_moments(*forward, *moments_of(part))
+    backward = moments_of(parts[-1])
+    for part in parts[-2::-1]:
+        backward = merge_moments(*moments_of(part), *backward)
+
+    expected = np.cov(X, rowvar=False) * (len(X) - 1)
+    for n, mean, comoment in (forward, backward):
+        assert n == len(X)
+        assert np.allclose(mean, X.mean(axis=0), rtol=1e-15)
+        assert np.allclose(comoment, expected, rtol=1e-9, atol=1e-5)
+    assert merge_moments(0, np.zeros(3), np.zeros((3, 3)), *forward)[0] == len(X)
+    print("✅ Combinação de momentos estável e independente da ordem")
+
+
+def test_missing_values_outside_buckets():
+    """Idade ou medida ausente não vira bucket: mesmo tratamento do índice de bitmaps"""
+    df = load_raw_data()
+    df.loc[df.index[::50], 'Age'] = np.nan
+    df.loc[df.index[::70], 'BMI'] = np.nan
+    cube = FilterCube.from_frame(df)
+    bitmaps = BitmapIndex.from_frame(df)
+
+    assert min(cube.categories['AgeBucket']) >= 0 and cube.total() == len(df)
+    for genders, age_range, obesity in FILTERS:
+        mask = cube.mask(genders, age_range, obesity)
+        expected = filter_rows(df, genders, age_range, obesity)
+        assert cube.total(mask) == len(expected) == bitmaps.count(bitmaps.select(genders, age_range, obesity))
+    assert cube.value_counts('AgeBand').sum() == df['Age'].notna().sum()
+
+    histogram = HistogramCube.from_frame(df, 'BMI', 1.0)
+    counts, edges = histogram.histogram()
+    assert histogram.bin_counts.shape[1] < 100, "Valores ausentes não podem criar intervalos"
+    assert counts.sum() == df['BMI'].notna().sum() and histogram.missing() == df['BMI'].isna().sum()
+    assert np.array_equal(counts, np.histogram(df['BMI'].dropna(), edges)[0])
+
+    merged = HistogramCube.from_frame(df.iloc[:1000], 'BMI', 1.0).merge(HistogramCube.from_frame(df.iloc[1000:], 'BMI', 1.0))
+    assert merged.missing() == histogram.missing()
+    print(f"✅ {df['Age'].isna().sum()} idades e {df['BMI'].isna().sum()} IMCs ausentes fora dos buckets")
+
+
+if __name__ == "__main__":
+    test_cube_matches_row_level_aggregates()
+    test_age_and_faf_bands()
+    test_cube_size_bounded_by_categories()
+    test_correlation_matches_pandas()
+    test_moment_merge_is_stable()
+    test_missing_values_outside_buckets()
@@ -0,0 +1,95 @@
+"""
+Testes da busca de hiperparâmetros com orçamento (successive halving)
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_hyperparameter_search.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import load_raw_data
+from src.hyperparameter_search import save_search_report, search_report_path, successive_halving
+from src.training_runner import build_model, prepare_training_data
+
+TREE_GRID = {
+    'max_depth': [3, 5, 10, 20, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4]
+}
+
+
+def test_halving_matches_grid_with_fewer_fits():
+    """Successive halving deve chegar perto do GridSearchCV com menos ajustes equivalentes"""
+    from sklearn.model_selection import GridSearchCV
+
+    data = prepare_training_data(load_raw_data())
+    result = successive_halving('Decision Tree', data['X_train'], data['y_train'], param_grid=TREE_GRID, workers=1)
+    grid = GridSearchCV(build_model('Decision Tree'), TREE_GRID, cv=5, scoring='accuracy', n_jobs=1)
+    grid.fit(data['X_train'], data['y_train'])
+
+    trajectory = result['trajectory']
+    assert [entry['n_candidates'] for entry in trajectory] == [45, 15, 5, 2]
+    assert trajectory[-1]['n_resources'] == len(data['y_train'])
+    assert result['grid_fits'] == 45 * 5 and result['equivalent_full_fits'] < result['grid_fits'] / 3
+    assert result['best_score'] >= grid.best_score_ - 0.02
+    test_accuracy = result['best_estimator'].score(data['X_test'], data['y_test'])
+    assert test_accuracy >= grid.score(data['X_test'], data['y_test']) - 0.03
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        path = save_search_report(result, models_dir, extra={'test_accuracy': test_accuracy})
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+        assert os.path.basename(path) == 'hyperparameter_search_decision_tree.json' and 'best_estimator' not in report
+        assert report['best_params'] == result['best_params'] and len(report['trajectory']) == len(trajectory)
+        # Buscas de modelos diferentes não se sobrescrevem
+        assert search_report_path('Random Forest', models_dir) != path
+        custom = save_search_report(result, extra={'test_accuracy': test_accuracy},
+                                    path=os.path.join(models_dir, 'relatorio.json'))
+        with open(custom, encoding='utf-8') as f:
+            assert json.load(f)['test_accuracy'] == test_accuracy
+    print(f"✅ CV {result['best_score']:.2%} (grade {grid.best_score_:.2%}) com "
+          f"≈{result['equivalent_full_fits']:.0f} ajustes equivalentes contra {result['grid_fits']}")
+
+
+def test_boosting_budget_and_early_stopping():
+    """Orçamento interrompe rodadas; XGBoost reajustado com as árvores da parada antecipada"""
+    data = prepare_training_data(load_raw_data())
+    grid = {'n_estimators': [500], 'max_depth': [2, 3, 5], 'learning_rate': [0.3]}
+
+    result = successive_halving('XGBoost', data['X_train'], data['y_train'], param_grid=grid, workers=1)
+    n_trees = result['best_params']['n_estimators']
+    assert 0 < n_trees < 500 and result['best_estimator'].n_estimators == n_trees
+    assert result['best_estimator'].get_params()['early_stopping_rounds'] is None
+
+    limited = successive_halving('XGBoost', data['X_train'], data['y_train'], param_grid=grid,
+                                 max_fits=18, workers=1)
+    assert limited['stopped_by'] == 'max_fits' and limited['n_fits'] == 15
+    assert len(limited['trajectory']) == 1
+    print(f"✅ Parada antecipada em {n_trees} árvores; orçamento de ajustes respeitado")
+
+
+def test_time_budget_stops_within_first_round():
+    """Orçamento de tempo esgotado: nenhum lote novo, mesmo no meio da primeira rodada"""
+    data = prepare_training_data(load_raw_data())
+    result = successive_halving('Decision Tree', data['X_train'], data['y_train'], param_grid=TREE_GRID,
+                                time_budget=0, workers=1)
+
+    assert result['stopped_by'] == 'time_budget' and len(result['trajectory']) == 1
+    first_round = result['trajectory'][0]
+    assert not first_round['complete'] and first_round['n_candidates'] >= 1
+    assert result['n_fits'] < 45 * 5 and result['best_params'] == first_round['best_params']
+    print(f"✅ Orçamento de tempo: {result['n_fits']} de {45 * 5} ajustes da primeira rodada")
+
+
+if __name__ == "__main__":
+    test_halving_matches_grid_with_fewer_fits()
+    test_boosting_budget_and_early_stopping()
+    test_time_budget_stops_within_first_round()
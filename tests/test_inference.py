@@ -0,0 +1,112 @@
+"""
+Testes da inferência de baixa latência
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_inference.py
+"""
+
+import os
+import sys
+import warnings
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import encode_features, get_models_dir, load_raw_data, train_model
+from src.inference import ObesityPredictor, measure_latency
+from src.model_artifacts import load_model_artifacts
+
+PATIENT = {
+    'Gender': 'Male', 'Age': 30, 'Height': 1.75, 'Weight': 80,
+    'family_history': 'yes', 'FAVC': 'yes', 'FCVC': 2.0, 'NCP': 3.0,
+    'CAEC': 'Sometimes', 'SMOKE': 'no', 'CH2O': 2.0, 'SCC': 'no',
+    'FAF': 1.0, 'TUE': 1.0, 'CALC': 'Sometimes', 'MTRANS': 'Public_Transportation'
+}
+
+
+def get_predictor():
+    """Preditor montado com os artefatos de teste"""
+    return ObesityPredictor.from_artifacts(load_model_artifacts(get_models_dir()))
+
+
+def test_feature_vector_matches_dataframe_pipeline():
+    """Vetor pré-compilado deve ser idêntico ao pipeline com DataFrame"""
+    model, encoders, _, scaler, feature_names, _ = load_model_artifacts(get_models_dir())
+    predictor = get_predictor()
+    df = load_raw_data().head(300)
+
+    reference = encode_features(df, encoders, scaler, feature_names).to_numpy(dtype=float)
+    built = np.vstack([predictor.preprocessor.transform_record(record) for record in df.to_dict('records')])
+
+    assert np.array_equal(built, reference), "Vetores de features divergentes"
+    print(f"✅ {len(df)} vetores idênticos ao pipeline de referência")
+
+
+def test_single_pass_prediction():
+    """Classe prevista deve ser o argmax e igual a model.predict"""
+    model, encoders, target_encoder, scaler, feature_names, _ = load_model_artifacts(get_models_dir())
+    predictor = get_predictor()
+    df = load_raw_data().head(100)
+    reference = encode_features(df, encoders, scaler, feature_names)
+    expected = target_encoder.inverse_transform(model.predict(reference))
+
+    for record, expected_class in zip(df.to_dict('records'), expected):
+        predicted_class, proba = predictor.predict(record)
+        assert predicted_class == expected_class, f"{predicted_class} != {expected_class}"
+        assert np.isclose(proba.sum(), 1.0), "Probabilidades devem somar 1"
+
+    print("✅ Predição de uma passada coincide com model.predict")
+
+
+def test_unknown_category():
+    """Categorias desconhecidas devem gerar erro claro"""
+    predictor = get_predictor()
+    try:
+        predictor.predict(dict(PATIENT, CALC='Never'))
+    except ValueError as e:
+        assert 'CALC' in str(e), f"Mensagem sem a coluna: {e}"
+        print("✅ Categoria desconhecida rejeitada")
+    else:
+        assert False, "Categoria desconhecida não foi rejeitada"
+
+
+def test_feature_name_warning_without_filters():
+    """Predição com ndarray sem aviso de nomes de features e sem filtro de avisos"""
+    assert not any(f[1] is not None and 'valid feature names' in f[1].pattern for f in warnings.filters), \
+        "Filtro global de avisos instalado na importação"
+
+    # Modelo ajustado com DataFrame, como o do notebook
+    model = train_model()
+    _, encoders, target_encoder, scaler, feature_names, _ = load_model_artifacts(get_models_dir())
+    predictor = ObesityPredictor(model, encoders, target_encoder, scaler, feature_names)
+    filters = list(warnings.filters)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        predictor.predict(PATIENT)
+        assert not caught, [str(w.message) for w in caught]
+        assert predictor.model.estimators_ is model.estimators_, "Árvores devem ser compartilhadas"
+        model.predict_proba(np.zeros((1, len(feature_names))))
+    assert any('valid feature names' in str(w.message) for w in caught), "Modelo original não deve ser alterado"
+    assert warnings.filters == filters and list(model.feature_names_in_) == list(feature_names)
+    print("✅ Predição com ndarray sem aviso e sem filtros de avisos")
+
+
+def test_latency_report():
+    """Relatório de latência deve conter percentis positivos"""
+    stats = measure_latency(get_predictor(), PATIENT, n_runs=50)
+
+    assert 0 < stats['build_p50_us'] <= stats['build_p99_us']
+    assert 0 < stats['total_p50_us'] <= stats['total_p99_us']
+    print(f"✅ Montagem p99: {stats['build_p99_us']:.1f}µs | Total p99: {stats['total_p99_us']:.1f}µs")
+
+
+if __name__ == "__main__":
+    test_feature_vector_matches_dataframe_pipeline()
+    test_single_pass_prediction()
+    test_unknown_category()
+    test_feature_name_warning_without_filters()
+    test_latency_report()
@@ -24,6 +24,11 @@ else:
 # Mudar para diretório raiz
 os.chdir(ROOT_DIR)
 sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import get_models_dir
+from src.model_artifacts import BUNDLE_DIR
+from src.model_bundle import load_bundle, verify_bundle
 
 print(f"📁 Diretório de trabalho: {ROOT_DIR}")
 print()
@@ -34,6 +39,33 @@ def get_model_path(filename):
     return os.path.join(ROOT_DIR, 'models', filename)
 
 
+def get_bundle_dir():
+    """Bundle versionado (gerado pelos fixtures quando best_model.pkl não existe)"""
+    return os.path.join(get_models_dir(), BUNDLE_DIR)
+
+
+# Dados de teste (paciente típico)
+TEST_PATIENT = {
+    'Gender': 'Male',
+    'Age': 30,
+    'Height': 1.75,
+    'Weight': 80,
+    'family_history': 'yes',
+    'FAVC': 'yes',
+    'FCVC': 2.0,
+    'NCP': 3.0,
+    'CAEC': 'Sometimes',
+    'SMOKE': 'no',
+    'CH2O': 2.0,
+    'SCC': 'no',
+    'FAF': 1.0,
+    'TUE': 1.0,
+    'CALC': 'Sometimes',
+    'MTRANS': 'Public_Transportation',
+    'BMI': 26.12
+}
+
+
 def test_model_files_exist():
     """Verificar se todos os arquivos do modelo existem"""
     required_files = [
@@ -69,17 +101,20 @@ def test_load_model():
 
 
 def test_load_artifacts():
-    """Testar carregamento de artefatos"""
+    """Testar carregamento de artefatos do bundle versionado"""
     artifacts = {}
     
     try:
-        artifacts['encoders'] = joblib.load(get_model_path('label_encoders.pkl'))
-        artifacts['scaler'] = joblib.load(get_model_path('scaler.pkl'))
-        artifacts['features'] = joblib.load(get_model_path('feature_names.pkl'))
-        artifacts['target_encoder'] = joblib.load(get_model_path('target_encoder.pkl'))
+        # Checksums conferidos uma vez aqui; o carregamento dos apps não os relê
+        verify_bundle(get_bundle_dir())
+        _, encoders, target_encoder, scaler, features, _ = load_bundle(get_bundle_dir())
+        artifacts['encoders'] = encoders
+        artifacts['scaler'] = scaler
+        artifacts['features'] = features
+        artifacts['target_encoder'] = target_encoder
         
         assert len(artifacts) == 4, "Não carregou todos os artefatos"
-        print("✅ Todos os artefatos carregados")
+        print("✅ Todos os artefatos carregados do bundle")
         return artifacts
         
     except Exception as e:
@@ -90,35 +125,15 @@ def test_prediction_pipeline():
     """Testar pipeline completo de predição"""
     
     # Carregar modelo e artefatos
-    model = joblib.load(get_model_path('best_model.pkl'))
-    encoders = joblib.load(get_model_path('label_encoders.pkl'))
-    scaler = joblib.load(get_model_path('scaler.pkl'))
-    feature_names = joblib.load(get_model_path('feature_names.pkl'))
-    
-    # Dados de teste (paciente típico)
-    test_data = {
-        'Gender': 'Male',
-        'Age': 30,
-        'Height': 1.75,
-        'Weight': 80,
-        'family_history': 'yes',
-        'FAVC': 'yes',
-        'FCVC': 2.0,
-        'NCP': 3.0,
-        'CAEC': 'Sometimes',
-        'SMOKE': 'no',
-        'CH2O': 2.0,
-        'SCC': 'no',
-        'FAF': 1.0,
-        'TUE': 1.0,
-        'CALC': 'Sometimes',
-        'MTRANS': 'Public_Transportation',
-        'BMI': 26.12
-    }
+    models_dir = get_models_dir()
+    model = joblib.load(os.path.join(models_dir, 'best_model.pkl'))
+    encoders = joblib.load(os.path.join(models_dir, 'label_encoders.pkl'))
+    scaler = joblib.load(os.path.join(models_dir, 'scaler.pkl'))
+    feature_names = joblib.load(os.path.join(models_dir, 'feature_names.pkl'))
     
     try:
         # Criar DataFrame
-        df = pd.DataFrame([test_data])
+        df = pd.DataFrame([TEST_PATIENT])
         
         # Encoding
         df_encoded = df.copy()
@@ -149,6 +164,28 @@ def test_prediction_pipeline():
         assert False, f"Erro no pipeline: {e}"
 
 
+def test_bundle_prediction_pipeline():
+    """Testar predição com o bundle (ndarray, como o preditor dos apps)"""
+    model, encoders, _, scaler, feature_names, _ = load_bundle(get_bundle_dir())
+    reference = joblib.load(os.path.join(get_models_dir(), 'best_model.pkl'))
+    
+    df_encoded = pd.DataFrame([TEST_PATIENT])
+    for col, encoder in encoders.items():
+        df_encoded[col] = encoder.transform(df_encoded[col])
+    df_encoded = df_encoded[feature_names]
+    numerical_cols = ['Age', 'Height', 'Weight', 'FCVC', 'NCP', 'CH2O', 'FAF', 'TUE', 'BMI']
+    df_encoded[numerical_cols] = scaler.transform(df_encoded[numerical_cols])
+    
+    # O bundle recebe ndarray; o modelo em pickle, o DataFrame com que foi treinado
+    X = df_encoded.to_numpy(dtype=float)
+    proba = model.predict_proba(X)
+    
+    assert len(proba[0]) == 7, "Probabilidades devem ter 7 classes"
+    assert np.isclose(proba[0].sum(), 1.0), "Probabilidades devem somar 1"
+    assert np.allclose(proba, reference.predict_proba(df_encoded)), "Bundle difere do modelo em pickle"
+    print(f"✅ Pipeline de predição do bundle funcionando (confiança {proba[0].max():.2%})")
+
+
 def test_feature_count():
     """Verificar número correto de features"""
     feature_names = joblib.load(get_model_path('feature_names.pkl'))
@@ -208,6 +245,7 @@ def run_all_tests():
         ("Número de Features", test_feature_count),
         ("Completude dos Encoders", test_encoders_completeness),
         ("Pipeline de Predição", test_prediction_pipeline),
+        ("Pipeline de Predição do Bundle", test_bundle_prediction_pipeline),
         ("Acurácia do Modelo", test_model_accuracy)
     ]
     
@@ -0,0 +1,125 @@
+"""
+Testes do bundle versionado do modelo
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_model_bundle.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import encode_features, get_models_dir, get_training_data, load_raw_data
+from src.model_artifacts import load_model_artifacts
+from src.model_bundle import BundleError, load_bundle, save_bundle, verify_bundle
+
+
+def test_bundle_round_trip():
+    """Bundle deve reproduzir pickles e predições do modelo original"""
+    pickled = load_model_artifacts(get_models_dir(), use_bundle=False)
+    model, encoders, target_encoder, scaler, feature_names, metrics = pickled
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bundle_dir = os.path.join(tmp_dir, 'model_bundle')
+        manifest = save_bundle(bundle_dir, *pickled)
+        assert manifest['model']['format'] == 'compiled'
+
+        b_model, b_encoders, b_target, b_scaler, b_features, b_metrics = load_bundle(bundle_dir)
+
+        assert b_features == list(feature_names)
+        assert list(b_target.classes_) == list(target_encoder.classes_)
+        for col, encoder in encoders.items():
+            assert list(b_encoders[col].classes_) == list(encoder.classes_), col
+        assert np.array_equal(b_scaler.mean_, scaler.mean_)
+        assert np.array_equal(b_scaler.scale_, scaler.scale_)
+        assert isinstance(b_model.value, np.memmap), "Arrays do ensemble deveriam estar em memory-map"
+
+        df = load_raw_data()
+        X = encode_features(df, encoders, scaler, feature_names)
+        X_bundle = encode_features(df, b_encoders, b_scaler, b_features)
+        assert np.array_equal(X.to_numpy(), X_bundle.to_numpy())
+        assert np.allclose(b_model.predict_proba(X_bundle), model.predict_proba(X), rtol=0, atol=1e-12)
+
+        if metrics is not None:
+            assert b_metrics['model_name'] == metrics['model_name']
+            assert b_metrics['results_df'].equals(metrics['results_df'])
+
+    print(f"✅ Bundle reproduz os artefatos ({len(manifest['files'])} arquivos)")
+
+
+def test_bundle_integrity_checks():
+    """Checksum divergente ou versão de esquema diferente devem ser rejeitados"""
+    artifacts = load_model_artifacts(get_models_dir(), use_bundle=False)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bundle_dir = os.path.join(tmp_dir, 'model_bundle')
+        save_bundle(bundle_dir, *artifacts)
+        verify_bundle(bundle_dir)
+
+        with open(os.path.join(bundle_dir, 'preprocessing.json'), 'a', encoding='utf-8') as f:
+            f.write(' ')
+        load_bundle(bundle_dir)  # Carregamento padrão não relê os checksums
+        try:
+            load_bundle(bundle_dir, verify=True)
+        except BundleError as e:
+            assert 'preprocessing.json' in str(e)
+        else:
+            assert False, "Arquivo alterado não foi detectado"
+
+        manifest_path = os.path.join(bundle_dir, 'manifest.json')
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        manifest['schema_version'] = 999
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        try:
+            load_bundle(bundle_dir)
+        except BundleError as e:
+            assert '999' in str(e)
+        else:
+            assert False, "Versão incompatível não foi detectada"
+
+    print("✅ Checksum e versão do esquema validados")
+
+
+def test_unsupported_model_kept_as_pickle():
+    """Modelos sem exportador compilado ficam no bundle como joblib"""
+    from sklearn.linear_model import LogisticRegression
+
+    X, y = get_training_data()
+    model = LogisticRegression(max_iter=500).fit(X, y)
+    _, encoders, target_encoder, scaler, feature_names, _ = load_model_artifacts(get_models_dir(), use_bundle=False)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bundle_dir = os.path.join(tmp_dir, 'model_bundle')
+        manifest = save_bundle(bundle_dir, model, encoders, target_encoder, scaler, feature_names)
+        loaded, *_, metrics = load_bundle(bundle_dir)
+
+        assert manifest['model'] == {'format': 'joblib', 'type': 'LogisticRegression'}
+        assert metrics is None
+        assert np.array_equal(loaded.predict(X), model.predict(X))
+
+        # Pedir o ensemble compilado de um bundle em pickle é um erro, não o pickle
+        assert type(load_model_artifacts(tmp_dir)[0]) is LogisticRegression
+        try:
+            load_model_artifacts(tmp_dir, compiled=True)
+        except ValueError as e:
+            assert 'LogisticRegression' in str(e)
+        else:
+            assert False, "compiled=True não deve ser ignorado com o bundle"
+
+    print("✅ Modelo sem exportador mantido como joblib")
+
+
+if __name__ == "__main__":
+    test_bundle_round_trip()
+    test_bundle_integrity_checks()
+    test_unsupported_model_kept_as_pickle()
@@ -0,0 +1,111 @@
+"""
+Testes da avaliação por predições out-of-fold
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_oof_evaluation.py
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import load_raw_data
+from src.oof_evaluation import (
+    ARRAYS_FILE, classification_metrics, evaluation_path, evaluation_table, load_evaluation,
+    load_evaluation_arrays, main, persisted_model_name, save_evaluation, summarize
+)
+from src.training_runner import fold_assignments, prepare_training_data, train_model_zoo
+
+FAST_MODELS = ['Logistic Regression', 'Decision Tree']
+
+
+def test_metrics_match_sklearn():
+    """Métricas derivadas das probabilidades iguais às do scikit-learn"""
+    from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, log_loss, precision_score, recall_score
+
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 5, size=300)
+    proba = rng.dirichlet(np.ones(5), size=300)
+    proba[:, 4] *= 0.01  # classe nunca prevista: precisão indefinida vale 0
+    proba /= proba.sum(axis=1, keepdims=True)
+    y_pred = proba.argmax(axis=1)
+
+    metrics = classification_metrics(y_true, proba)
+    assert np.isclose(metrics['accuracy'], accuracy_score(y_true, y_pred))
+    assert np.isclose(metrics['precision'], precision_score(y_true, y_pred, average='weighted', zero_division=0))
+    assert np.isclose(metrics['recall'], recall_score(y_true, y_pred, average='weighted'))
+    assert np.isclose(metrics['f1_score'], f1_score(y_true, y_pred, average='weighted'))
+    assert np.isclose(metrics['log_loss'], log_loss(y_true, proba))
+    cm = confusion_matrix(y_true, y_pred, labels=range(5))
+    assert np.array_equal(metrics['confusion_matrix'], cm)
+    assert np.allclose(metrics['class_accuracy'], cm.diagonal() / cm.sum(axis=1))
+    print("✅ Acurácia, precisão, recall, F1, log loss e matriz de confusão iguais ao scikit-learn")
+
+
+def test_evaluation_persisted_from_single_fits():
+    """Probabilidades out-of-fold gravadas e métricas refeitas a partir dos arrays"""
+    data = prepare_training_data(load_raw_data())
+    y_train, y_test = data['y_train'], data['y_test']
+    results, report = train_model_zoo(data['X_train'], y_train, data['X_test'], y_test,
+                                      names=FAST_MODELS, workers=1)
+    assert report['n_jobs'] == len(FAST_MODELS) * 6
+
+    folds = fold_assignments(y_train)
+    for name, result in results.items():
+        assert result['oof_proba'].shape == (len(y_train), 7)
+        assert np.allclose(result['oof_proba'].sum(axis=1), 1)
+        assert np.array_equal(result['predictions'], result['model'].predict(data['X_test']))
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        saved = save_evaluation(results, y_train, y_test, folds, data['target_encoder'].classes_,
+                                models_dir, selected_model='Decision Tree')
+        manifest = load_evaluation(models_dir)
+        assert manifest['models'] == FAST_MODELS and manifest['selected_model'] == 'Decision Tree'
+        assert np.array_equal(saved['metrics']['Decision Tree']['oof']['confusion_matrix'],
+                              manifest['metrics']['Decision Tree']['oof']['confusion_matrix'])
+
+        arrays = load_evaluation_arrays(models_dir)
+        for i, name in enumerate(manifest['models']):
+            summary = summarize(arrays['y_train'], arrays['y_test'], arrays['folds'],
+                                arrays['oof_proba'][i], arrays['test_proba'][i])
+            assert np.isclose(summary['holdout']['accuracy'], results[name]['accuracy'])
+            assert np.allclose(summary['oof']['fold_scores'], results[name]['cv_scores'])
+            assert np.array_equal(summary['oof']['confusion_matrix'],
+                                  manifest['metrics'][name]['oof']['confusion_matrix'])
+        assert list(evaluation_table(manifest)['Modelo']) == ['Decision Tree', 'Logistic Regression']
+
+        with open(os.path.join(evaluation_path(models_dir), ARRAYS_FILE), 'ab') as f:
+            f.write(b'\0')
+        try:
+            load_evaluation_arrays(models_dir)
+            raise AssertionError("Arrays corrompidos deveriam falhar")
+        except ValueError:
+            pass
+    print("✅ Avaliação out-of-fold gravada; métricas refeitas dos arrays iguais às do treino")
+
+
+def test_cli_refuses_model_outside_zoo():
+    """A linha de comando não grava avaliação de um modelo que ela não reproduz"""
+    import joblib
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        assert main(['build', '--models-dir', models_dir]) == 1
+        joblib.dump({'model_name': 'Random Forest (otimizado)', 'accuracy': 0.97},
+                    os.path.join(models_dir, 'model_metrics.pkl'))
+        assert persisted_model_name(models_dir) == 'Random Forest (otimizado)'
+        assert main(['build', '--models-dir', models_dir]) == 1
+        assert not os.path.exists(evaluation_path(models_dir)), "Avaliação não deve ser gravada"
+    print("✅ Avaliação recusada quando o modelo gravado não está entre os avaliados")
+
+
+if __name__ == "__main__":
+    test_metrics_match_sklearn()
+    test_evaluation_persisted_from_single_fits()
+    test_cli_refuses_model_outside_zoo()
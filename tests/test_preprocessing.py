@@ -0,0 +1,77 @@
+"""
+Testes do pré-processamento fundido
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_preprocessing.py
+"""
+
+import os
+import sys
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import encode_features, get_models_dir, load_raw_data
+from src.model_artifacts import load_model_artifacts
+from src.preprocessing import FusedPreprocessor, UnknownCategoryError
+
+
+def get_preprocessor():
+    """Pré-processador montado com os artefatos de teste"""
+    return FusedPreprocessor.from_artifacts(load_model_artifacts(get_models_dir()))
+
+
+def test_batch_matches_reference_pipeline():
+    """Lote e registro único devem reproduzir LabelEncoder + StandardScaler"""
+    _, encoders, _, scaler, feature_names, _ = load_model_artifacts(get_models_dir())
+    preprocessor = get_preprocessor()
+    df = load_raw_data()
+
+    reference = encode_features(df, encoders, scaler, feature_names).to_numpy(dtype=float)
+    batch = preprocessor.transform(df)
+    records = np.vstack([preprocessor.transform_record(r) for r in df.head(200).to_dict('records')])
+
+    assert np.array_equal(batch, reference), "Lote divergente do pipeline de referência"
+    assert np.array_equal(records, reference[:200]), "Registro divergente do pipeline de referência"
+    print(f"✅ {len(df)} linhas idênticas ao pipeline de referência")
+
+
+def test_bmi_and_dict_input():
+    """BMI deve ser derivado quando ausente e dicionários de arrays aceitos"""
+    preprocessor = get_preprocessor()
+    df = load_raw_data().head(50)
+    with_bmi = df.assign(BMI=df['Weight'] / (df['Height'] ** 2))
+    columns = {col: df[col].to_numpy() for col in df.columns}
+
+    expected = preprocessor.transform(with_bmi)
+    assert np.array_equal(preprocessor.transform(df.drop(columns='BMI', errors='ignore')), expected)
+    assert np.array_equal(preprocessor.transform(columns), expected)
+    print("✅ BMI derivado e entrada em dicionário equivalentes")
+
+
+def test_unknown_category():
+    """Valores desconhecidos ou ausentes devem gerar UnknownCategoryError"""
+    preprocessor = get_preprocessor()
+    df = load_raw_data().head(20)
+
+    for bad_value in ['Hoverboard', np.nan]:
+        broken = df.copy()
+        broken.loc[3, 'MTRANS'] = bad_value
+        try:
+            preprocessor.transform(broken)
+        except UnknownCategoryError as e:
+            assert e.column == 'MTRANS', f"Coluna incorreta: {e.column}"
+        else:
+            assert False, f"Valor {bad_value!r} não foi rejeitado"
+
+    print("✅ Categorias desconhecidas rejeitadas")
+
+
+if __name__ == "__main__":
+    test_batch_matches_reference_pipeline()
+    test_bmi_and_dict_input()
+    test_unknown_category()
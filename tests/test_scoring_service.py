@@ -0,0 +1,113 @@
+"""
+Testes do serviço HTTP com micro-batching
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_scoring_service.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import get_models_dir
+from src.inference import ObesityPredictor
+from src.model_artifacts import load_model_artifacts
+from src.scoring_service import SAMPLE_PATIENT, MicroBatcher, ScoringServer, run_load_test
+
+
+def make_server(**batcher_kwargs) -> ScoringServer:
+    """Servidor em porta livre com os artefatos de teste"""
+    predictor = ObesityPredictor.from_artifacts(load_model_artifacts(get_models_dir()))
+    return ScoringServer(MicroBatcher(predictor, **batcher_kwargs), port=0)
+
+
+async def http_request(port: int, method: str, path: str, payload=None) -> tuple:
+    """Requisição HTTP simples (Connection: close)"""
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, _, data = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(data)
+
+
+def test_predict_endpoint():
+    """POST /predict deve retornar classe e probabilidades"""
+    async def scenario():
+        server = make_server()
+        await server.start()
+        try:
+            status, payload = await http_request(server.port, 'POST', '/predict', SAMPLE_PATIENT)
+            bad_status, _ = await http_request(server.port, 'POST', '/predict', dict(SAMPLE_PATIENT, SMOKE='maybe'))
+            not_object = [(await http_request(server.port, 'POST', '/predict', body))[0] for body in ([1, 2], 'x')]
+            incomplete = {k: v for k, v in SAMPLE_PATIENT.items() if k != 'Weight'}
+            incomplete_status, _ = await http_request(server.port, 'POST', '/predict', incomplete)
+            missing_status, _ = await http_request(server.port, 'GET', '/inexistente')
+        finally:
+            await server.stop()
+        return status, payload, bad_status, not_object + [incomplete_status], missing_status
+
+    status, payload, bad_status, invalid_statuses, missing_status = asyncio.run(scenario())
+
+    assert status == 200, f"Status inesperado: {status}"
+    assert payload['prediction'] in payload['probabilities']
+    assert abs(sum(payload['probabilities'].values()) - 1.0) < 1e-9
+    assert bad_status == 400, "Categoria inválida deve retornar 400"
+    assert invalid_statuses == [400, 400, 400], f"JSON que não é paciente deve retornar 400: {invalid_statuses}"
+    assert missing_status == 404, "Rota inexistente deve retornar 404"
+    print(f"✅ Predição via HTTP: {payload['label']}")
+
+
+def test_micro_batching_under_load():
+    """Requisições concorrentes devem ser agrupadas em lotes"""
+    async def scenario():
+        server = make_server(batch_window_ms=10)
+        await server.start()
+        try:
+            load = await run_load_test('127.0.0.1', server.port, SAMPLE_PATIENT, n_requests=300, concurrency=30)
+            _, health = await http_request(server.port, 'GET', '/health')
+        finally:
+            await server.stop()
+        return load, health
+
+    load, health = asyncio.run(scenario())
+
+    assert load['status_counts'] == {200: 300}, f"Status: {load['status_counts']}"
+    assert health['batches'] < health['requests'], "Nenhuma requisição foi agrupada"
+    assert health['largest_batch'] > 1
+    print(f"✅ {load['requests_per_second']:,.0f} req/s | lote médio: {health['mean_batch_size']:.1f}")
+
+
+def test_backpressure_when_queue_full():
+    """Fila cheia deve responder 503"""
+    async def scenario():
+        server = make_server(batch_window_ms=50, max_queue=2)
+        await server.start()
+        try:
+            return await run_load_test('127.0.0.1', server.port, SAMPLE_PATIENT, n_requests=40, concurrency=20)
+        finally:
+            await server.stop()
+
+    load = asyncio.run(scenario())
+
+    assert load['status_counts'].get(503, 0) > 0, f"Sem backpressure: {load['status_counts']}"
+    assert load['status_counts'].get(200, 0) > 0, "Nenhuma requisição atendida"
+    print(f"✅ Backpressure ativo: {load['status_counts']}")
+
+
+if __name__ == "__main__":
+    test_predict_endpoint()
+    test_micro_batching_under_load()
+    test_backpressure_when_queue_full()
@@ -0,0 +1,84 @@
+"""
+Testes da inicialização rápida dos apps
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_startup.py
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import get_models_dir
+from src.inference import ObesityPredictor
+from src.model_artifacts import load_model_artifacts
+from src.startup import StartupTimer, report_first_render
+from src.translations import get_color_palette
+
+
+def test_palette_matches_matplotlib_blues():
+    """Paletas devem ter os mesmos hex de cm.get_cmap('Blues', 256)"""
+    assert get_color_palette(7) == ['#a6cee4', '#7fb9da', '#5ba3d0', '#3b8bc2', '#2070b4', '#0d57a1', '#083c7d']
+    assert get_color_palette(3, reverse=True) == ['#083c7d', '#3b8bc2', '#a6cee4']
+
+    try:
+        import matplotlib
+        import matplotlib.colors as mcolors
+        import numpy as np
+    except ImportError:
+        print("✅ Paletas conferidas (matplotlib ausente, comparação completa ignorada)")
+        return
+
+    blues = matplotlib.colormaps['Blues'].resampled(256)
+    for n_colors in range(1, 30):
+        for reverse in (False, True):
+            positions = np.linspace(0.95, 0.35, n_colors) if reverse else np.linspace(0.35, 0.95, n_colors)
+            expected = [mcolors.rgb2hex(blues(x)[:3]) for x in positions]
+            assert get_color_palette(n_colors, reverse) == expected, (n_colors, reverse)
+    print("✅ Paletas idênticas ao colormap Blues do matplotlib")
+
+
+def test_startup_path_skips_heavy_imports():
+    """Carregar o bundle e prever não deve importar matplotlib, sklearn, plotly ou joblib"""
+    code = (
+        "import sys\n"
+        f"sys.path.insert(0, {ROOT_DIR!r})\n"
+        "from src.translations import get_color_palette\n"
+        "from src.model_artifacts import load_model_artifacts\n"
+        "from src.inference import ObesityPredictor\n"
+        "get_color_palette(7)\n"
+        f"ObesityPredictor.from_artifacts(load_model_artifacts({get_models_dir()!r})).warmup()\n"
+        "print(','.join(m for m in ['matplotlib', 'sklearn', 'plotly', 'joblib'] if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == '', f"Módulos pesados importados: {result.stdout.strip()}"
+    print("✅ Inicialização sem matplotlib, sklearn, plotly e joblib")
+
+
+def test_warmup_and_first_render_report():
+    """Aquecimento deve prever e o relatório ser registrado uma vez por sessão"""
+    predictor = ObesityPredictor.from_artifacts(load_model_artifacts(get_models_dir()))
+    assert predictor.warmup() > 0
+
+    session_state = {}
+    timer = StartupTimer()
+    timer.mark('imports')
+    first = report_first_render(session_state, timer, 'teste')
+    second = report_first_render(session_state, StartupTimer(), 'teste')
+
+    assert first is second, "Relatório deve ser registrado apenas na primeira execução"
+    assert list(first['phases_ms']) == ['imports', 'renderizacao']
+    assert first['total_ms'] >= sum(first['phases_ms'].values()) - 1e-6
+    print(f"✅ Primeira renderização registrada: {first['total_ms']:.2f}ms")
+
+
+if __name__ == "__main__":
+    test_palette_matches_matplotlib_blues()
+    test_startup_path_skips_heavy_imports()
+    test_warmup_and_first_render_report()
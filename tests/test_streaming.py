@@ -0,0 +1,176 @@
+"""
+Testes da ingestão em blocos com agregados incrementais
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_streaming.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import load_raw_data
+from src.dataset_cache import DATA_PATH
+from src.filter_cube import FilterCube, HistogramCube, MomentCube
+from src.dataset_cache import load_datasets
+from src.streaming import (
+    HISTOGRAM_BIN_WIDTHS, AggregateStore, SourceChangedError, ensure_aggregates, refresh_aggregates, store_version
+)
+
+FILTERS = [
+    (['Female', 'Male'], (14, 61), None),
+    (['Male'], (20, 30), None),
+    (['Female', 'Male'], (14, 19), ['Obesity_Type_I', 'Normal_Weight']),
+]
+
+
+def assert_same_aggregates(store: AggregateStore, df: pd.DataFrame):
+    """Agregados do store iguais aos calculados de uma vez sobre as linhas"""
+    cube, moments = FilterCube.from_frame(df), MomentCube.from_frame(df)
+    for genders, age_range, obesity in FILTERS:
+        mask, expected_mask = store.cube.mask(genders, age_range, obesity), cube.mask(genders, age_range, obesity)
+        assert store.cube.total(mask) == cube.total(expected_mask)
+        assert store.cube.value_counts('Obesity', mask).equals(cube.value_counts('Obesity', expected_mask))
+        assert store.cube.crosstab('AgeBand', 'Obesity', mask).equals(cube.crosstab('AgeBand', 'Obesity', expected_mask))
+        for measure in ['FAF', 'CH2O']:
+            assert np.allclose(store.cube.group_means('Obesity', measure, mask),
+                               cube.group_means('Obesity', measure, expected_mask))
+
+        corr = store.moments.corr(store.moments.mask(genders, age_range, obesity))
+        expected_corr = moments.corr(moments.mask(genders, age_range, obesity))
+        assert np.allclose(corr, expected_corr, equal_nan=True)
+
+        for measure, width in HISTOGRAM_BIN_WIDTHS.items():
+            histogram = HistogramCube.from_frame(df, measure, width)
+            counts, edges = store.histograms[measure].histogram(store.histograms[measure].mask(genders, age_range, obesity))
+            expected_counts, expected_edges = histogram.histogram(histogram.mask(genders, age_range, obesity))
+            assert np.array_equal(counts, expected_counts) and np.allclose(edges, expected_edges)
+
+
+def test_chunked_aggregates_match_single_pass():
+    """Blocos combinados devem reproduzir os cubos calculados de uma vez"""
+    df = load_raw_data()
+    store = AggregateStore()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, 'pacientes.csv')
+        shutil.copy(DATA_PATH, source)
+        assert store.ingest(source, chunksize=300) == len(df)
+
+        store.save(os.path.join(tmp_dir, 'agregados'))
+        loaded = AggregateStore.load(os.path.join(tmp_dir, 'agregados'))
+
+    assert_same_aggregates(store, df)
+    assert_same_aggregates(loaded, df)
+    print(f"✅ {len(df):,} linhas em blocos de 300 = agregado de uma passada ({store.cube.n_cells} células)")
+
+
+def test_incremental_append_reads_only_new_rows():
+    """Arquivos e linhas novas entram sem reler o que já foi ingerido"""
+    df = load_raw_data()
+    raw = pd.read_csv(DATA_PATH)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store_dir = os.path.join(tmp_dir, 'agregados')
+        first, second = os.path.join(tmp_dir, 'lote1.csv'), os.path.join(tmp_dir, 'lote2.csv')
+        raw.iloc[:1000].to_csv(first, index=False)
+
+        _, read = ensure_aggregates([first], store_dir, chunksize=250)
+        assert read == {first: 1000}
+
+        # Linhas acrescentadas ao mesmo arquivo e um arquivo novo
+        raw.iloc[1000:1500].to_csv(first, mode='a', index=False, header=False)
+        raw.iloc[1500:].to_csv(second, index=False)
+        store, read = ensure_aggregates([first, second], store_dir, chunksize=250)
+        assert read == {first: 500, second: len(raw) - 1500}
+        assert_same_aggregates(store, df)
+
+        # Nada mudou: nenhuma linha lida
+        store, read = ensure_aggregates([first, second], store_dir)
+        assert read == {first: 0, second: 0} and store.n_rows == len(df)
+
+        # Conteúdo antigo alterado: não é um acréscimo, então tudo é relido
+        raw.iloc[:1500].assign(Age=raw['Age'].iloc[:1500] + 1).to_csv(first, index=False)
+        try:
+            AggregateStore.load(store_dir).ingest(first)
+            raise AssertionError("Arquivo alterado deveria exigir reconstrução")
+        except SourceChangedError:
+            pass
+        store, read = ensure_aggregates([first, second], store_dir)
+        assert read == {first: 1500, second: len(raw) - 1500}
+        assert np.isclose(store.cube.mean('Age'), df['Age'].mean() + 1500 / len(df))
+
+        # Arquivo novo com esquema inválido: erro propagado, nada relido nem regravado
+        invalid = os.path.join(tmp_dir, 'invalido.csv')
+        raw.drop(columns=['CALC']).to_csv(invalid, index=False)
+        saved = os.stat(os.path.join(store_dir, 'manifest.json')).st_mtime_ns
+        ingest = AggregateStore.ingest
+        with mock.patch.object(AggregateStore, 'ingest', autospec=True, side_effect=ingest) as calls:
+            try:
+                ensure_aggregates([first, second, invalid], store_dir)
+                raise AssertionError("Esquema inválido deveria ser rejeitado")
+            except SourceChangedError:
+                raise AssertionError("Esquema inválido não é mudança de fonte")
+            except ValueError as e:
+                assert 'CALC' in str(e)
+        assert calls.call_count == 3, "Fontes conhecidas não devem ser relidas"
+        assert os.stat(os.path.join(store_dir, 'manifest.json')).st_mtime_ns == saved
+        assert AggregateStore.load(store_dir).n_rows == len(df)
+    print("✅ Ingestão incremental: só as linhas novas são lidas; mudanças fora do final refazem os agregados")
+
+
+def test_refresh_keeps_rows_and_aggregates_in_sync():
+    """Linhas das fontes do manifesto e agregados devem contar os mesmos pacientes"""
+    raw = pd.read_csv(DATA_PATH)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store_dir, cache_dir = os.path.join(tmp_dir, 'agregados'), os.path.join(tmp_dir, 'cache')
+        first, second = os.path.join(tmp_dir, 'lote1.csv'), os.path.join(tmp_dir, 'lote2.csv')
+        raw.iloc[:1000].to_csv(first, index=False)
+        raw.iloc[1000:].to_csv(second, index=False)
+
+        # Fonte ingerida pela linha de comando entra nas linhas do dashboard
+        ensure_aggregates([second], store_dir)
+        manifest = refresh_aggregates([first], store_dir)
+        assert list(manifest['sources']) == [second, first]
+        df = load_datasets(list(manifest['sources']), cache_dir)
+        store = AggregateStore.load(store_dir)
+        assert len(df) == store.n_rows == len(raw)
+        assert isinstance(df['Obesity'].dtype, pd.CategoricalDtype)
+        assert df['Obesity'].value_counts().sort_index().equals(store.cube.value_counts('Obesity').sort_index())
+
+        # Nada mudou: nem os cubos são carregados; arquivo tocado regrava só o manifesto
+        version = store_version(manifest)
+        with mock.patch('src.streaming.ensure_aggregates') as ensure:
+            assert store_version(refresh_aggregates([first], store_dir)) == version
+        assert not ensure.called
+        stat = os.stat(first)
+        os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert store_version(refresh_aggregates([first], store_dir)) == version
+        with mock.patch('src.streaming.ensure_aggregates') as ensure:
+            refresh_aggregates([first], store_dir)
+        assert not ensure.called, "Manifesto deveria guardar a nova data de modificação"
+
+        # Linhas acrescentadas mudam a versão; fonte removida sai dos agregados
+        raw.iloc[:10].to_csv(second, mode='a', index=False, header=False)
+        manifest = refresh_aggregates([first], store_dir)
+        assert store_version(manifest) != version
+        assert AggregateStore.load(store_dir).n_rows == len(raw) + 10
+        os.remove(second)
+        manifest = refresh_aggregates([first], store_dir)
+        assert list(manifest['sources']) == [first]
+        assert AggregateStore.load(store_dir).n_rows == len(load_datasets([first], cache_dir)) == 1000
+    print("✅ Agregados e linhas por paciente lidos das mesmas fontes, com a versão do manifesto")
+
+
+if __name__ == "__main__":
+    test_chunked_aggregates_match_single_pass()
+    test_incremental_append_reads_only_new_rows()
+    test_refresh_keeps_rows_and_aggregates_in_sync()
@@ -0,0 +1,84 @@
+"""
+Testes do pipeline de treinamento com cache por etapa
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_training_pipeline.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from src.dataset_cache import DATA_PATH
+from src.oof_evaluation import load_evaluation
+from src.training_pipeline import EXPORT_FILES, STATE_FILE, read_state, run_pipeline
+
+FAST_MODELS = ['Logistic Regression', 'Decision Tree']
+
+
+def _misses(outputs: dict) -> list:
+    return [entry['stage'] for entry in outputs['report'] if not entry['hit']]
+
+
+def test_only_downstream_stages_recomputed():
+    """Segunda execução vem toda do cache; mudar a divisão refaz só split em diante"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, 'pacientes.csv')
+        shutil.copy(DATA_PATH, source)
+        options = dict(models=FAST_MODELS, models_dir=os.path.join(tmp_dir, 'models'),
+                       cache_dir=os.path.join(tmp_dir, 'cache'), workers=1)
+
+        first = run_pipeline(source, **options)
+        assert len(_misses(first)) == len(first['report']) == 8
+        assert all(os.path.exists(os.path.join(options['models_dir'], name)) for name in EXPORT_FILES)
+        assert read_state(options['models_dir'])['best_model_name'] == first['evaluation']['best_model_name']
+
+        second = run_pipeline(source, **options)
+        assert _misses(second) == []
+        assert np.array_equal(second['evaluation']['confusion_matrix'], first['evaluation']['confusion_matrix'])
+
+        third = run_pipeline(source, random_state=7, **options)
+        assert _misses(third) == ['split', 'fit:Logistic Regression', 'fit:Decision Tree', 'evaluate', 'export']
+
+        with open(source, 'a', encoding='utf-8') as f:
+            f.write("Male,30,1.80,90,yes,no,2,3,Sometimes,no,2,no,1,1,no,Walking,Overweight_Level_II\n")
+        fourth = run_pipeline(source, random_state=7, **options)
+        assert len(_misses(fourth)) == len(fourth['report'])
+        assert len(fourth['split']['y_train']) + len(fourth['split']['y_test']) == 2112
+    print("✅ Cache por etapa: execução repetida 100% em cache, mudanças refazem só as etapas seguintes")
+
+
+def test_export_matches_notebook_artifacts():
+    """Artefatos exportados com o modelo e as métricas da etapa evaluate"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        models_dir = os.path.join(tmp_dir, 'models')
+        # Ensemble compilado de uma execução anterior (os modelos rápidos não têm exportador)
+        stale_compiled = os.path.join(models_dir, 'compiled_model')
+        os.makedirs(stale_compiled)
+        outputs = run_pipeline(models=FAST_MODELS, models_dir=models_dir,
+                               cache_dir=os.path.join(tmp_dir, 'cache'), workers=1)
+
+        model = joblib.load(os.path.join(models_dir, 'best_model.pkl'))
+        metrics = joblib.load(os.path.join(models_dir, 'model_metrics.pkl'))
+        X_test = outputs['split']['X_test']
+        assert np.array_equal(model.predict(X_test), outputs['best_model'].predict(X_test))
+        assert metrics['model_name'] == outputs['evaluation']['best_model_name']
+        assert np.isclose(metrics['accuracy'], metrics['results_df']['Acurácia (%)'].iloc[0] / 100)
+        assert os.path.exists(os.path.join(models_dir, 'model_bundle', 'manifest.json'))
+        assert os.path.exists(os.path.join(models_dir, STATE_FILE))
+        assert not os.path.exists(stale_compiled), "Ensemble compilado antigo deve ser removido"
+        assert load_evaluation(models_dir)['selected_model'] == metrics['model_name']
+    print(f"✅ Artefatos exportados: {metrics['model_name']} ({metrics['accuracy']:.2%})")
+
+
+if __name__ == "__main__":
+    test_only_downstream_stages_recomputed()
+    test_export_matches_notebook_artifacts()
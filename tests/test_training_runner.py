@@ -0,0 +1,81 @@
+"""
+Testes do treinamento paralelo dos modelos candidatos
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_training_runner.py
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import load_raw_data
+from src.training_runner import (
+    build_model, evaluate_estimator, fold_assignments, load_shared, prepare_training_data, share_arrays,
+    train_model_zoo, train_serial
+)
+
+FAST_MODELS = ['Logistic Regression', 'Decision Tree']
+
+
+def test_parallel_matches_serial_notebook_path():
+    """Pool de processos deve reproduzir fit + cross_val_score do notebook"""
+    data = prepare_training_data(load_raw_data())
+    split = (data['X_train'], data['y_train'], data['X_test'], data['y_test'])
+
+    results, report = train_model_zoo(*split, names=FAST_MODELS, workers=2)
+    serial, _ = train_serial(*split, names=FAST_MODELS)
+
+    assert list(results) == FAST_MODELS and report['n_jobs'] == len(FAST_MODELS) * 6
+    for name in FAST_MODELS:
+        assert np.isclose(results[name]['accuracy'], serial[name]['accuracy'])
+        assert np.allclose(results[name]['cv_scores'], serial[name]['cv_scores'])
+        assert np.isclose(results[name]['cv_mean'], serial[name]['cv_scores'].mean())
+        assert list(results[name]['model'].feature_names_in_) == list(data['X_train'].columns)
+    print(f"✅ {report['n_jobs']} ajustes em {report['workers']} processos com as métricas do caminho serial "
+          f"({report['wall_seconds']:.1f}s)")
+
+
+def test_shared_arrays_are_memory_mapped():
+    """Arrays das tarefas abertos em memory-map, com folds estratificados"""
+    y = np.repeat(np.arange(3), 20)
+    folds = fold_assignments(y, 5)
+    assert np.bincount(folds).tolist() == [12] * 5
+    assert all(np.bincount(y[folds == fold]).tolist() == [4, 4, 4] for fold in range(5))
+
+    with tempfile.TemporaryDirectory() as directory:
+        share_arrays(directory, X_train=np.ones((60, 3)), folds=folds)
+        shared = load_shared(directory)
+        assert isinstance(shared['X_train'], np.memmap) and not shared['X_train'].flags.writeable
+        assert load_shared(directory) is shared
+    print("✅ Matrizes compartilhadas em memory-map e folds iguais aos de cross_val_score")
+
+
+def test_external_estimator_matches_zoo():
+    """Modelo ajustado fora do pool avaliado com os mesmos folds e métricas do zoológico"""
+    data = prepare_training_data(load_raw_data())
+    split = (data['X_train'], data['y_train'], data['X_test'], data['y_test'])
+    zoo, _ = train_model_zoo(*split, names=['Decision Tree'], workers=1)
+
+    model = build_model('Decision Tree').fit(data['X_train'], data['y_train'])
+    results = evaluate_estimator('Árvore externa', model, *split)
+
+    expected, result = zoo['Decision Tree'], results['Árvore externa']
+    assert result['model'] is model
+    assert np.array_equal(result['oof_proba'], expected['oof_proba'])
+    assert np.array_equal(result['test_proba'], expected['test_proba'])
+    assert np.isclose(result['cv_mean'], expected['cv_mean'])
+    print(f"✅ Modelo externo: CV {result['cv_mean']:.2%}, idêntico ao zoológico")
+
+
+if __name__ == "__main__":
+    test_parallel_matches_serial_notebook_path()
+    test_shared_arrays_are_memory_mapped()
+    test_external_estimator_matches_zoo()
@@ -0,0 +1,68 @@
+"""
+Testes da tradução vetorizada
+Tech Challenge Fase 4 - POSTECH Data Analytics
+
+Execute este arquivo do diretório raiz do projeto:
+    python tests/test_translations.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'tests'))
+
+from model_fixtures import load_raw_data
+from src.translations import (
+    OBESITY_ORDER, UNKNOWN_ORDER, get_obesity_label, get_obesity_labels, obesity_order_codes,
+    translate_value, translate_values, translate_variable, translate_variables
+)
+
+
+def test_vectorized_matches_scalar_functions():
+    """Versões vetorizadas devem coincidir com as funções por valor"""
+    df = load_raw_data()
+
+    assert get_obesity_labels(df['Obesity']).equals(df['Obesity'].apply(get_obesity_label))
+    assert get_obesity_labels(df['Obesity'], with_description=True).equals(
+        df['Obesity'].apply(get_obesity_label, with_description=True))
+    for col in ['Gender', 'family_history', 'CAEC', 'MTRANS']:
+        assert translate_values(df[col]).equals(df[col].apply(translate_value)), col
+    fcvc = df['FCVC'].round()
+    assert translate_values(fcvc, 'FCVC').equals(fcvc.apply(translate_value, variable='FCVC'))
+    assert list(translate_variables(df.columns)) == [translate_variable(col) for col in df.columns]
+
+    categorical = df['Obesity'].astype('category')
+    assert get_obesity_labels(categorical).equals(get_obesity_labels(df['Obesity']))
+    print("✅ Traduções vetorizadas idênticas às funções por valor")
+
+
+def test_categorical_output_and_order():
+    """Saída categórica deve seguir OBESITY_ORDER e preservar ausentes"""
+    values = pd.Series(['Obesity_Type_III', None, 'Normal_Weight', 'Insufficient_Weight', 'Normal_Weight'],
+                       index=[10, 11, 12, 13, 14], name='Obesity')
+
+    labels = get_obesity_labels(values, categorical=True)
+    assert list(labels.cat.categories) == ['Peso Insuficiente', 'Peso Normal', 'Obesidade III']
+    assert labels.isna().tolist() == [False, True, False, False, False]
+    assert list(labels.index) == list(values.index) and labels.name == 'Obesity'
+
+    codes = obesity_order_codes(pd.Series(OBESITY_ORDER[::-1] + ['Desconhecida', np.nan]))
+    assert codes.tolist() == list(range(len(OBESITY_ORDER)))[::-1] + [UNKNOWN_ORDER, UNKNOWN_ORDER]
+
+    shuffled = pd.Series(['Obesity_Type_I', 'Normal_Weight', 'Overweight_Level_II'])
+    assert shuffled.sort_values(key=obesity_order_codes).tolist() == \
+        ['Normal_Weight', 'Overweight_Level_II', 'Obesity_Type_I']
+
+    index = get_obesity_labels(pd.Index(['Obesity_Type_I', 'Normal_Weight'], name='Obesity'))
+    assert isinstance(index, pd.Index) and list(index) == ['Obesidade I', 'Peso Normal']
+    print("✅ Ordem clínica, ausentes e Index preservados")
+
+
+if __name__ == "__main__":
+    test_vectorized_matches_scalar_functions()
+    test_categorical_output_and_order()